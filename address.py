@@ -0,0 +1,269 @@
+import hashlib
+
+import secp256k1
+from base58 import b58encode_check, b58decode_check
+from ripemd160 import hash160
+
+# 网络参数: P2PKH版本号, P2SH版本号, bech32前缀, WIF版本号
+NETWORKS = {
+    False: (0x00, 0x05, 'bc', 0x80),
+    True: (0x6F, 0xC4, 'tb', 0xEF),
+}
+
+ADDRESS_TYPES = ('p2pkh', 'p2sh-p2wpkh', 'p2wpkh', 'p2tr')
+
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+BECH32_CONST = 1
+BECH32M_CONST = 0x2BC830A3
+_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+
+# 按最高5位预先合并生成多项式, polymod 每个字符只需一次查表
+_POLYMOD_TABLE = []
+for _top in range(32):
+    _x = 0
+    for _i in range(5):
+        if (_top >> _i) & 1:
+            _x ^= _GENERATOR[_i]
+    _POLYMOD_TABLE.append(_x)
+
+def _polymod(values, chk=1):
+    table = _POLYMOD_TABLE
+    for v in values:
+        chk = ((chk & 0x1FFFFFF) << 5 ^ v) ^ table[chk >> 25]
+    return chk
+
+_hrp_checks = {}
+
+def _hrp_check(hrp):
+    """bech32前缀部分的polymod中间状态, 每个前缀只计算一次"""
+    chk = _hrp_checks.get(hrp)
+    if chk is None:
+        chk = _polymod([ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp])
+        _hrp_checks[hrp] = chk
+    return chk
+
+def _to_5bit(data):
+    """8位字节 -> 5位分组 (末尾补零)"""
+    bits = len(data) * 8
+    count = (bits + 4) // 5
+    acc = int.from_bytes(data, 'big') << (count * 5 - bits)
+    return [(acc >> (5 * (count - 1 - i))) & 31 for i in range(count)]
+
+def _from_5bit(groups):
+    bits = len(groups) * 5
+    acc = 0
+    for g in groups:
+        acc = (acc << 5) | g
+    pad = bits % 8
+    if pad > 4 or acc & ((1 << pad) - 1):
+        raise ValueError("bech32数据填充错误")
+    return (acc >> pad).to_bytes(bits // 8, 'big')
+
+def segwit_encode(hrp, witver, program):
+    """
+    编码隔离见证地址 (版本0为bech32, 版本1及以上为bech32m)
+
+    Args:
+        hrp: 'bc' 或 'tb'
+        witver: 见证版本
+        program: 见证程序
+    """
+    data = [witver] + _to_5bit(program)
+    const = BECH32_CONST if witver == 0 else BECH32M_CONST
+    polymod = _polymod(data + [0] * 6, _hrp_check(hrp)) ^ const
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(BECH32_CHARSET[d] for d in data + checksum)
+
+def segwit_decode(address):
+    """
+    解码隔离见证地址
+
+    Returns:
+        (hrp, witver, program)
+    """
+    if address.lower() != address and address.upper() != address:
+        raise ValueError("bech32地址不能混合大小写")
+    address = address.lower()
+    pos = address.rfind('1')
+    if pos < 1 or pos + 7 > len(address) or len(address) > 90:
+        raise ValueError("bech32地址格式错误")
+    hrp = address[:pos]
+    try:
+        data = [BECH32_CHARSET.index(c) for c in address[pos + 1:]]
+    except ValueError:
+        raise ValueError("bech32地址包含无效字符")
+    witver = data[0]
+    const = BECH32_CONST if witver == 0 else BECH32M_CONST
+    if _polymod(data, _hrp_check(hrp)) != const:
+        raise ValueError("bech32校验和错误")
+    program = _from_5bit(data[1:-6])
+    if witver > 16 or not 2 <= len(program) <= 40 or (witver == 0 and len(program) not in (20, 32)):
+        raise ValueError("无效的见证程序")
+    return hrp, witver, program
+
+_TAPTWEAK_PREFIX = hashlib.sha256(hashlib.sha256(b'TapTweak').digest() * 2)
+
+def _taproot_tweak(pubkey):
+    """x-only 公钥点 P 和调整值 H_TapTweak(P)"""
+    x = pubkey[-32:]
+    # x-only 公钥取偶数y
+    point = secp256k1.deserialize(b'\x02' + x)
+    h = _TAPTWEAK_PREFIX.copy()
+    h.update(x)
+    tweak = int.from_bytes(h.digest(), 'big')
+    if tweak >= secp256k1.N:
+        raise ValueError("无效的taproot调整值")
+    return point, tweak
+
+def taproot_output_key(pubkey):
+    """
+    BIP341 仅密钥路径的输出公钥 Q = P + H_TapTweak(P)·G
+
+    Args:
+        pubkey: 33字节压缩公钥或32字节x-only公钥
+    """
+    point, tweak = _taproot_tweak(pubkey)
+    return secp256k1.add(point, secp256k1.mul_g(tweak))[0].to_bytes(32, 'big')
+
+def taproot_output_keys(pubkeys):
+    """
+    批量计算 taproot_output_key
+
+    每个 Q 先在雅可比坐标下计算, 整批用 Montgomery 技巧只做一次模逆,
+    而不是每个公钥做两次 (mul_g 和点加各一次)。
+    """
+    points = []
+    for pubkey in pubkeys:
+        point, tweak = _taproot_tweak(pubkey)
+        points.append(secp256k1._add_mixed(secp256k1._mul_g_jacobian(tweak), point))
+    return [q[0].to_bytes(32, 'big') for q in secp256k1.batch_to_affine(points)]
+
+def p2pkh(pubkey, testnet=False):
+    """P2PKH 地址 (1... / m...)"""
+    return b58encode_check(bytes([NETWORKS[testnet][0]]) + hash160(pubkey))
+
+def p2sh_p2wpkh(pubkey, testnet=False):
+    """P2SH 包装的 P2WPKH 地址 (3... / 2...), 公钥必须是压缩格式"""
+    redeem_script = b'\x00\x14' + hash160(pubkey)
+    return b58encode_check(bytes([NETWORKS[testnet][1]]) + hash160(redeem_script))
+
+def p2wpkh(pubkey, testnet=False):
+    """原生隔离见证 P2WPKH 地址 (bc1q...), 公钥必须是压缩格式"""
+    return segwit_encode(NETWORKS[testnet][2], 0, hash160(pubkey))
+
+def p2tr(pubkey, testnet=False):
+    """Taproot 仅密钥路径地址 (bc1p...)"""
+    return segwit_encode(NETWORKS[testnet][2], 1, taproot_output_key(pubkey))
+
+_ENCODERS = {
+    'p2pkh': p2pkh,
+    'p2sh-p2wpkh': p2sh_p2wpkh,
+    'p2wpkh': p2wpkh,
+    'p2tr': p2tr,
+}
+
+def encode(pubkey, kind='p2wpkh', testnet=False):
+    """
+    公钥 -> 地址
+
+    Args:
+        pubkey: SEC编码公钥
+        kind: 'p2pkh' / 'p2sh-p2wpkh' / 'p2wpkh' / 'p2tr'
+        testnet: 是否为测试网地址
+    """
+    try:
+        encoder = _ENCODERS[kind]
+    except KeyError:
+        raise ValueError(f"未知的地址类型: {kind}")
+    if kind != 'p2pkh' and len(pubkey) != 33:
+        raise ValueError("隔离见证地址需要压缩公钥")
+    return encoder(pubkey, testnet)
+
+def all_addresses(pubkey, testnet=False):
+    """公钥 -> 所有标准地址类型的字典"""
+    return {kind: encode(pubkey, kind, testnet) for kind in ADDRESS_TYPES}
+
+def encode_many(pubkeys, kind='p2wpkh', testnet=False):
+    """
+    批量 公钥 -> 地址
+
+    Base58 地址复用版本号缓冲区, bech32 地址复用前缀的 polymod 中间状态;
+    p2tr 的输出公钥用 taproot_output_keys 整批计算, 只做一次模逆。
+
+    Args:
+        pubkeys: SEC编码公钥的可迭代对象
+        kind: 地址类型
+        testnet: 是否为测试网地址
+
+    Returns:
+        list: 地址列表, 顺序与输入一致
+    """
+    if kind not in _ENCODERS:
+        raise ValueError(f"未知的地址类型: {kind}")
+    p2pkh_version, p2sh_version, hrp, _ = NETWORKS[testnet]
+    result = []
+
+    if kind == 'p2pkh' or kind == 'p2sh-p2wpkh':
+        # 版本号 + 20字节哈希 的共享缓冲区
+        buf = bytearray(21)
+        buf[0] = p2pkh_version if kind == 'p2pkh' else p2sh_version
+        redeem = bytearray(b'\x00\x14' + b'\0' * 20)
+        for pubkey in pubkeys:
+            h = hash160(pubkey)
+            if kind == 'p2sh-p2wpkh':
+                redeem[2:] = h
+                h = hash160(redeem)
+            buf[1:] = h
+            result.append(b58encode_check(bytes(buf)))
+        return result
+
+    witver = 0 if kind == 'p2wpkh' else 1
+    const = BECH32_CONST if witver == 0 else BECH32M_CONST
+    hrp_check = _hrp_check(hrp)
+    prefix = hrp + '1'
+    if kind == 'p2wpkh':
+        programs = (hash160(pubkey) for pubkey in pubkeys)
+    else:
+        programs = taproot_output_keys(pubkeys)
+    for program in programs:
+        data = [witver] + _to_5bit(program)
+        polymod = _polymod(data + [0] * 6, hrp_check) ^ const
+        data += [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+        result.append(prefix + ''.join([BECH32_CHARSET[d] for d in data]))
+    return result
+
+def decode_wif(wif):
+    """
+    解码WIF私钥
+
+    Returns:
+        (bytes, bool, bool): 32字节私钥, 是否压缩, 是否为测试网
+
+    Raises:
+        ValueError: 编码、校验和、版本号或私钥范围错误
+    """
+    payload = b58decode_check(wif)
+    if payload[0] not in (0x80, 0xEF):
+        raise ValueError("WIF版本号错误")
+    if len(payload) == 34 and payload[33] == 0x01:
+        compressed = True
+    elif len(payload) == 33:
+        compressed = False
+    else:
+        raise ValueError("WIF长度错误")
+    private_key = payload[1:33]
+    if not 0 < int.from_bytes(private_key, 'big') < secp256k1.N:
+        raise ValueError("私钥超出secp256k1范围")
+    return private_key, compressed, payload[0] == 0xEF
+
+def is_valid_wif(wif):
+    """验证WIF私钥"""
+    try:
+        decode_wif(wif)
+        return True
+    except ValueError:
+        return False
+
+def from_private_key(private_key, kind='p2wpkh', testnet=False, compressed=True):
+    """私钥 -> 地址"""
+    return encode(secp256k1.public_key(private_key, compressed), kind, testnet)
@@ -0,0 +1,230 @@
+import collections
+import mmap
+import os
+import sys
+import time
+import unicodedata
+from hashlib import sha256
+
+import wordlist as wordlist_module
+import bip39
+from bip39 import ENTROPY_SIZES
+
+# 无效原因
+UNKNOWN_WORD = 'unknown_word'
+BAD_LENGTH = 'bad_length'
+BAD_CHECKSUM = 'bad_checksum'
+REASONS = (UNKNOWN_WORD, BAD_LENGTH, BAD_CHECKSUM)
+
+# 每个任务处理的字节数 (按换行对齐); 每个进程同时只持有一块, 内存占用与文件大小无关
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# 工作进程中的 单词->11位二进制字符串 字典和词表
+_bits_of = None
+_wordlist = None
+
+def bit_table(language=wordlist_module.DEFAULT_LANGUAGE, path=None, encoding='utf-8'):
+    """
+    单词 -> 索引的11位二进制字符串 ('00000000101')
+
+    拼接各单词的二进制串后一次 int(..., 2) 即得到熵和校验和, 整行只有几次C层调用。
+    encoding 不为None时键为编码后的字节串, 可以直接在 mmap 数据上查找, 不逐行解码。
+    """
+    index_of = wordlist_module.load(language, path).index_of
+    return {(word.encode(encoding) if encoding else word): format(i, '011b') for word, i in index_of.items()}
+
+def check_words(words, bits_of):
+    """
+    检查一条助记词
+
+    Args:
+        words: 单词列表 (与 bits_of 的键同为 str 或同为 bytes)
+        bits_of: bit_table() 返回的字典
+
+    Returns:
+        (原因, 详情): 有效时返回 (None, None); 单词不在词表中时详情为位置(从1开始),
+        长度错误时为单词数量
+    """
+    try:
+        combined = int(''.join(map(bits_of.get, words)) or '0', 2)
+    except TypeError:
+        # 有单词查不到 (join 遇到None), 再逐个找出位置
+        return UNKNOWN_WORD, next(i for i, word in enumerate(words, 1) if word not in bits_of)
+    size = ENTROPY_SIZES.get(len(words))
+    if size is None:
+        return BAD_LENGTH, len(words)
+    cs_bits = size * 8 // 32
+    entropy = (combined >> cs_bits).to_bytes(size, 'big')
+    if sha256(entropy).digest()[0] >> (8 - cs_bits) != combined & ((1 << cs_bits) - 1):
+        return BAD_CHECKSUM, None
+    return None, None
+
+def _init(language, path):
+    global _bits_of, _wordlist
+    _wordlist = wordlist_module.load(language, path)
+    _bits_of = bit_table(language, path)
+
+def _check_chunk(task):
+    """
+    在工作进程中检查文件的一段
+
+    Returns:
+        (行数, 非空行数, [(段内行号, 原因, 详情, 拼写建议数量), ...])
+    """
+    path, start, end = task
+    bits_of = _bits_of
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = mm[start:end].lower().split(b'\n')
+    # 除最后一段外每段都以换行结尾, split 会多出一个空串
+    if lines and not lines[-1]:
+        lines.pop()
+    checked = 0
+    invalid = []
+    for number, line in enumerate(lines, 1):
+        if not line.isascii():
+            # 非英文词表: 按 BIP39 要求做 NFKD 规范化后再查找
+            line = unicodedata.normalize('NFKD', line.decode('utf-8', 'replace')).lower().encode('utf-8')
+        words = line.split()
+        if not words:
+            continue
+        checked += 1
+        reason, detail = check_words(words, bits_of)
+        if reason is not None:
+            suggestions = 0
+            if reason == UNKNOWN_WORD:
+                # 只记录能否纠正 (建议数量), 不把单词写进报告
+                suggestions = len(_wordlist.suggest(words[detail - 1].decode('utf-8', 'replace')))
+            invalid.append((number, reason, detail, suggestions))
+    return len(lines), checked, invalid
+
+def chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    把文件切分为按换行对齐的 (path, 起点, 终点) 区间
+
+    Yields:
+        tuple: _check_chunk 的任务
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            newline = mm.find(b'\n', min(start + chunk_size, size) - 1)
+            end = size if newline < 0 else newline + 1
+            yield path, start, end
+            start = end
+
+def _results(path, workers, language, wordlist_path, chunk_size):
+    """按文件顺序返回每段的检查结果"""
+    tasks = chunks(path, chunk_size)
+    if workers == 1:
+        _init(language, wordlist_path)
+        for task in tasks:
+            yield _check_chunk(task)
+        return
+    import multiprocessing
+
+    # 最多保持 workers*2 段在途, 结果按顺序取出
+    window = workers * 2
+    with multiprocessing.Pool(workers, initializer=_init, initargs=(language, wordlist_path)) as pool:
+        pending = collections.deque()
+        for task in tasks:
+            if len(pending) >= window:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(_check_chunk, (task,)))
+        while pending:
+            yield pending.popleft().get()
+
+def format_invalid(line_number, reason, detail, suggestions=0):
+    """报告中的一行: 行号、原因、详情, 以制表符分隔 (不包含助记词内容)"""
+    if reason == UNKNOWN_WORD:
+        detail = f"word {detail}, {suggestions} suggestions" if suggestions else f"word {detail}"
+    elif reason == BAD_LENGTH:
+        detail = f"{detail} words"
+    else:
+        detail = ''
+    return f"{line_number}\t{reason}\t{detail}\n"
+
+def audit(path, report=None, workers=None, language=wordlist_module.DEFAULT_LANGUAGE,
+          wordlist_path=None, chunk_size=CHUNK_SIZE):
+    """
+    流式检查每行一条助记词的文件
+
+    空行会被跳过, 单词不区分大小写, 单词之间可以是任意空白。
+
+    Args:
+        path: 助记词文件
+        report: 可写的文本文件对象, 每个无效行写入一行报告; None 表示不输出
+        workers: 进程数, 默认为CPU核心数
+        language: 词表语言
+        wordlist_path: 显式指定的词表文件
+        chunk_size: 每段的字节数
+
+    Returns:
+        dict: lines, checked, invalid, reasons (原因->数量), seconds, lines_per_sec
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    start = time.perf_counter()
+    offset = 0
+    checked = 0
+    reasons = dict.fromkeys(REASONS, 0)
+    for count, chunk_checked, invalid in _results(path, workers, language, wordlist_path, chunk_size):
+        for number, reason, detail, suggestions in invalid:
+            reasons[reason] += 1
+            if report is not None:
+                report.write(format_invalid(offset + number, reason, detail, suggestions))
+        offset += count
+        checked += chunk_checked
+    seconds = time.perf_counter() - start
+    return {
+        'lines': offset,
+        'checked': checked,
+        'invalid': sum(reasons.values()),
+        'reasons': reasons,
+        'seconds': seconds,
+        'lines_per_sec': offset / seconds if seconds else None,
+    }
+
+def print_summary(result, file=sys.stderr):
+    print(f"共 {result['lines']:,} 行, 检查 {result['checked']:,} 条助记词, 无效 {result['invalid']:,} 条", file=file)
+    for reason, count in result['reasons'].items():
+        if count:
+            print(f"  {reason}: {count:,}", file=file)
+    if result['lines_per_sec']:
+        print(f"用时 {result['seconds']:.2f}秒, {result['lines_per_sec']:,.0f} 行/秒", file=file)
+
+def check_phrase(phrase, language=None):
+    """
+    检查人工输入的助记词 (客服核对用), 接受4字母前缀和不带重音的写法
+
+    Args:
+        phrase: 输入的助记词
+        language: 词表语言, None 表示按单词自动识别
+
+    Returns:
+        dict: language, words [(输入, 词表中的单词或None, 拼写建议列表), ...],
+              reason (None 表示有效) 和 mnemonic (全部单词都能识别时为规范写法)
+    """
+    words = wordlist_module.normalize(phrase).split()
+    language = language or wordlist_module.detect_language(words) or wordlist_module.DEFAULT_LANGUAGE
+    wordlist = wordlist_module.load(language)
+    resolved = []
+    indexes = []
+    for word in words:
+        index = wordlist.lookup(word)
+        if index is None:
+            resolved.append((word, None, wordlist.suggest(word)))
+        else:
+            resolved.append((word, wordlist[index], []))
+            indexes.append(index)
+    result = {'language': language, 'words': resolved, 'reason': None, 'mnemonic': None}
+    if len(indexes) < len(words):
+        result['reason'] = UNKNOWN_WORD
+    elif len(words) not in ENTROPY_SIZES:
+        result['reason'] = BAD_LENGTH
+    else:
+        result['mnemonic'] = wordlist.join(wordlist[i] for i in indexes)
+        if not bip39.indexes_to_entropy(indexes)[1]:
+            result['reason'] = BAD_CHECKSUM
+    return result
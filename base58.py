@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import os
+import time
+
+# Base58 字符集
+ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+# 每次按 58^10 分块做大整数除法, 块内再按 58^2 查表输出两个字符
+_CHUNK_DIGITS = 10
+_CHUNK = 58 ** _CHUNK_DIGITS
+_PAIRS = [a + b for a in ALPHABET for b in ALPHABET]
+_PAIR = 58 * 58
+
+def b58encode(v):
+    """
+    Base58 编码
+
+    大整数只按 58^10 分块做除法, 块内用小整数运算和双字符查表,
+    最后一次性拼接字符串, 避免逐字符前插带来的二次复杂度。
+    """
+    # 接受任意缓冲区 (包括 SecretBuffer.view()), 不复制输入
+    v = memoryview(v)
+    n_pad = 0
+    while n_pad < len(v) and v[n_pad] == 0:
+        n_pad += 1
+
+    acc = int.from_bytes(v[n_pad:], 'big')
+    parts = []
+    while acc:
+        acc, chunk = divmod(acc, _CHUNK)
+        for _ in range(_CHUNK_DIGITS // 2):
+            chunk, pair = divmod(chunk, _PAIR)
+            parts.append(_PAIRS[pair])
+    parts.reverse()
+    return '1' * n_pad + ''.join(parts).lstrip('1')
+
+def b58decode(s):
+    """
+    Base58 解码
+
+    Raises:
+        ValueError: 包含不在字符集中的字符
+    """
+    n_pad = len(s) - len(s.lstrip('1'))
+    index = _INDEX
+    acc = 0
+    try:
+        # 每10个字符合并成一个小整数后再乘进大整数
+        for start in range(0, len(s), _CHUNK_DIGITS):
+            block = s[start:start + _CHUNK_DIGITS]
+            value = 0
+            for c in block:
+                value = value * 58 + index[c]
+            acc = acc * 58 ** len(block) + value
+    except KeyError as e:
+        raise ValueError(f"无效的Base58字符: {e.args[0]!r}")
+    return b'\0' * n_pad + acc.to_bytes((acc.bit_length() + 7) // 8, 'big')
+
+def checksum(payload):
+    """双重SHA256的前4字节"""
+    return hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+
+def b58encode_check(payload):
+    """Base58Check 编码 (附加4字节校验和)"""
+    return b58encode(payload + checksum(payload))
+
+def b58decode_check(s):
+    """
+    Base58Check 解码并验证校验和
+
+    Raises:
+        ValueError: 字符无效、长度不足或校验和错误
+    """
+    data = b58decode(s)
+    if len(data) < 4:
+        raise ValueError("Base58Check数据长度不足")
+    payload, check = data[:-4], data[-4:]
+    if checksum(payload) != check:
+        raise ValueError("Base58Check校验和错误")
+    return payload
+
+def encode_many(payloads, check=False):
+    """
+    批量编码
+
+    Args:
+        payloads: 字节串列表
+        check: 是否附加校验和 (Base58Check)
+    """
+    encode = b58encode_check if check else b58encode
+    return [encode(p) for p in payloads]
+
+def decode_many(strings, check=False):
+    """
+    批量解码
+
+    Args:
+        strings: Base58 字符串列表
+        check: 是否验证并去掉校验和 (Base58Check)
+    """
+    decode = b58decode_check if check else b58decode
+    return [decode(s) for s in strings]
+
+def _legacy_b58encode(v):
+    # 旧实现: 逐字符前插, 仅用于基准对比
+    nPad = len(v)
+    v = v.lstrip(b'\0')
+    nPad -= len(v)
+
+    p, acc = 1, 0
+    for c in reversed(v):
+        acc += p * c
+        p = p << 8
+
+    result = ''
+    while acc:
+        acc, idx = divmod(acc, 58)
+        result = ALPHABET[idx] + result
+
+    return '1' * nPad + result
+
+def _legacy_to_wif(private_key):
+    extended_key = b'\x80' + private_key + b'\x01'
+    double_sha256 = hashlib.sha256(hashlib.sha256(extended_key).digest()).digest()
+    return _legacy_b58encode(extended_key + double_sha256[:4])
+
+def benchmark_wif(count=1000000):
+    """
+    WIF编码吞吐量对比 (旧实现 vs 当前实现)
+
+    Returns:
+        dict: 两种实现每秒编码的WIF数量
+    """
+    keys = [os.urandom(32) for _ in range(count)]
+
+    start = time.perf_counter()
+    legacy = [_legacy_to_wif(k) for k in keys]
+    legacy_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    current = encode_many([b'\x80' + k + b'\x01' for k in keys], check=True)
+    current_rate = count / (time.perf_counter() - start)
+
+    if legacy != current:
+        raise AssertionError("新旧实现的WIF输出不一致")
+    return {'count': count, 'legacy_per_sec': legacy_rate, 'current_per_sec': current_rate}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WIF编码吞吐量基准")
+    parser.add_argument('-n', '--count', type=int, default=1000000, help="私钥数量")
+    result = benchmark_wif(parser.parse_args().count)
+    print(f"私钥数量: {result['count']}")
+    print(f"旧实现: {result['legacy_per_sec']:.0f} 个/秒")
+    print(f"新实现: {result['current_per_sec']:.0f} 个/秒")
+    print(f"提升: {result['current_per_sec'] / result['legacy_per_sec']:.2f}x")
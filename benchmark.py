@@ -0,0 +1,293 @@
+import argparse
+import datetime
+import functools
+import gc
+import inspect
+import json
+import operator
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import unicodedata
+from hashlib import pbkdf2_hmac, sha256
+
+import generator
+import entropy_pool
+import instrumentation
+import base58
+import bip38
+import secure_buffer
+import seed
+import source_scheduler
+from base58 import b58encode_check
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 默认回归阈值: 中位数比基线慢超过这个百分比即视为回归
+DEFAULT_THRESHOLD = 20.0
+
+def _build_benchmarks(wordlist, legacy=False):
+    """
+    基准项: 名称 -> (函数, 迭代次数)
+
+    熵源类基准直接调用各熵源函数 (不经过缓存), 测量的是单次采样的真实成本。
+    """
+    mnemonic, timestamp = generator.generate_new_key(wordlist, verbose=False)
+    entropy = os.urandom(32)
+    private_key = os.urandom(32)
+    payload = b'\x80' + private_key + b'\x01'
+    platform_info = generator.platform_source()
+    pool = entropy_pool.get_pool()
+    serial = source_scheduler.SourceScheduler(max_workers=0)
+
+    def end_to_end():
+        m, ts = generator.generate_new_key(wordlist, verbose=False)
+        seed, key = generator.mnemonic_to_private_key(m, ts)
+        generator.to_wif(key)
+
+    benchmarks = {
+        'source.network': (generator.network_source, 50),
+        'source.psutil': (lambda: generator.system_source(platform_info), 50),
+        'source.platform': (generator.platform_source, 50),
+        'source.env': (generator.environ_source, 200),
+        'source.delays': (generator.delay_source, 20),
+        'source.thread_pool': (lambda: pool.random_data(8), 2000),
+        'source.collect_thread_entropy': (lambda: generator.collect_thread_entropy(8), 5),
+        'source.file_scan': (generator.file_source, 50),
+        'source.extra_random': (generator.collect_extra_entropy, 50),
+        'generate_new_key': (lambda: generator.generate_new_key(wordlist, verbose=False), 10),
+        # 熵源依次运行 (调度器改进之前的方式), 用于对比
+        'generate_new_key.serial': (lambda: generator.generate_new_key(wordlist, verbose=False, scheduler=serial), 10),
+        'end_to_end': (end_to_end, 10),
+        'verify_mnemonic': (lambda: generator.verify_mnemonic(mnemonic, wordlist), 5000),
+        'generate_from_entropy': (lambda: generator.generate_from_entropy(wordlist, entropy), 5000),
+        'b58encode': (lambda: generator.b58encode(payload), 5000),
+        'to_wif': (lambda: generator.to_wif(private_key), 5000),
+        'mnemonic_to_private_key': (lambda: generator.mnemonic_to_private_key(mnemonic, timestamp), 100),
+        'bip38.encrypt': (lambda: bip38.encrypt(private_key, 'benchmark'), 3),
+    }
+    if legacy:
+        # 旧版1000万字符额外熵, 单次耗时数秒, 只在显式要求时运行
+        benchmarks['source.extra_random_legacy'] = (lambda: generator.collect_extra_entropy(legacy=True), 3)
+    return benchmarks
+
+def measure(func, iterations, warmup=1):
+    """运行func若干次并返回每次耗时(ns)"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            func()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+def _legacy_mix_entropy(random_entropy, sources):
+    # 旧实现: 每个熵源先拼接成32字节再逐字节异或, 仅用于分配对比
+    extended = [(source * (32 // len(source) + 1))[:32] for source in sources]
+    mixed = bytes([functools.reduce(operator.xor, column) for column in zip(random_entropy, *extended)])
+    return sha256(mixed).digest()[:len(random_entropy)]
+
+def _legacy_pbkdf2(mnemonic, salt):
+    # 旧实现: 规范化后 encode() 出不可清零的 bytes 再交给 PBKDF2
+    return pbkdf2_hmac('sha512', unicodedata.normalize('NFKD', mnemonic).encode(),
+                       unicodedata.normalize('NFKD', salt).encode(), seed.PBKDF2_ROUNDS)
+
+_LEGACY_IMPLEMENTATIONS = (_legacy_mix_entropy, _legacy_pbkdf2)
+
+def _allocation_pairs():
+    """秘密数据路径: 名称 -> (旧实现, 当前实现)"""
+    random_entropy = os.urandom(32)
+    sources = [os.urandom(8) for _ in range(12)]
+    private_key = os.urandom(32)
+    mnemonic, _ = generator.generate_from_entropy(generator.load_wordlist(), os.urandom(32), 24)
+    salt = seed.bip39_salt('passphrase')
+
+    def mix():
+        with generator.mix_entropy(random_entropy, sources):
+            pass
+
+    return {
+        'mix': (lambda: _legacy_mix_entropy(random_entropy, sources), mix),
+        'to_wif': (lambda: b58encode_check(b'\x80' + private_key + b'\x01'), lambda: generator.to_wif(private_key)),
+        'pbkdf2': (lambda: _legacy_pbkdf2(mnemonic, salt), lambda: seed._pbkdf2(mnemonic, salt)),
+    }
+
+def measure_allocations(func, iterations):
+    """
+    用 tracemalloc 测量单次调用的内存分配
+
+    CPython 只在调试版中提供累计分配计数, 这里记录每次调用期间新增的峰值字节数
+    (所有同时存活的中间对象之和) 和调用结束后仍未释放的块数。
+
+    Returns:
+        dict: peak_bytes (中位数), retained_blocks (总计)
+    """
+    func()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        peaks = []
+        before = tracemalloc.take_snapshot()
+        for _ in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        if gc_was_enabled:
+            gc.enable()
+    # 只统计被测模块中的分配, 不计 peaks 列表、tracemalloc 自身和其他线程
+    filters = [tracemalloc.Filter(True, module.__file__) for module in (generator, base58, secure_buffer, seed)]
+    # 旧实现定义在本模块中, 只统计它们自己的行
+    for legacy in _LEGACY_IMPLEMENTATIONS:
+        lines, first = inspect.getsourcelines(legacy)
+        filters += [tracemalloc.Filter(True, __file__, lineno) for lineno in range(first, first + len(lines))]
+    retained = sum(stat.count_diff for stat in after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+                   if stat.count_diff > 0)
+    peaks.sort()
+    return {'peak_bytes': peaks[len(peaks) // 2], 'retained_blocks': retained}
+
+def allocations(iterations=200, verbose=True):
+    """
+    秘密数据路径的新旧实现分配对比
+
+    Returns:
+        dict: 名称 -> {'legacy': ..., 'current': ...}
+    """
+    results = {}
+    for name, (legacy, current) in _allocation_pairs().items():
+        results[name] = {
+            'legacy': measure_allocations(legacy, iterations),
+            'current': measure_allocations(current, iterations),
+        }
+        if verbose:
+            old, new = results[name]['legacy'], results[name]['current']
+            print(f"{name:32s} 峰值分配 {old['peak_bytes']:6d}B -> {new['peak_bytes']:6d}B  "
+                  f"残留块 {old['retained_blocks']} -> {new['retained_blocks']}", file=sys.stderr)
+    return results
+
+def peak_rss_kb():
+    """进程峰值常驻内存 (KB)"""
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 返回字节, Linux 返回KB
+        return rss // 1024 if sys.platform == 'darwin' else rss
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) // 1024
+    except Exception:
+        return None
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def run(names=None, scale=1.0, legacy=False, verbose=True):
+    """
+    运行基准
+
+    Args:
+        names: 只运行名称以这些前缀开头的基准, None表示全部
+        scale: 迭代次数缩放系数
+        legacy: 是否包含旧版额外熵基准
+
+    Returns:
+        dict: 环境信息和每个基准的统计结果
+    """
+    wordlist = generator.load_wordlist()
+    benchmarks = _build_benchmarks(wordlist, legacy)
+    results = {}
+    for name, (func, iterations) in benchmarks.items():
+        if names and not any(name.startswith(n) for n in names):
+            continue
+        samples = measure(func, max(1, int(iterations * scale)))
+        results[name] = instrumentation.summarize(samples)
+        if verbose:
+            r = results[name]
+            print(f"{name:32s} 中位数 {r['median_us']:12.1f}us  p95 {r['p95_us']:12.1f}us  "
+                  f"p99 {r['p99_us']:12.1f}us  ({r['iterations']}次)", file=sys.stderr)
+    return {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'peak_rss_kb': peak_rss_kb(),
+        'results': results,
+    }
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    与基线比较中位数延迟
+
+    Returns:
+        list: (名称, 基线中位数, 当前中位数, 变化百分比) 超过阈值的回归项
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base['median_us']:
+            continue
+        change = (result['median_us'] - base['median_us']) / base['median_us'] * 100
+        if change > threshold:
+            regressions.append((name, base['median_us'], result['median_us'], change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="generator.py 热点路径基准")
+    parser.add_argument('--only', nargs='*', help="只运行名称以这些前缀开头的基准")
+    parser.add_argument('--scale', type=float, default=1.0, help="迭代次数缩放系数")
+    parser.add_argument('--legacy', action='store_true', help="包含旧版1000万字符额外熵基准")
+    parser.add_argument('-o', '--output', help="结果JSON输出路径 (默认为标准输出)")
+    parser.add_argument('--compare', metavar='BASELINE', help="与基线JSON比较, 出现回归时返回1")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="回归阈值(百分比)")
+    parser.add_argument('--allocations', action='store_true', help="同时用 tracemalloc 对比秘密数据路径的内存分配")
+    args = parser.parse_args(argv)
+
+    report = run(args.only, args.scale, args.legacy)
+    if args.allocations:
+        report['allocations'] = allocations()
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    print(f"峰值RSS: {report['peak_rss_kb']} KB", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, base, current, change in regressions:
+            print(f"回归: {name} 中位数 {base:.1f}us -> {current:.1f}us (+{change:.1f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"没有超过 {args.threshold}% 的回归", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
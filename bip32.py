@@ -0,0 +1,282 @@
+import hmac
+import threading
+from collections import OrderedDict
+
+import secp256k1
+from base58 import b58encode_check, b58decode_check
+from ripemd160 import hash160
+
+HARDENED = 0x80000000
+
+# 扩展密钥版本号 (私钥, 公钥)
+VERSIONS = {
+    'xprv': (0x0488ADE4, 0x0488B21E),  # BIP32/BIP44 主网
+    'yprv': (0x049D7878, 0x049D7CB2),  # BIP49 主网
+    'zprv': (0x04B2430C, 0x04B24746),  # BIP84 主网
+    'tprv': (0x04358394, 0x043587CF),  # 测试网
+}
+_VERSION_NAMES = {}
+for _name, (_prv, _pub) in VERSIONS.items():
+    _VERSION_NAMES[_prv] = _name
+    _VERSION_NAMES[_pub] = _name
+
+def parse_path(path):
+    """
+    解析派生路径
+
+    Args:
+        path: 如 "m/84'/0'/0'/0/5", 硬化索引可写作 ' 、h 或 H
+
+    Returns:
+        tuple: 子密钥索引 (硬化索引已加上 0x80000000)
+    """
+    parts = path.strip().split('/')
+    if parts and parts[0] in ('m', 'M'):
+        parts = parts[1:]
+    indexes = []
+    for part in parts:
+        if not part:
+            continue
+        hardened = part[-1] in "'hH"
+        number = int(part[:-1] if hardened else part)
+        if not 0 <= number < HARDENED:
+            raise ValueError(f"无效的派生索引: {part}")
+        indexes.append(number + HARDENED if hardened else number)
+    return tuple(indexes)
+
+def format_path(indexes):
+    """子密钥索引 -> 派生路径字符串"""
+    return '/'.join(['m'] + [f"{i - HARDENED}'" if i >= HARDENED else str(i) for i in indexes])
+
+
+class ExtendedKey:
+    """
+    BIP32 扩展密钥节点
+
+    private_key 为 None 时是扩展公钥。公钥以曲线点的形式缓存,
+    非硬化派生 (CKDpriv/CKDpub) 时不需要重复解压缩或重新计算。
+    """
+
+    def __init__(self, chain_code, private_key=None, point=None, depth=0, index=0,
+                 parent_fingerprint=b'\0\0\0\0'):
+        if private_key is not None:
+            k = int.from_bytes(private_key, 'big')
+            if not 0 < k < secp256k1.N:
+                raise ValueError("私钥超出secp256k1范围")
+        elif point is None:
+            raise ValueError("扩展密钥需要私钥或公钥")
+        self.chain_code = chain_code
+        self.private_key = private_key
+        self._point = point
+        self.depth = depth
+        self.index = index
+        self.parent_fingerprint = parent_fingerprint
+
+    @classmethod
+    def from_seed(cls, seed):
+        """由种子生成主扩展私钥"""
+        master = hmac.digest(b'Bitcoin seed', seed, 'sha512')
+        return cls(master[32:], master[:32])
+
+    @property
+    def is_private(self):
+        return self.private_key is not None
+
+    @property
+    def point(self):
+        if self._point is None:
+            self._point = secp256k1.mul_g(int.from_bytes(self.private_key, 'big'))
+        return self._point
+
+    @property
+    def public_key(self):
+        """压缩公钥 (33字节)"""
+        return secp256k1.serialize(self.point)
+
+    @property
+    def fingerprint(self):
+        return hash160(self.public_key)[:4]
+
+    def child(self, index):
+        """
+        派生子密钥 (私钥节点执行CKDpriv, 公钥节点执行CKDpub)
+
+        Args:
+            index: 子密钥索引, >= 0x80000000 为硬化派生
+        """
+        if index >= HARDENED:
+            if not self.is_private:
+                raise ValueError("扩展公钥不能进行硬化派生")
+            data = b'\0' + self.private_key + index.to_bytes(4, 'big')
+        else:
+            data = self.public_key + index.to_bytes(4, 'big')
+        I = hmac.digest(self.chain_code, data, 'sha512')
+        tweak = int.from_bytes(I[:32], 'big')
+        if tweak >= secp256k1.N:
+            # 概率约为 2^-127, 按BIP32规定跳到下一个索引
+            return self.child(index + 1)
+
+        if self.is_private:
+            k = (tweak + int.from_bytes(self.private_key, 'big')) % secp256k1.N
+            if not k:
+                return self.child(index + 1)
+            return ExtendedKey(I[32:], k.to_bytes(32, 'big'), None, self.depth + 1, index, self.fingerprint)
+
+        point = secp256k1.add(secp256k1.mul_g(tweak), self.point)
+        if point is None:
+            return self.child(index + 1)
+        return ExtendedKey(I[32:], None, point, self.depth + 1, index, self.fingerprint)
+
+    def derive(self, path):
+        """按路径派生, path 可以是字符串或索引序列"""
+        node = self
+        for index in parse_path(path) if isinstance(path, str) else path:
+            node = node.child(index)
+        return node
+
+    def neuter(self):
+        """扩展私钥 -> 扩展公钥"""
+        return ExtendedKey(self.chain_code, None, self.point, self.depth, self.index, self.parent_fingerprint)
+
+    def _serialize(self, version, key_data):
+        return b58encode_check(
+            version.to_bytes(4, 'big') +
+            bytes([self.depth]) +
+            self.parent_fingerprint +
+            self.index.to_bytes(4, 'big') +
+            self.chain_code +
+            key_data
+        )
+
+    def to_xprv(self, kind='xprv'):
+        """
+        序列化扩展私钥
+
+        Args:
+            kind: 'xprv' / 'yprv' / 'zprv' / 'tprv'
+        """
+        if not self.is_private:
+            raise ValueError("扩展公钥不能序列化为私钥")
+        return self._serialize(VERSIONS[kind][0], b'\0' + self.private_key)
+
+    def to_xpub(self, kind='xprv'):
+        """
+        序列化扩展公钥
+
+        Args:
+            kind: 'xprv' / 'yprv' / 'zprv' / 'tprv' (对应 xpub / ypub / zpub / tpub)
+        """
+        return self._serialize(VERSIONS[kind][1], self.public_key)
+
+    @classmethod
+    def parse(cls, s):
+        """
+        解析 xprv/xpub 等序列化字符串
+
+        Returns:
+            (ExtendedKey, str): 扩展密钥和版本名称 ('xprv' / 'yprv' / 'zprv' / 'tprv')
+        """
+        data = b58decode_check(s)
+        if len(data) != 78:
+            raise ValueError("扩展密钥长度错误")
+        version = int.from_bytes(data[:4], 'big')
+        if version not in _VERSION_NAMES:
+            raise ValueError("未知的扩展密钥版本")
+        kind = _VERSION_NAMES[version]
+        depth = data[4]
+        parent_fingerprint = data[5:9]
+        index = int.from_bytes(data[9:13], 'big')
+        chain_code = data[13:45]
+        key_data = data[45:]
+        if version == VERSIONS[kind][0]:
+            if key_data[0] != 0:
+                raise ValueError("扩展私钥格式错误")
+            return cls(chain_code, key_data[1:], None, depth, index, parent_fingerprint), kind
+        return cls(chain_code, None, secp256k1.deserialize(key_data), depth, index, parent_fingerprint), kind
+
+
+class DerivationTree:
+    """
+    带LRU缓存的派生树
+
+    缓存路径上的中间节点, 派生 m/84'/0'/0'/0/i 这类兄弟节点时
+    只需从已缓存的父节点 m/84'/0'/0'/0 做一次子密钥派生。
+    """
+
+    def __init__(self, root, maxsize=1024):
+        """
+        Args:
+            root: 根扩展密钥 (通常为主密钥)
+            maxsize: 最多缓存的中间节点数
+        """
+        self.root = root
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, indexes):
+        with self._lock:
+            node = self._cache.get(indexes)
+            if node is not None:
+                self._cache.move_to_end(indexes)
+                self.hits += 1
+            return node
+
+    def _store(self, indexes, node):
+        with self._lock:
+            self._cache[indexes] = node
+            self._cache.move_to_end(indexes)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def node(self, path):
+        """
+        派生路径上的节点, 从最深的已缓存祖先开始
+
+        Args:
+            path: 路径字符串或索引序列
+        """
+        indexes = parse_path(path) if isinstance(path, str) else tuple(path)
+        if not indexes:
+            return self.root
+        node = self._lookup(indexes)
+        if node is not None:
+            return node
+        self.misses += 1
+        # 找到最深的已缓存祖先
+        depth = len(indexes) - 1
+        parent = None
+        while depth > 0:
+            parent = self._lookup(indexes[:depth])
+            if parent is not None:
+                break
+            depth -= 1
+        node = parent if parent is not None else self.root
+        for i in range(depth, len(indexes)):
+            node = node.child(indexes[i])
+            self._store(indexes[:i + 1], node)
+        return node
+
+    def derive_range(self, path, start, count, public=False):
+        """
+        批量派生同一父节点下连续索引的子密钥
+
+        Args:
+            path: 父节点路径, 如 "m/84'/0'/0'/0"
+            start: 第一个子密钥索引
+            count: 数量
+            public: 为True时返回扩展公钥 (在公钥父节点上执行CKDpub)
+
+        Returns:
+            list: ExtendedKey 列表; 叶子节点不进入缓存, 避免挤掉中间节点
+        """
+        parent = self.node(path)
+        if public:
+            parent = parent.neuter()
+        return [parent.child(i) for i in range(start, start + count)]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,292 @@
+import hashlib
+import os
+import unicodedata
+
+import secp256k1
+import address
+from base58 import b58encode_check, b58decode_check
+
+# cryptography 只在加密/解密时导入
+_aes = None
+
+# BIP38 的 scrypt 参数: 由密码派生时 N=16384, r=8, p=8 (约16MB内存), EC乘法模式由 passpoint 派生时 N=1024, r=1, p=1
+SCRYPT_PASSPHRASE = {'n': 16384, 'r': 8, 'p': 8}
+SCRYPT_PASSPOINT = {'n': 1024, 'r': 1, 'p': 1}
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+# 每次密码派生的 scrypt 工作内存: 128 * r * N 字节
+SCRYPT_MEMORY = 128 * SCRYPT_PASSPHRASE['r'] * SCRYPT_PASSPHRASE['n']
+
+# 每个工作进程除 scrypt 之外的常驻内存估计值 (没有 psutil 时使用)
+WORKER_OVERHEAD = 48 * 1024 * 1024
+# 批量加密/解密默认的总RSS预算
+DEFAULT_RSS_BUDGET = 512 * 1024 * 1024
+
+PREFIX_NON_EC = b'\x01\x42'
+PREFIX_EC = b'\x01\x43'
+INTERMEDIATE_MAGIC = b'\x2C\xE9\xB3\xE1\xFF\x39\xE2'
+CONFIRMATION_MAGIC = b'\x64\x3B\xF6\xA8\x9A'
+
+FLAG_NON_EC = 0xC0
+FLAG_COMPRESSED = 0x20
+FLAG_LOT_SEQUENCE = 0x04
+
+MAX_LOT = 1048575
+MAX_SEQUENCE = 4095
+
+def _require_crypto():
+    global _aes
+    if _aes is None:
+        try:
+            from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        except ImportError:
+            raise ImportError("BIP38 需要安装cryptography: pip install cryptography")
+        _aes = (Cipher, algorithms.AES, modes.ECB)
+    return _aes
+
+def _aes_encrypt(key, block):
+    cipher, aes, ecb = _require_crypto()
+    encryptor = cipher(aes(key), ecb()).encryptor()
+    return encryptor.update(block) + encryptor.finalize()
+
+def _aes_decrypt(key, block):
+    cipher, aes, ecb = _require_crypto()
+    decryptor = cipher(aes(key), ecb()).decryptor()
+    return decryptor.update(block) + decryptor.finalize()
+
+def _xor(a, b):
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+def _sha256d(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+def _normalize_passphrase(passphrase):
+    """BIP38 要求密码先做 NFC 规范化再按 UTF-8 编码"""
+    if isinstance(passphrase, str):
+        passphrase = unicodedata.normalize('NFC', passphrase).encode('utf-8')
+    return passphrase
+
+def _address_hash(public_key):
+    """P2PKH 地址的双重SHA256前4字节, 用作盐值和密码校验"""
+    return _sha256d(address.p2pkh(public_key).encode('ascii'))[:4]
+
+def _scrypt(password, salt, params, dklen):
+    return hashlib.scrypt(password, salt=salt, dklen=dklen, maxmem=SCRYPT_MAXMEM, **params)
+
+def encrypt(private_key, passphrase, compressed=True):
+    """
+    BIP38 加密 (非EC乘法模式)
+
+    Args:
+        private_key: 32字节私钥, 例如 mnemonic_to_private_key() 返回的主私钥
+        passphrase: 密码 (str 或 bytes)
+        compressed: 对应的地址是否使用压缩公钥
+
+    Returns:
+        str: 以 6P 开头的加密私钥
+    """
+    public_key = secp256k1.public_key(private_key, compressed)
+    address_hash = _address_hash(public_key)
+    derived = _scrypt(_normalize_passphrase(passphrase), address_hash, SCRYPT_PASSPHRASE, 64)
+    half1, half2 = derived[:32], derived[32:]
+    encrypted1 = _aes_encrypt(half2, _xor(private_key[:16], half1[:16]))
+    encrypted2 = _aes_encrypt(half2, _xor(private_key[16:], half1[16:]))
+    flag = FLAG_NON_EC | (FLAG_COMPRESSED if compressed else 0)
+    return b58encode_check(PREFIX_NON_EC + bytes([flag]) + address_hash + encrypted1 + encrypted2)
+
+def _passfactor(passphrase, owner_entropy, lot_sequence):
+    # 有批次/序号时只用前4字节作为盐值, passfactor 还要与 ownerentropy 一起再哈希
+    owner_salt = owner_entropy[:4] if lot_sequence else owner_entropy
+    prefactor = _scrypt(_normalize_passphrase(passphrase), owner_salt, SCRYPT_PASSPHRASE, 32)
+    if lot_sequence:
+        return _sha256d(prefactor + owner_entropy)
+    return prefactor
+
+def intermediate_code(passphrase, lot=None, sequence=None, owner_salt=None):
+    """
+    EC乘法模式的中间码: 交给第三方生成加密私钥, 第三方不知道私钥也不知道密码
+
+    Args:
+        passphrase: 密码
+        lot: 批次号 (0..1048575), 与 sequence 一起使用
+        sequence: 序号 (0..4095)
+        owner_salt: 盐值, 默认随机 (有批次号时4字节, 否则8字节)
+
+    Returns:
+        str: 以 passphrase 开头的中间码
+    """
+    lot_sequence = lot is not None
+    if lot_sequence:
+        if sequence is None or not 0 <= lot <= MAX_LOT or not 0 <= sequence <= MAX_SEQUENCE:
+            raise ValueError(f"批次号必须在0到{MAX_LOT}之间, 序号必须在0到{MAX_SEQUENCE}之间")
+        owner_salt = owner_salt or os.urandom(4)
+        owner_entropy = owner_salt + (lot * 4096 + sequence).to_bytes(4, 'big')
+    else:
+        owner_entropy = owner_salt or os.urandom(8)
+    if len(owner_entropy) != 8:
+        raise ValueError("盐值长度错误")
+    passfactor = _passfactor(passphrase, owner_entropy, lot_sequence)
+    passpoint = secp256k1.public_key(passfactor, True)
+    magic = INTERMEDIATE_MAGIC + (b'\x51' if lot_sequence else b'\x53')
+    return b58encode_check(magic + owner_entropy + passpoint)
+
+def _decode_intermediate(code):
+    data = b58decode_check(code)
+    if len(data) != 49 or data[:7] != INTERMEDIATE_MAGIC or data[7] not in (0x51, 0x53):
+        raise ValueError("无效的BIP38中间码")
+    return data[8:16], secp256k1.deserialize(data[16:]), data[7] == 0x51
+
+def encrypt_from_intermediate(code, compressed=True, seed_b=None):
+    """
+    由中间码生成新的加密私钥 (EC乘法模式)
+
+    Args:
+        code: intermediate_code() 返回的中间码
+        compressed: 地址是否使用压缩公钥
+        seed_b: 24字节随机种子, 默认随机
+
+    Returns:
+        (str, str, str): 加密私钥, 确认码 (cfrm38...), P2PKH 地址
+    """
+    owner_entropy, passpoint, lot_sequence = _decode_intermediate(code)
+    seed_b = seed_b or os.urandom(24)
+    factor_b = int.from_bytes(_sha256d(seed_b), 'big')
+    if not 0 < factor_b < secp256k1.N:
+        raise ValueError("种子无效, 请重试")
+    public_key = secp256k1.serialize(secp256k1.multiply(passpoint, factor_b), compressed)
+    generated_address = address.p2pkh(public_key)
+    address_hash = _sha256d(generated_address.encode('ascii'))[:4]
+    derived = _scrypt(secp256k1.serialize(passpoint), address_hash + owner_entropy, SCRYPT_PASSPOINT, 64)
+    half1, half2 = derived[:32], derived[32:]
+    encrypted1 = _aes_encrypt(half2, _xor(seed_b[:16], half1[:16]))
+    encrypted2 = _aes_encrypt(half2, _xor(encrypted1[8:] + seed_b[16:], half1[16:]))
+    flag = (FLAG_COMPRESSED if compressed else 0) | (FLAG_LOT_SEQUENCE if lot_sequence else 0)
+    header = bytes([flag]) + address_hash + owner_entropy
+    encrypted = b58encode_check(PREFIX_EC + header + encrypted1[:8] + encrypted2)
+
+    # 确认码: 密码持有者可以据此确认地址属于自己, 而不需要解密私钥
+    point_b = secp256k1.public_key(factor_b.to_bytes(32, 'big'), True)
+    point_b_prefix = bytes([point_b[0] ^ (half2[31] & 1)])
+    point_b_x = (_aes_encrypt(half2, _xor(point_b[1:17], half1[:16]))
+                 + _aes_encrypt(half2, _xor(point_b[17:], half1[16:])))
+    confirmation = b58encode_check(CONFIRMATION_MAGIC + header + point_b_prefix + point_b_x)
+    return encrypted, confirmation, generated_address
+
+def decrypt(encrypted, passphrase):
+    """
+    解密 BIP38 私钥 (两种模式)
+
+    Args:
+        encrypted: 以 6P 开头的加密私钥
+        passphrase: 密码
+
+    Returns:
+        (bytes, bool): 32字节私钥, 地址是否使用压缩公钥
+
+    Raises:
+        ValueError: 格式错误或密码错误
+    """
+    data = b58decode_check(encrypted)
+    if len(data) != 39 or data[:2] not in (PREFIX_NON_EC, PREFIX_EC):
+        raise ValueError("不是BIP38加密私钥")
+    flag = data[2]
+    compressed = bool(flag & FLAG_COMPRESSED)
+    address_hash = data[3:7]
+    if data[:2] == PREFIX_NON_EC:
+        derived = _scrypt(_normalize_passphrase(passphrase), address_hash, SCRYPT_PASSPHRASE, 64)
+        half1, half2 = derived[:32], derived[32:]
+        private_key = (_xor(_aes_decrypt(half2, data[7:23]), half1[:16])
+                       + _xor(_aes_decrypt(half2, data[23:39]), half1[16:]))
+    else:
+        owner_entropy = data[7:15]
+        passfactor = _passfactor(passphrase, owner_entropy, flag & FLAG_LOT_SEQUENCE)
+        passpoint = secp256k1.public_key(passfactor, True)
+        derived = _scrypt(passpoint, address_hash + owner_entropy, SCRYPT_PASSPOINT, 64)
+        half1, half2 = derived[:32], derived[32:]
+        decrypted2 = _xor(_aes_decrypt(half2, data[23:39]), half1[16:])
+        seed_b = _xor(_aes_decrypt(half2, data[15:23] + decrypted2[:8]), half1[:16]) + decrypted2[8:]
+        factor_b = int.from_bytes(_sha256d(seed_b), 'big')
+        private_key = (int.from_bytes(passfactor, 'big') * factor_b % secp256k1.N).to_bytes(32, 'big')
+    if not 0 < int.from_bytes(private_key, 'big') < secp256k1.N:
+        raise ValueError("BIP38密码错误")
+    if _address_hash(secp256k1.public_key(private_key, compressed)) != address_hash:
+        raise ValueError("BIP38密码错误")
+    return private_key, compressed
+
+def _process_rss():
+    """当前进程的常驻内存, 没有 psutil 时返回None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+def worker_count(workers=None, rss_budget=DEFAULT_RSS_BUDGET):
+    """
+    在RSS预算内可以同时运行的 scrypt 进程数
+
+    每个工作进程按 一次 scrypt 的工作内存 + 当前进程的常驻内存 (fork 出的子进程的上限) 计算,
+    主进程本身也计入预算; 有 psutil 时还不超过系统当前可用内存。
+
+    Args:
+        workers: 希望的进程数, 默认为CPU核心数
+        rss_budget: 所有进程常驻内存之和的上限(字节), None 表示不限制
+
+    Returns:
+        int: 进程数 (至少为1)
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    rss = _process_rss()
+    per_worker = SCRYPT_MEMORY + (rss or WORKER_OVERHEAD)
+    if rss_budget is not None:
+        workers = min(workers, (rss_budget - (rss or WORKER_OVERHEAD)) // per_worker)
+    try:
+        import psutil
+        workers = min(workers, psutil.virtual_memory().available // per_worker)
+    except ImportError:
+        pass
+    return max(1, workers)
+
+def _encrypt_task(task):
+    private_key, passphrase, compressed = task
+    return encrypt(private_key, passphrase, compressed)
+
+def _decrypt_task(task):
+    encrypted, passphrase = task
+    return decrypt(encrypted, passphrase)
+
+def _map(func, tasks, workers, rss_budget):
+    workers = worker_count(workers, rss_budget)
+    if workers == 1:
+        yield from map(func, tasks)
+        return
+    import multiprocessing
+
+    # 每个任务数百毫秒, chunksize=1 保持各进程负载均衡; imap 按输入顺序返回
+    pool = multiprocessing.Pool(workers)
+    try:
+        yield from pool.imap(func, tasks)
+    finally:
+        pool.terminate()
+
+def encrypt_batch(keys, passphrase, workers=None, rss_budget=DEFAULT_RSS_BUDGET):
+    """
+    批量加密, scrypt 在进程池中并行, 进程数受 RSS 预算限制 (见 worker_count())
+
+    Args:
+        keys: (32字节私钥, 是否压缩) 的可迭代对象
+
+    Yields:
+        str: 加密私钥, 按输入顺序
+    """
+    passphrase = _normalize_passphrase(passphrase)
+    return _map(_encrypt_task, ((key, passphrase, compressed) for key, compressed in keys), workers, rss_budget)
+
+def decrypt_batch(encrypted_keys, passphrase, workers=None, rss_budget=DEFAULT_RSS_BUDGET):
+    """
+    批量解密
+
+    Yields:
+        (bytes, bool): 与 decrypt() 相同, 按输入顺序
+    """
+    passphrase = _normalize_passphrase(passphrase)
+    return _map(_decrypt_task, ((key, passphrase) for key in encrypted_keys), workers, rss_budget)
@@ -0,0 +1,214 @@
+import unicodedata
+from hashlib import sha256
+
+# numpy 只在批量接口中用到, 首次调用时再导入 (导入约需90ms)
+np = None
+
+# 单词数量 -> 熵字节数
+ENTROPY_SIZES = {12: 16, 15: 20, 18: 24, 21: 28, 24: 32}
+WORD_COUNTS = tuple(ENTROPY_SIZES)
+
+# 词表对象 -> 单词索引字典
+_indexes = {}
+
+def word_index(wordlist):
+    """
+    返回词表的 单词->索引 字典, 每个词表只构建一次
+
+    Args:
+        wordlist: BIP39词表 (2048个单词)
+    """
+    # wordlist.Wordlist 自带索引
+    index_of = getattr(wordlist, 'index_of', None)
+    if index_of is not None:
+        return index_of
+    cached = _indexes.get(id(wordlist))
+    if cached is None or cached[0] is not wordlist:
+        cached = (wordlist, {word: i for i, word in enumerate(wordlist)})
+        _indexes[id(wordlist)] = cached
+    return cached[1]
+
+def entropy_size(word_count):
+    """单词数量对应的熵字节数"""
+    try:
+        return ENTROPY_SIZES[word_count]
+    except KeyError:
+        raise ValueError(f"助记词单词数量必须是 {', '.join(map(str, WORD_COUNTS))} 之一")
+
+def checksum(entropy):
+    """熵的校验和 (SHA256 的前 len(entropy)*8/32 位) 及其位数"""
+    bits = len(entropy) * 8 // 32
+    return sha256(entropy).digest()[0] >> (8 - bits), bits
+
+def entropy_to_indexes(entropy):
+    """
+    熵 -> 单词索引列表
+
+    Args:
+        entropy: 16/20/24/28/32 字节熵
+    """
+    if len(entropy) not in ENTROPY_SIZES.values():
+        raise ValueError("熵长度必须是16、20、24、28或32字节")
+    cs, cs_bits = checksum(entropy)
+    combined = (int.from_bytes(entropy, 'big') << cs_bits) | cs
+    count = (len(entropy) * 8 + cs_bits) // 11
+    return [(combined >> (11 * (count - 1 - i))) & 0x7FF for i in range(count)]
+
+def indexes_to_entropy(indexes):
+    """
+    单词索引列表 -> (熵, 校验和是否正确)
+
+    Args:
+        indexes: 12/15/18/21/24 个单词索引
+    """
+    size = entropy_size(len(indexes))
+    combined = 0
+    for index in indexes:
+        combined = (combined << 11) | index
+    cs_bits = size * 8 // 32
+    entropy = (combined >> cs_bits).to_bytes(size, 'big')
+    return entropy, checksum(entropy)[0] == combined & ((1 << cs_bits) - 1)
+
+def solve_last_word(indexes):
+    """
+    保留最后一个单词中的熵位, 重新计算其校验和位
+
+    Args:
+        indexes: 单词索引列表 (最后一个单词的校验和位会被忽略)
+
+    Returns:
+        int: 使校验和成立的最后一个单词索引
+    """
+    size = entropy_size(len(indexes))
+    cs_bits = size * 8 // 32
+    combined = 0
+    for index in indexes:
+        combined = (combined << 11) | index
+    entropy = (combined >> cs_bits).to_bytes(size, 'big')
+    return (indexes[-1] >> cs_bits << cs_bits) | checksum(entropy)[0]
+
+def checksum_candidates(indexes, position):
+    """
+    枚举某个位置上所有能使校验和成立的单词
+
+    Args:
+        indexes: 单词索引列表
+        position: 要枚举的位置 (从0开始)
+
+    Returns:
+        list: 满足校验和的单词索引, 平均有 2048 / 2^校验和位数 个
+    """
+    count = len(indexes)
+    size = entropy_size(count)
+    cs_bits = size * 8 // 32
+    mask = (1 << cs_bits) - 1
+    shift = 11 * (count - 1 - position)
+
+    base = 0
+    for i, index in enumerate(indexes):
+        base = (base << 11) | (0 if i == position else index)
+
+    result = []
+    for candidate in range(2048):
+        combined = base | (candidate << shift)
+        entropy = (combined >> cs_bits).to_bytes(size, 'big')
+        if sha256(entropy).digest()[0] >> (8 - cs_bits) == combined & mask:
+            result.append(candidate)
+    return result
+
+def entropy_to_mnemonic(entropy, wordlist):
+    """熵 -> 助记词 (日语词表用全角空格分隔)"""
+    return getattr(wordlist, 'separator', ' ').join(wordlist[i] for i in entropy_to_indexes(entropy))
+
+def mnemonic_to_indexes(mnemonic, wordlist):
+    """助记词 (先做NFKD规范化) -> 单词索引列表, 遇到不在词表中的单词抛出ValueError"""
+    index = word_index(wordlist)
+    if not mnemonic.isascii():
+        mnemonic = unicodedata.normalize('NFKD', mnemonic)
+    try:
+        return [index[word] for word in mnemonic.split()]
+    except KeyError as e:
+        raise ValueError(f"单词 {e.args[0]!r} 不在BIP39词表中")
+
+def mnemonic_to_entropy(mnemonic, wordlist):
+    """助记词 -> 熵, 长度或校验和错误时抛出ValueError"""
+    entropy, valid = indexes_to_entropy(mnemonic_to_indexes(mnemonic, wordlist))
+    if not valid:
+        raise ValueError("助记词校验和错误")
+    return entropy
+
+def verify_mnemonic(mnemonic, wordlist):
+    """验证助记词的长度和校验和 (不在词表中的单词抛出ValueError)"""
+    indexes = mnemonic_to_indexes(mnemonic, wordlist)
+    if len(indexes) not in ENTROPY_SIZES:
+        return False
+    return indexes_to_entropy(indexes)[1]
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("批量编码需要安装numpy: pip install numpy")
+        np = numpy
+
+def encode_batch(entropies):
+    """
+    批量 熵 -> 单词索引矩阵
+
+    Args:
+        entropies: 形状为 (N, 熵字节数) 的 uint8 数组
+
+    Returns:
+        numpy.ndarray: 形状为 (N, 单词数量) 的 uint16 索引矩阵
+    """
+    _require_numpy()
+    entropies = np.ascontiguousarray(entropies, dtype=np.uint8)
+    n, size = entropies.shape
+    word_count = size * 3 // 4
+    entropy_size(word_count)
+    cs_bits = size * 8 // 32
+
+    # SHA256 无法向量化, 只逐行取校验和字节, 位运算全部在数组上完成
+    raw = entropies.tobytes()
+    checksums = np.frombuffer(
+        b''.join(sha256(raw[i:i + size]).digest()[:1] for i in range(0, len(raw), size)),
+        dtype=np.uint8,
+    )
+    bits = np.concatenate(
+        [np.unpackbits(entropies, axis=1), np.unpackbits(checksums[:, None], axis=1)[:, :cs_bits]],
+        axis=1,
+    )
+    weights = (1 << np.arange(10, -1, -1)).astype(np.uint16)
+    return (bits.reshape(n, word_count, 11).astype(np.uint16) * weights).sum(axis=2, dtype=np.uint16)
+
+def decode_batch(indexes):
+    """
+    批量 单词索引矩阵 -> (熵数组, 校验和是否正确的布尔数组)
+
+    Args:
+        indexes: 形状为 (N, 单词数量) 的整数数组
+    """
+    _require_numpy()
+    indexes = np.asarray(indexes, dtype=np.uint16)
+    n, word_count = indexes.shape
+    size = entropy_size(word_count)
+    cs_bits = size * 8 // 32
+
+    shifts = np.arange(10, -1, -1, dtype=np.uint16)
+    bits = ((indexes[:, :, None] >> shifts) & 1).astype(np.uint8).reshape(n, word_count * 11)
+    entropies = np.packbits(bits[:, :size * 8], axis=1)
+    given = np.packbits(bits[:, size * 8:], axis=1, bitorder='big')[:, 0]
+
+    raw = entropies.tobytes()
+    expected = np.frombuffer(
+        b''.join(sha256(raw[i:i + size]).digest()[:1] for i in range(0, len(raw), size)),
+        dtype=np.uint8,
+    )
+    mask = np.uint8((0xFF << (8 - cs_bits)) & 0xFF)
+    return entropies, (expected & mask) == given
+
+def verify_batch(indexes):
+    """批量校验单词索引矩阵, 返回布尔数组"""
+    return decode_batch(indexes)[1]
@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import time
+
+import bip39
+import generator
+import instrumentation
+
+# 帧格式: 长度(u32, 大端) + UTF-8 JSON
+# 请求: {"id": 1, "op": "generate" | "verify" | "derive" | "stats", ...参数}
+# 响应: {"id": 1, "ok": true, "result": {...}} 或 {"id": 1, "ok": false, "error": "..."}
+# 同一连接上可以连续发送多个请求, 响应按完成顺序返回, 由 id 对应。
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME = 64 * 1024
+
+SOCKET_ENV = 'BIP39_KEYGEN_SOCKET'
+# 每个连接同时处理的请求数上限, 达到后停止读取该连接 (由内核缓冲区向客户端施加背压)
+DEFAULT_MAX_INFLIGHT = 64
+# 每个工作进程排队的任务数上限
+POOL_QUEUE_PER_WORKER = 4
+# 每种请求保留最近多少个延迟样本用于计算分位数
+LATENCY_SAMPLES = 10000
+METRICS_INTERVAL = 10.0
+
+OPS = ('generate', 'verify', 'derive', 'stats')
+
+
+class DaemonError(Exception):
+    """守护进程返回的错误"""
+
+def default_socket_path():
+    """$BIP39_KEYGEN_SOCKET, 否则为 $XDG_RUNTIME_DIR (或临时目录) 下的用户私有套接字"""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(base, f"bip39-keygen-{os.getuid()}.sock")
+
+def encode_frame(message):
+    body = json.dumps(message, separators=(',', ':')).encode()
+    if len(body) > MAX_FRAME:
+        raise ValueError("消息超过最大帧长度")
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+# ---- 工作进程中执行的任务 (必须是模块级函数) ----
+
+def _warm():
+    """预热: 加载词表、填充熵源缓存、构建G点预计算表"""
+    import secp256k1
+    generator._batch_init()
+    generator.generate_new_key(generator.load_wordlist(), verbose=False)
+    secp256k1.mul_g(1)
+    return os.getpid()
+
+def _generate(word_count, passphrase):
+    mnemonic, seed, master_private_key, wif = generator._batch_generate((word_count, passphrase))
+    return {
+        'mnemonic': mnemonic,
+        'seed': seed.hex(),
+        'master_private_key': master_private_key.hex(),
+        'wif': wif,
+    }
+
+def _derive(mnemonic, passphrase, path, kind, testnet):
+    import address
+    import bip32
+    import secp256k1
+    import seed as seed_module
+
+    seed = seed_module.derive_seed(mnemonic, seed_module.bip39_salt(passphrase))
+    node = bip32.ExtendedKey.from_seed(seed).derive(path)
+    pubkey = secp256k1.public_key(node.private_key)
+    return {
+        'path': path,
+        'address': address.encode(pubkey, kind, testnet),
+        'public_key': pubkey.hex(),
+        'wif': generator.to_wif(node.private_key, testnet=testnet),
+        'xprv': node.to_xprv('tprv' if testnet else 'xprv'),
+    }
+
+
+class KeygenDaemon:
+    """
+    本地密钥生成守护进程
+
+    generate/derive 在预热的进程池中执行 (耗时主要是 PBKDF2),
+    verify 只需词表索引和一次 SHA256, 直接在事件循环中完成。
+    """
+
+    def __init__(self, path=None, workers=None, max_inflight=DEFAULT_MAX_INFLIGHT, metrics_path=None):
+        self.path = path or default_socket_path()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_inflight = max_inflight
+        self.metrics_path = metrics_path
+        self.wordlist = generator.load_wordlist()
+        self.latencies = {op: collections.deque(maxlen=LATENCY_SAMPLES) for op in OPS}
+        self.counts = {op: [0, 0] for op in OPS}  # [请求数, 失败数]
+        self.inflight = 0
+        self.started = None
+        self.metrics = None
+        self._pool = None
+        self._pool_slots = None
+        self._server = None
+
+    async def start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        loop = asyncio.get_running_loop()
+        # spawn: 工作进程不继承事件循环、监听套接字和父进程的熵池状态
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self._pool_slots = asyncio.Semaphore(self.workers * POOL_QUEUE_PER_WORKER)
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm) for _ in range(self.workers)))
+
+        if self.metrics_path:
+            self.metrics = instrumentation.add_observer(instrumentation.MetricsAggregator())
+
+        self._remove_stale_socket()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle_connection, self.path)
+        finally:
+            os.umask(old_umask)
+        self.started = time.time()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.path)
+        else:
+            raise RuntimeError(f"守护进程已在运行: {self.path}")
+        finally:
+            probe.close()
+
+    async def serve_forever(self):
+        await self.start()
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        print(f"监听 {self.path} ({self.workers} 个工作进程)", file=sys.stderr)
+        try:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), METRICS_INTERVAL if self.metrics else None)
+                except asyncio.TimeoutError:
+                    pass
+                if self.metrics:
+                    self.metrics.dump(self.metrics_path)
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self.metrics is not None:
+            self.metrics.dump(self.metrics_path)
+            instrumentation.remove_observer(self.metrics)
+            self.metrics = None
+
+    async def _handle_connection(self, reader, writer):
+        slots = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                # 在途请求达到上限时不再读取, 客户端的发送会被内核缓冲区阻塞
+                await slots.acquire()
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                    length = FRAME_HEADER.unpack(header)[0]
+                    if length > MAX_FRAME:
+                        await self._send(writer, write_lock, {'id': None, 'ok': False, 'error': "帧长度超过上限"})
+                        break
+                    body = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                task = asyncio.create_task(self._serve(body, writer, write_lock, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def _send(self, writer, write_lock, message):
+        async with write_lock:
+            writer.write(encode_frame(message))
+            # 客户端读取过慢时在这里等待, 不会无限堆积响应
+            await writer.drain()
+
+    async def _serve(self, body, writer, write_lock, slots):
+        start = time.perf_counter_ns()
+        request_id = None
+        op = None
+        self.inflight += 1
+        try:
+            try:
+                request = json.loads(body)
+                request_id = request.get('id')
+                op = request.get('op')
+                if op not in OPS:
+                    raise ValueError(f"未知的请求类型: {op}")
+                with instrumentation.span('request', op):
+                    result = await getattr(self, f"_op_{op}")(request)
+                response = {'id': request_id, 'ok': True, 'result': result}
+            except Exception as e:
+                response = {'id': request_id, 'ok': False, 'error': str(e)}
+            if op in self.counts:
+                self.counts[op][0] += 1
+                if not response['ok']:
+                    self.counts[op][1] += 1
+                self.latencies[op].append(time.perf_counter_ns() - start)
+            try:
+                await self._send(writer, write_lock, response)
+            except ConnectionError:
+                pass
+        finally:
+            self.inflight -= 1
+            slots.release()
+
+    async def _run_in_pool(self, func, *args):
+        async with self._pool_slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def _op_generate(self, request):
+        word_count = request.get('words', 12)
+        bip39.entropy_size(word_count)
+        return await self._run_in_pool(_generate, word_count, request.get('passphrase'))
+
+    async def _op_verify(self, request):
+        try:
+            return {'valid': bip39.verify_mnemonic(request['mnemonic'], self.wordlist)}
+        except ValueError as e:
+            return {'valid': False, 'reason': str(e)}
+
+    async def _op_derive(self, request):
+        return await self._run_in_pool(
+            _derive,
+            request['mnemonic'],
+            request.get('passphrase', ''),
+            request.get('path', "m/84'/0'/0'/0/0"),
+            request.get('type', 'p2wpkh'),
+            bool(request.get('testnet', False)),
+        )
+
+    async def _op_stats(self, request):
+        stats = {}
+        for op in OPS:
+            samples = self.latencies[op]
+            entry = {'count': self.counts[op][0], 'errors': self.counts[op][1]}
+            if samples:
+                summary = instrumentation.summarize(samples)
+                entry.update({
+                    'p50_ms': summary['median_us'] / 1000,
+                    'p95_ms': summary['p95_us'] / 1000,
+                    'p99_ms': summary['p99_us'] / 1000,
+                })
+            stats[op] = entry
+        return {
+            'uptime': time.time() - self.started,
+            'workers': self.workers,
+            'inflight': self.inflight,
+            'ops': stats,
+        }
+
+
+class Client:
+    """
+    同步客户端
+
+    用法:
+        with daemon.Client() as client:
+            key = client.request('generate', words=24, passphrase='')
+            results = client.pipeline([('verify', {'mnemonic': m}) for m in mnemonics])
+    """
+
+    def __init__(self, path=None, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_socket_path())
+        self._next_id = 0
+        self._buffer = b''
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _send(self, op, params):
+        self._next_id += 1
+        message = dict(params, id=self._next_id, op=op)
+        self.sock.sendall(encode_frame(message))
+        return self._next_id
+
+    def _recv_exact(self, n):
+        while len(self._buffer) < n:
+            chunk = self.sock.recv(max(65536, n - len(self._buffer)))
+            if not chunk:
+                raise ConnectionError("守护进程关闭了连接")
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+    def _recv(self):
+        length = FRAME_HEADER.unpack(self._recv_exact(FRAME_HEADER.size))[0]
+        return json.loads(self._recv_exact(length))
+
+    @staticmethod
+    def _unwrap(response):
+        if not response['ok']:
+            raise DaemonError(response['error'])
+        return response['result']
+
+    def request(self, op, **params):
+        """发送一个请求并等待结果, 出错时抛出 DaemonError"""
+        request_id = self._send(op, params)
+        while True:
+            response = self._recv()
+            if response['id'] == request_id:
+                return self._unwrap(response)
+
+    def pipeline(self, requests, window=32):
+        """
+        流水线发送多个请求
+
+        Args:
+            requests: (op, 参数字典) 列表
+            window: 最多同时在途的请求数 (避免双方缓冲区都写满而互相等待)
+
+        Returns:
+            list: 与 requests 顺序一致的结果; 失败的请求对应 DaemonError 实例
+        """
+        requests = list(requests)
+        results = [None] * len(requests)
+        positions = {}
+        sent = 0
+        received = 0
+        while received < len(requests):
+            while sent < len(requests) and sent - received < window:
+                op, params = requests[sent]
+                positions[self._send(op, params)] = sent
+                sent += 1
+            response = self._recv()
+            position = positions.pop(response['id'], None)
+            if position is None:
+                continue
+            results[position] = (DaemonError(response['error']) if not response['ok']
+                                 else response['result'])
+            received += 1
+        return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地密钥生成守护进程 (Unix域套接字)")
+    parser.add_argument('--socket', default=None, help=f"套接字路径 (默认取环境变量 {SOCKET_ENV} 或运行时目录)")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数 (默认为CPU核心数)")
+    parser.add_argument('--max-inflight', type=int, default=DEFAULT_MAX_INFLIGHT, help="每个连接的在途请求上限")
+    parser.add_argument('--metrics', default=None, help="定期写入Prometheus指标的文件路径")
+    parser.add_argument('--stats', action='store_true', help="查询正在运行的守护进程的统计信息")
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        with Client(args.socket) as client:
+            print(json.dumps(client.request('stats'), indent=2, ensure_ascii=False))
+        return 0
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("错误: 当前平台不支持Unix域套接字", file=sys.stderr)
+        return 1
+    daemon = KeygenDaemon(args.socket, args.workers, args.max_inflight, args.metrics)
+    try:
+        asyncio.run(daemon.serve_forever())
+    except RuntimeError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
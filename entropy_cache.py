@@ -0,0 +1,93 @@
+import threading
+import time
+
+# 静态熵源默认缓存时间(秒)
+DEFAULT_TTL = 300.0
+
+
+class SourceCache:
+    """
+    进程内静态熵源缓存
+
+    主机名/IP/MAC、平台信息、环境变量、文件元数据等熵源在两次调用之间几乎不变,
+    缓存后每个密钥只需采样易变的熵源。每次命中都会累计该熵源上次实际采样的耗时,
+    用来估算每个密钥节省的微秒数。
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        """
+        Args:
+            ttl: 缓存有效期(秒), 0 表示每次都重新采样
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # name -> (value, 采样时间, 采样耗时ns)
+        self._stats = {}    # name -> [命中次数, 未命中次数, 节省的ns]
+
+    def get(self, name, func):
+        """
+        读取熵源, 过期或不存在时调用func重新采样
+
+        Args:
+            name: 熵源名称
+            func: 无参数的采样函数, 抛出异常时不缓存
+
+        Returns:
+            bytes: 熵源数据
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0, 0])
+            entry = self._entries.get(name)
+            if entry is not None and now - entry[1] < self.ttl:
+                stats[0] += 1
+                stats[2] += entry[2]
+                return entry[0]
+            stats[1] += 1
+
+        start = time.perf_counter_ns()
+        value = func()
+        cost = time.perf_counter_ns() - start
+
+        with self._lock:
+            self._entries[name] = (value, time.monotonic(), cost)
+        return value
+
+    def invalidate(self, name=None):
+        """使某个熵源(或全部熵源)的缓存失效, 下次读取时重新采样"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self):
+        """
+        缓存统计
+
+        Returns:
+            dict: 每个熵源的命中/未命中次数和节省的微秒数,
+                  以及 saved_us_per_key (每个密钥平均节省的微秒数)
+        """
+        with self._lock:
+            sources = {}
+            saved_per_key = 0.0
+            for name, (hits, misses, saved_ns) in self._stats.items():
+                lookups = hits + misses
+                sources[name] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'saved_us': saved_ns / 1000,
+                }
+                # 每个密钥对每个熵源只读取一次
+                if lookups:
+                    saved_per_key += saved_ns / 1000 / lookups
+            return {'ttl': self.ttl, 'sources': sources, 'saved_us_per_key': saved_per_key}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# 默认的进程级缓存, 每个工作进程各自持有一份
+default_cache = SourceCache()
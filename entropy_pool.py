@@ -0,0 +1,221 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+# Fortuna 参数
+NUM_POOLS = 32
+MIN_POOL_SIZE = 64          # 池0累积到64字节才允许重新播种
+RESEED_INTERVAL = 0.1       # 两次重新播种之间至少间隔100ms
+MAX_REQUEST = 1 << 20       # 单次最多输出1MB, 之后必须换密钥
+
+# 后台收集默认参数
+COLLECT_INTERVAL = 0.05     # 每轮收集之间的最短休眠(秒)
+MAX_CPU = 0.05              # 后台收集线程最多占用单核5%的CPU
+
+logger = logging.getLogger(__name__)
+
+
+class EntropyPool:
+    """
+    Fortuna 风格的常驻熵累加器
+
+    后台收集线程把哈希后的样本轮流写入32个池, 取用时按 Fortuna 的调度
+    (第 r 次重新播种使用所有满足 2^i 整除 r 的池 i) 更新生成器密钥,
+    再用 SHA-256 计数器模式输出。取用本身只做几次哈希, 不需要等待收集线程。
+    """
+
+    def __init__(self, collect_interval=COLLECT_INTERVAL, max_cpu=MAX_CPU):
+        """
+        Args:
+            collect_interval: 每轮收集之间的最短休眠(秒)
+            max_cpu: 后台收集线程允许占用的CPU比例 (0-1)
+        """
+        self.collect_interval = collect_interval
+        self.max_cpu = max_cpu
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        """初始化(或在fork之后重置)全部状态"""
+        self._pid = os.getpid()
+        self._pools = [hashlib.sha256() for _ in range(NUM_POOLS)]
+        self._pool_bytes = [0] * NUM_POOLS
+        self._next_pool = {}
+        self._reseed_count = 0
+        self._last_reseed = 0.0
+        self._counter = 0
+        self._events = 0
+        self._busy_ns = 0
+        self._counters_warned = False
+        self._started_ns = time.perf_counter_ns()
+        # 以系统CSPRNG作为初始密钥, 保证在收集线程产出样本之前也能立即取用
+        self._key = hashlib.sha256(os.urandom(32)).digest()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _check_fork(self):
+        # fork出的子进程会复制父进程的池和密钥, 而且收集线程不会跟过来
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._reset()
+            self.start()
+
+    def add_event(self, source, data):
+        """
+        把一个熵样本写入下一个池 (每个熵源独立轮转)
+
+        Args:
+            source: 熵源编号 (0-255)
+            data: 样本数据, 超过32字节时先做哈希
+        """
+        if len(data) > 32:
+            data = hashlib.sha256(data).digest()
+        with self._lock:
+            i = self._next_pool.get(source, 0)
+            self._next_pool[source] = (i + 1) % NUM_POOLS
+            self._pools[i].update(bytes([source & 0xFF, len(data)]) + data)
+            self._pool_bytes[i] += len(data) + 2
+            self._events += 1
+
+    def _reseed(self):
+        self._reseed_count += 1
+        material = [self._key]
+        for i in range(NUM_POOLS):
+            if self._reseed_count % (1 << i):
+                break
+            material.append(self._pools[i].digest())
+            self._pools[i] = hashlib.sha256()
+            self._pool_bytes[i] = 0
+        material.append(os.urandom(32))
+        self._key = hashlib.sha256(hashlib.sha256(b''.join(material)).digest()).digest()
+        self._last_reseed = time.monotonic()
+
+    def _blocks(self, n):
+        out = bytearray()
+        while len(out) < n:
+            self._counter += 1
+            out += hashlib.sha256(self._key + self._counter.to_bytes(16, 'big')).digest()
+        return bytes(out[:n])
+
+    def random_data(self, n):
+        """
+        从累加器取出n字节熵
+
+        Args:
+            n: 字节数 (不超过1MB)
+
+        Returns:
+            bytes: 熵数据
+        """
+        if n > MAX_REQUEST:
+            raise ValueError("单次请求不能超过1MB")
+        self._check_fork()
+        with self._lock:
+            if (self._pool_bytes[0] >= MIN_POOL_SIZE
+                    and time.monotonic() - self._last_reseed >= RESEED_INTERVAL):
+                self._reseed()
+            data = self._blocks(n)
+            # 每次输出后更换密钥, 已输出的数据无法由当前状态反推
+            self._key = self._blocks(32)
+            return data
+
+    def _collect_once(self):
+        """一轮收集: 计时抖动、系统计数器和系统CSPRNG"""
+        # 计时抖动: 连续测量一小段哈希运算的耗时
+        jitter = bytearray()
+        data = os.urandom(64)
+        for _ in range(16):
+            t0 = time.perf_counter_ns()
+            data = hashlib.sha256(data).digest()
+            jitter += (time.perf_counter_ns() - t0).to_bytes(8, 'big')
+        self.add_event(0, bytes(jitter))
+
+        try:
+            import psutil
+        except ImportError:
+            self._counters_unavailable("未安装psutil")
+        else:
+            try:
+                counters = (
+                    str(psutil.cpu_times()) +
+                    str(psutil.virtual_memory()) +
+                    str(psutil.disk_io_counters()) +
+                    str(psutil.net_io_counters())
+                )
+            except (psutil.Error, OSError) as e:
+                # 容器等受限环境中部分计数器不可读; 本轮跳过池1, 其他池照常收集
+                self._counters_unavailable(f"{type(e).__name__}: {e}")
+            else:
+                self.add_event(1, counters.encode() + time.time_ns().to_bytes(8, 'big'))
+
+        self.add_event(2, os.urandom(32))
+
+    def _counters_unavailable(self, reason):
+        # 收集线程每轮都会重试: 只在第一次失败时警告, 之后只记调试日志
+        if self._counters_warned:
+            logger.debug("系统计数器不可用: %s", reason)
+        else:
+            self._counters_warned = True
+            logger.warning("系统计数器不可用, 跳过该熵源: %s", reason)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter_ns()
+            self._collect_once()
+            busy = time.perf_counter_ns() - start
+            self._busy_ns += busy
+            # 按CPU预算计算休眠时间: busy / (busy + sleep) <= max_cpu
+            sleep = max(self.collect_interval, busy / 1e9 * (1 / self.max_cpu - 1))
+            self._stop.wait(sleep)
+
+    def start(self):
+        """启动后台收集线程 (重复调用无副作用)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="entropy-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台收集线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self):
+        """
+        累加器状态
+
+        Returns:
+            dict: 运行状态、重新播种次数、各池已累积字节数、池0填充比例和收集线程CPU占用
+        """
+        with self._lock:
+            elapsed = time.perf_counter_ns() - self._started_ns
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'reseed_count': self._reseed_count,
+                'seconds_since_reseed': time.monotonic() - self._last_reseed if self._reseed_count else None,
+                'events': self._events,
+                'pool_bytes': list(self._pool_bytes),
+                'fill': min(1.0, self._pool_bytes[0] / MIN_POOL_SIZE),
+                'cpu': self._busy_ns / elapsed if elapsed else 0.0,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """返回进程级的熵累加器, 首次调用时启动后台收集线程"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = EntropyPool()
+                _pool.start()
+    return _pool
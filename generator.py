@@ -1,4 +1,4 @@
-from hashlib import sha256, pbkdf2_hmac
+from hashlib import sha256
 import secrets
 import binascii
 import datetime
@@ -6,41 +6,107 @@ import time
 import hmac
 import hashlib
 import random
-import socket
-import uuid
-import platform
-import psutil
 import os
 import string
 import threading
 import queue
-import ctypes
-import multiprocessing
+import collections
+import argparse
+import getpass
+import logging
+import sys
+import entropy_cache
+import entropy_pool
+import bip39
+import bip38
+import keypool
+import bip32
+import secp256k1
+import address
+import seed as seed_module
+import stream_output
+import instrumentation
+import health
+import source_scheduler
+import wordlist as wordlist_module
+from base58 import b58encode, checksum as base58_checksum
+from secure_buffer import scratch
+from source_scheduler import Source, SourceUnusable
 
-# Base58 字符集
-ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+# 额外熵阶段默认预算: 从系统CSPRNG读取1MB, 每块64KB
+EXTRA_ENTROPY_BYTES = 1024 * 1024
+EXTRA_ENTROPY_CHUNK = 64 * 1024
+# 旧版额外熵: 1000万个随机字符 (a-z, A-Z, 0-9)
+LEGACY_EXTRA_CHARS = 10000000
 
-def b58encode(v):
-    # Base58 编码实现
-    nPad = len(v)
-    v = v.lstrip(b'\0')
-    nPad -= len(v)
+logger = logging.getLogger(__name__)
 
-    p, acc = 1, 0
-    for c in reversed(v):
-        acc += p * c
-        p = p << 8
+class GenerationCancelled(Exception):
+    """生成过程被调用方取消"""
 
-    result = ''
-    while acc:
-        acc, idx = divmod(acc, 58)
-        result = ALPHABET[idx] + result
+def _check_cancel(cancel):
+    # cancel 为 threading.Event, 在各熵源之间检查
+    if cancel is not None and cancel.is_set():
+        raise GenerationCancelled()
 
-    return '1' * nPad + result
+def collect_extra_entropy(byte_budget=None, time_budget=None, legacy=False, chunk_size=EXTRA_ENTROPY_CHUNK,
+                          monitor=None):
+    """
+    批量额外熵阶段: 分块读取系统CSPRNG并流式哈希
+    
+    Args:
+        byte_budget: 最多处理的字节数, 默认1MB (旧模式下为字符数, 默认1000万)
+        time_budget: 最长耗时(秒), None表示只受字节预算限制
+        legacy: 为True时保持旧版语义 (对随机字符串做SHA256), 用于前后性能对比
+        chunk_size: 每次读取的块大小
+        monitor: 可选的 health.HealthMonitor, 每次调用对第一个块做健康测试
+    
+    Returns:
+        (bytes, int): 8字节额外熵, 以及实际处理的字节(或字符)数
+    """
+    hasher = hashlib.sha256()
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    
+    if legacy:
+        # 与旧实现相同: 随机字符逐块生成后送入哈希, 不再拼接出完整的大字符串
+        chars = string.ascii_letters + string.digits
+        total = LEGACY_EXTRA_CHARS if byte_budget is None else byte_budget
+        read = 0
+        while read < total:
+            n = min(chunk_size, total - read)
+            hasher.update(''.join(secrets.choice(chars) for _ in range(n)).encode())
+            read += n
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return hasher.digest()[:8], read
+    
+    total = EXTRA_ENTROPY_BYTES if byte_budget is None else byte_budget
+    read = 0
+    while read < total:
+        n = min(chunk_size, total - read)
+        chunk = os.urandom(n)
+        if monitor is not None and not read:
+            monitor.record('extra_random', chunk)
+        hasher.update(chunk)
+        read += n
+        # 至少读取一个块, 之后超时即停止
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    return hasher.digest()[:8], read
 
-def load_wordlist():
-    with open('english.txt', 'r') as f:
-        return [w.strip() for w in f.readlines()]
+# psutil/socket/uuid/platform/multiprocessing 只在对应熵源或批量模式中导入, 缩短启动时间
+
+def load_wordlist(language=wordlist_module.DEFAULT_LANGUAGE):
+    """
+    加载BIP39词表 (与当前工作目录无关, 进程内只构建一次)
+    
+    Args:
+        language: 词表语言, 默认英文; 其他语言的词表文件需放在程序目录或 wordlists/ 子目录
+    
+    Returns:
+        wordlist.Wordlist: 单词元组, 附带单词索引、4字母前缀索引和拼写建议
+    """
+    return wordlist_module.load(language)
 
 # 添加多线程竞争熵收集函数
 def collect_thread_entropy(size=32):
@@ -53,6 +119,9 @@ def collect_thread_entropy(size=32):
     Returns:
         bytes: 熵数据
     """
+    import multiprocessing
+    import psutil
+    
     entropy_queue = queue.Queue()
     results = []
     
@@ -148,10 +217,11 @@ def collect_thread_entropy(size=32):
             try:
                 if os.path.exists(temp_filename):
                     os.unlink(temp_filename)
-            except:
-                pass
+            except OSError as e:
+                logger.warning("无法删除临时文件 %s: %s", temp_filename, e)
     
     # 启动多个线程
+    spawn_span = instrumentation.start('phase', 'thread_spawn')
     threads = []
     num_threads = min(8, multiprocessing.cpu_count() * 2)  # 使用2倍CPU核心数的线程
     
@@ -169,8 +239,10 @@ def collect_thread_entropy(size=32):
     
     mem_thread.start()
     io_thread.start()
+    spawn_span.end()
     
     # 收集结果直到获取足够的熵
+    collect_span = instrumentation.start('phase', 'thread_collect')
     timeout = 0.5  # 最长等待0.5秒
     end_time = time.time() + timeout
     
@@ -182,12 +254,18 @@ def collect_thread_entropy(size=32):
             # 队列为空，可能需要等待更长时间
             pass
     
+    collect_span.end()
+    
     # 等待线程完成
-    for t in threads:
-        t.join(timeout=0.1)  # 最多等待0.1秒
+    with instrumentation.span('phase', 'thread_join'):
+        for t in threads:
+            t.join(timeout=0.1)  # 最多等待0.1秒
     
     # 组合所有收集到的熵
-    all_data = b''
+    mix_span = instrumentation.start('phase', 'thread_mix')
+    # 增量哈希, 不再反复拼接 all_data (结果与拼接后一次哈希相同)
+    hasher = hashlib.sha256()
+    length = 0
     for result in results:
         # 将结果的所有字段转换为字节并连接
         task_id, iteration, timestamp, data = result
@@ -197,18 +275,140 @@ def collect_thread_entropy(size=32):
         iteration_bytes = str(iteration).encode() if not isinstance(iteration, bytes) else iteration
         timestamp_bytes = str(timestamp).encode() if not isinstance(timestamp, bytes) else timestamp
         
-        # 连接所有字节
-        all_data += task_id_bytes + iteration_bytes + timestamp_bytes + data
+        for part in (task_id_bytes, iteration_bytes, timestamp_bytes, data):
+            hasher.update(part)
+            length += len(part)
     
     # 如果收集的数据不足，添加一些随机数据
-    if len(all_data) < size * 2:  # 确保有足够的数据进行哈希处理
-        all_data += os.urandom(size * 2 - len(all_data))
+    if length < size * 2:  # 确保有足够的数据进行哈希处理
+        hasher.update(os.urandom(size * 2 - length))
     
     # 使用SHA-256哈希处理所有收集的数据
-    final_entropy = hashlib.sha256(all_data).digest()[:size]
+    final_entropy = hasher.digest()[:size]
+    mix_span.end()
     return final_entropy
 
-def generate_new_key(wordlist, verbose=True, word_count=12, mouse_entropy=None):
+def network_source(monitor=None):
+    """主机名、IP地址和MAC地址"""
+    import socket
+    import uuid
+    
+    # 获取主机名和IP地址
+    hostname = socket.gethostname().encode()
+    try:
+        ip_address = socket.gethostbyname(hostname).encode()
+    except OSError as e:
+        logger.debug("解析主机名失败 (%s), 使用 127.0.0.1", e)
+        ip_address = b'127.0.0.1'
+        
+    # 获取MAC地址
+    node = uuid.getnode()
+    mac_address = node.to_bytes(6, 'big')
+    # 读取不到硬件地址时 uuid.getnode() 返回置了组播位的随机数, 每个进程都不同
+    if monitor is not None and node & (1 << 40):
+        monitor.flag('network', "uuid.getnode() 未取得硬件MAC地址, 返回的是随机值")
+    
+    # 混合网络信息
+    return sha256(hostname + ip_address + mac_address).digest()[:8]
+
+def platform_source():
+    """平台和Python构建信息"""
+    import platform
+    
+    system_info = platform.platform().encode()
+    python_build = ''.join(platform.python_build()).encode()
+    return system_info + python_build
+
+def system_source(platform_info, monitor=None):
+    """
+    平台信息与CPU、内存、磁盘使用情况 (后者每次采样)
+    
+    Args:
+        platform_info: platform_source() 的结果
+        monitor: 可选的 health.HealthMonitor, 未通过健康测试的采样改用系统CSPRNG字节
+    """
+    import psutil
+    
+    # CPU和内存信息
+    cpu_percent = str(psutil.cpu_percent()).encode()
+    memory_info = str(psutil.virtual_memory()).encode()
+    disk_info = str(psutil.disk_usage('/')).encode()
+    if monitor is not None:
+        cpu_percent = _checked(monitor, 'cpu_percent', cpu_percent)
+    
+    # 混合系统信息
+    return sha256(platform_info + cpu_percent + memory_info + disk_info).digest()[:8]
+
+def _checked(monitor, name, sample):
+    """送入健康测试; 熵源被排除时用同样长度的系统CSPRNG字节代替原始采样"""
+    if monitor.record(name, sample):
+        return sample
+    return secrets.token_bytes(max(len(sample), 8))
+
+def delay_source():
+    """8次随机延迟"""
+    delay_entropy = b''
+    for _ in range(8):
+        # 随机微秒延迟
+        delay = random.uniform(0.001, 0.01)
+        time.sleep(delay)
+        delay_ns = int(delay * 1_000_000_000)
+        delay_entropy += (delay_ns & 0xFF).to_bytes(1, 'big')
+    return delay_entropy
+
+def environ_source():
+    """环境变量"""
+    env_str = str(os.environ).encode()
+    return sha256(env_str).digest()[:8]
+
+def file_source():
+    """临时目录和系统目录的文件元数据"""
+    import platform
+    
+    dirs_to_scan = ['/tmp', '/var/log', '/etc'] if platform.system() != 'Windows' else ['C:\\Windows\\Temp', 'C:\\Windows\\System32\\config']
+    
+    # 选择一个存在的目录
+    target_dir = None
+    for d in dirs_to_scan:
+        if os.path.exists(d) and os.path.isdir(d):
+            target_dir = d
+            break
+    
+    if not target_dir:
+        # 找不到合适的目录, 由调用方改用随机字节
+        raise FileNotFoundError("没有可扫描的目录")
+    
+    # 快速列出目录内容并获取文件大小、修改时间等元数据
+    file_data = []
+    for entry in os.scandir(target_dir):
+        try:
+            stats = entry.stat()
+            # 收集文件大小、修改时间、inode号等
+            file_data.append(stats.st_size)
+            file_data.append(stats.st_mtime_ns)
+            file_data.append(stats.st_ino)
+            # 只收集最多50个文件的信息，保证速度
+            if len(file_data) > 150:
+                break
+        except (PermissionError, FileNotFoundError):
+            pass
+    
+    # 将收集到的数据转换为字节
+    file_info_str = ''.join(str(x) for x in file_data).encode()
+    return sha256(file_info_str).digest()[:8]
+
+def generate_new_key(wordlist, verbose=True, word_count=12, mouse_entropy=None,
+                     extra_bytes=None, extra_time=None, legacy_extra=False, source_cache=None,
+                     cancel=None, health_monitor=None, scheduler=None):
+    # cancel 为可选的 threading.Event, 置位后在下一个熵源之前抛出 GenerationCancelled
+    # scheduler 为可选的 source_scheduler.SourceScheduler, 默认使用进程级的调度器
+    _check_cancel(cancel)
+    # 每个非静态熵源的原始采样都送入 SP 800-90B 健康测试
+    monitor = health_monitor or health.default_monitor
+    
+    # 收集阶段 (计时事件只包含阶段名和耗时, 不包含任何熵数据)
+    collect_span = instrumentation.start('phase', 'collect')
+    
     # 获取当前时间信息
     current_time = datetime.datetime.now()
     timestamp = int(time.time() * 1000)
@@ -224,288 +424,252 @@ def generate_new_key(wordlist, verbose=True, word_count=12, mouse_entropy=None):
     system_random = random.SystemRandom()
     sys_random_bytes = system_random.getrandbits(64).to_bytes(8, 'big')
     
-    # 生成熵 (16字节/128位 用于12个单词, 32字节/256位 用于24个单词)
-    entropy_size = 32 if word_count == 24 else 16
+    # 生成熵 (12/15/18/21/24 个单词分别对应 16/20/24/28/32 字节)
+    entropy_size = bip39.entropy_size(word_count)
     random_entropy = secrets.token_bytes(entropy_size)
     
-    # 生成1000万个随机字符 (a-z, A-Z, 0-9)
-    chars = string.ascii_letters + string.digits
-    extra_random = ''.join(secrets.choice(chars) for _ in range(10000000))
-    extra_entropy = sha256(extra_random.encode()).digest()[:8]  # 取前8字节
+    cache = source_cache or entropy_cache.default_cache
+    extra_length = 0
     
-    # 1. 添加网络接口信息作为熵源
-    try:
-        # 获取主机名和IP地址
-        hostname = socket.gethostname().encode()
-        try:
-            ip_address = socket.gethostbyname(hostname).encode()
-        except:
-            ip_address = b'127.0.0.1'
-            
-        # 获取MAC地址
-        mac_address = uuid.getnode().to_bytes(6, 'big')
-        
-        # 混合网络信息
-        network_entropy = sha256(hostname + ip_address + mac_address).digest()[:8]
-    except:
-        network_entropy = secrets.token_bytes(8)
+    # 批量额外熵 (legacy_extra=True 时使用旧版1000万随机字符)
+    def extra_random():
+        nonlocal extra_length
+        extra_entropy, extra_length = collect_extra_entropy(extra_bytes, extra_time, legacy_extra,
+                                                            monitor=monitor)
+        if not monitor.usable('extra_random'):
+            raise SourceUnusable("未通过健康测试")
+        return extra_entropy
     
-    # 2. 添加系统信息作为熵源
-    try:
-        # 系统信息
-        system_info = platform.platform().encode()
-        python_build = ''.join(platform.python_build()).encode()
-        
-        # CPU和内存信息
-        cpu_percent = str(psutil.cpu_percent()).encode()
-        memory_info = str(psutil.virtual_memory()).encode()
-        disk_info = str(psutil.disk_usage('/')).encode()
-        
-        # 混合系统信息
-        system_entropy = sha256(system_info + python_build + cpu_percent + memory_info + disk_info).digest()[:8]
-    except:
-        system_entropy = secrets.token_bytes(8)
+    # 1. 网络接口信息 (静态, 走缓存)
+    def network():
+        return cache.get('network', lambda: network_source(monitor))
     
-    # 3. 添加进程信息作为熵源
-    try:
+    # 2. 系统信息 (平台信息走缓存, CPU/内存/磁盘每次采样)
+    def system():
+        platform_info = cache.get('platform', platform_source)
+        system_entropy = system_source(platform_info, monitor)
+        if not monitor.usable('cpu_percent'):
+            raise SourceUnusable("cpu_percent 未通过健康测试")
+        return system_entropy
+    
+    # 3. 进程信息
+    def process():
         process_id = os.getpid().to_bytes(4, 'big')
-        process_entropy = sha256(process_id + str(time.process_time_ns()).encode()).digest()[:8]
-    except:
-        process_entropy = secrets.token_bytes(8)
+        process_time = _checked(monitor, 'process', str(time.process_time_ns()).encode())
+        return sha256(process_id + process_time).digest()[:8]
     
-    # 4. 添加环境变量作为熵源
-    try:
-        env_str = str(os.environ).encode()
-        env_entropy = sha256(env_str).digest()[:8]
-    except:
-        env_entropy = secrets.token_bytes(8)
+    # 4. 环境变量 (静态, 走缓存)
+    def environ():
+        return cache.get('environ', environ_source)
     
-    # 5. 添加随机延迟作为熵源
-    delay_entropy = b''
-    for _ in range(8):
-        # 随机微秒延迟
-        delay = random.uniform(0.001, 0.01)
-        time.sleep(delay)
-        delay_ns = int(delay * 1_000_000_000)
-        delay_entropy += (delay_ns & 0xFF).to_bytes(1, 'big')
+    # 5. 随机延迟
+    def delays():
+        delay_entropy = delay_source()
+        if not monitor.record('delays', delay_entropy):
+            raise SourceUnusable("未通过健康测试")
+        return delay_entropy
     
-    # 6. 使用新的线程竞争熵替代鼠标熵
-    thread_entropy = collect_thread_entropy(8)  # 收集8字节的线程竞争熵
+    # 6. 从常驻熵累加器取线程竞争/计时抖动熵 (不再每次启动线程收集)
+    def thread_pool():
+        thread_entropy = entropy_pool.get_pool().random_data(8)
+        if not monitor.record('thread_pool', thread_entropy):
+            raise SourceUnusable("未通过健康测试")
+        return thread_entropy
     
-    # 7. 添加文件系统熵源
-    try:
-        # 获取临时目录和系统目录的文件统计信息
-        file_entropy = b''
-        dirs_to_scan = ['/tmp', '/var/log', '/etc'] if platform.system() != 'Windows' else ['C:\\Windows\\Temp', 'C:\\Windows\\System32\\config']
-        
-        # 选择一个存在的目录
-        target_dir = None
-        for d in dirs_to_scan:
-            if os.path.exists(d) and os.path.isdir(d):
-                target_dir = d
-                break
-        
-        if target_dir:
-            # 快速列出目录内容并获取文件大小、修改时间等元数据
-            file_data = []
-            for entry in os.scandir(target_dir):
-                try:
-                    stats = entry.stat()
-                    # 收集文件大小、修改时间、inode号等
-                    file_data.append(stats.st_size)
-                    file_data.append(stats.st_mtime_ns)
-                    file_data.append(stats.st_ino)
-                    # 只收集最多50个文件的信息，保证速度
-                    if len(file_data) > 150:
-                        break
-                except (PermissionError, FileNotFoundError):
-                    pass
-            
-            # 将收集到的数据转换为字节
-            file_info_str = ''.join(str(x) for x in file_data).encode()
-            file_entropy = sha256(file_info_str).digest()[:8]
-        else:
-            # 如果找不到合适的目录，使用随机字节
-            file_entropy = secrets.token_bytes(8)
-    except:
-        file_entropy = secrets.token_bytes(8)
-    
-    # 混合所有熵源
-    if entropy_size == 16:
-        # 修改现有的混合逻辑，添加线程竞争熵源替代鼠标熵源
-        mixed_entropy = bytes([
-            a ^ b ^ c ^ d ^ e ^ f ^ g ^ h ^ i ^ j ^ k ^ l ^ m
-            for a, b, c, d, e, f, g, h, i, j, k, l, m in zip(
-                time_bytes + time_bytes,
-                perf_counter_bytes + perf_counter_bytes,
-                process_time_bytes + process_time_bytes,
-                sys_random_bytes + sys_random_bytes,
-                random_entropy,
-                extra_entropy + extra_entropy,
-                network_entropy + network_entropy,
-                system_entropy + system_entropy,
-                process_entropy + process_entropy,
-                env_entropy + env_entropy,
-                delay_entropy + delay_entropy,
-                thread_entropy + thread_entropy,  # 使用线程竞争熵替代鼠标熵
-                file_entropy + file_entropy
-            )
-        ])
-    else:  # 对于24个单词，需要更多的熵
-        # 创建足够长的字节序列
-        time_entropy = time_bytes * 4
-        perf_entropy = perf_counter_bytes * 4
-        proc_entropy = process_time_bytes * 4
-        sys_entropy = sys_random_bytes * 4
-        extra_entropy_extended = extra_entropy * 4
-        network_entropy_extended = network_entropy * 4
-        system_entropy_extended = system_entropy * 4
-        process_entropy_extended = process_entropy * 4
-        env_entropy_extended = env_entropy * 4
-        delay_entropy_extended = delay_entropy * 4
-        thread_entropy_extended = thread_entropy * 4  # 线程竞争熵
-        file_entropy_extended = file_entropy * 4
-        
-        # 确保所有序列至少有32字节长
-        mixed_entropy = bytes([
-            a ^ b ^ c ^ d ^ e ^ f ^ g ^ h ^ i ^ j ^ k ^ l ^ m
-            for a, b, c, d, e, f, g, h, i, j, k, l, m in zip(
-                time_entropy[:32],
-                perf_entropy[:32],
-                proc_entropy[:32],
-                sys_entropy[:32],
-                random_entropy,
-                extra_entropy_extended[:32],
-                network_entropy_extended[:32],
-                system_entropy_extended[:32],
-                process_entropy_extended[:32],
-                env_entropy_extended[:32],
-                delay_entropy_extended[:32],
-                thread_entropy_extended[:32],  # 使用线程竞争熵替代鼠标熵
-                file_entropy_extended[:32]
-            )
-        ])
-    
-    # 额外的SHA256哈希来进一步混合熵
-    entropy = sha256(mixed_entropy).digest()[:entropy_size]
+    # 7. 文件系统元数据 (静态, 走缓存)
+    def files():
+        return cache.get('files', file_source)
+    
+    sources = [
+        Source('network', network), Source('system', system), Source('process', process),
+        Source('environ', environ), Source('delays', delays), Source('thread_pool', thread_pool),
+        Source('files', files),
+    ]
+    if legacy_extra:
+        # 旧版额外熵需要数秒, 保持原来的串行语义, 不设截止时间
+        extra = source_scheduler.SourceScheduler(max_workers=0).run([Source('extra_random', extra_random)])
+    else:
+        # 显式的时间预算之外再留出默认截止时间
+        sources.append(Source('extra_random', extra_random,
+                              extra_time + source_scheduler.DEFAULT_DEADLINE if extra_time is not None else None))
+        extra = {}
+    
+    _check_cancel(cancel)
+    # 所有熵源并发运行; 超时、出错或未通过健康测试的熵源改用CSPRNG字节并记录日志
+    collected = (scheduler or source_scheduler.get_scheduler()).run(sources)
+    collected.update(extra)
+    
+    collect_span.end()
+    _check_cancel(cancel)
+    
+    # 混合所有熵源 (在锁定的秘密缓冲区中原地异或)
+    mix_span = instrumentation.start('phase', 'mix')
+    entropy = mix_entropy(random_entropy, (
+        time_bytes, perf_counter_bytes, process_time_bytes, sys_random_bytes,
+        collected['extra_random'], collected['network'], collected['system'], collected['process'],
+        collected['environ'], collected['delays'],
+        collected['thread_pool'],  # 使用线程竞争熵替代鼠标熵
+        collected['files'],
+    ))
+    mix_span.end()
 
     if verbose:
         print(f"\n使用时间生成: {current_time.strftime('%Y-%m-%d %H:%M:%S.%f')}")
         print(f"性能计数器: {time.perf_counter()}")
         print(f"进程时间: {time.process_time()}")
-        print(f"额外随机字符长度: {len(extra_random)}")
+        if legacy_extra:
+            print(f"额外随机字符长度: {extra_length}")
+        else:
+            print(f"额外随机数据长度: {extra_length} 字节")
         print("已添加线程竞争熵")  # 更新提示
         print("已添加文件系统熵")
         print(f"生成 {word_count} 个单词的助记词")
 
-    # 计算校验和
-    entropy_bits = bin(int.from_bytes(entropy, 'big'))[2:].zfill(entropy_size * 8)
-    checksum_bits_count = entropy_size * 8 // 32  # 12个单词为4位，24个单词为8位
-    checksum = bin(int(sha256(entropy).hexdigest(), 16))[2:].zfill(256)[:checksum_bits_count]
-
-    # 组合熵和校验和
-    combined_bits = entropy_bits + checksum
-
-    # 将比特分成11位的组，并转换为助记词
-    indexes = [int(combined_bits[i:i+11], 2) for i in range(0, len(combined_bits), 11)]
-    mnemonic = ' '.join(wordlist[index] for index in indexes)
+    # 计算校验和 (直接读取缓冲区, 用完立即清零)
+    with instrumentation.span('phase', 'checksum'):
+        with entropy:
+            indexes = bip39.entropy_to_indexes(entropy.view())
+    
+    # 转换为助记词
+    with instrumentation.span('phase', 'encode'):
+        mnemonic = getattr(wordlist, 'separator', ' ').join(wordlist[index] for index in indexes)
     
     return mnemonic, current_time
 
-def mnemonic_to_private_key(mnemonic, timestamp):
-    salt = 'mnemonic' + timestamp.strftime('%Y%m%d%H%M%S')
-    seed = pbkdf2_hmac('sha512', mnemonic.encode(), salt.encode(), 2048)
+def mix_entropy(random_entropy, sources):
+    """
+    各熵源循环重复后与随机熵逐字节异或, 再做一次SHA256
     
-    # 从种子派生主私钥 (使用 BIP32)
-    master_key = hmac.new(b'Bitcoin seed', seed, hashlib.sha512).digest()
-    master_private_key = master_key[:32]
-    master_chain_code = master_key[32:]
+    在锁定的秘密缓冲区中原地计算, 不再为每个熵源拼接出重复的字节串。
     
-    return seed, master_private_key
+    Args:
+        random_entropy: 与最终熵等长的CSPRNG字节
+        sources: 各熵源的字节串
+    
+    Returns:
+        secure_buffer.SecretBuffer: 本线程复用的最终熵缓冲区, 调用方在 with 块中使用, 结束时清零
+    """
+    size = len(random_entropy)
+    with scratch('mix', size) as mixed:
+        mixed.write(random_entropy)
+        for source in sources:
+            mixed.xor_cycle(source)
+        digest = sha256(mixed.view()).digest()
+    entropy = scratch('entropy', size)
+    entropy.write(memoryview(digest)[:size])
+    return entropy
 
-def to_wif(private_key, compressed=True, testnet=False):
-    version = b'\xef' if testnet else b'\x80'
-    extended_key = version + private_key
+def mnemonic_to_private_key(mnemonic, timestamp=None, passphrase=None, cache=None):
+    """
+    助记词 -> (种子, 主私钥)
     
-    if compressed:
-        extended_key += b'\x01'
+    Args:
+        mnemonic: 助记词
+        timestamp: 生成时间, 旧版模式下作为盐值的一部分
+        passphrase: 不为None时使用BIP39标准盐值 'mnemonic' + passphrase,
+                    种子可在其他钱包中复现; 为None时使用旧版盐值
+        cache: 可选的 seed.SeedCache
+    """
+    if passphrase is not None:
+        salt = seed_module.bip39_salt(passphrase)
+    elif timestamp is not None:
+        salt = seed_module.legacy_salt(timestamp)
+    else:
+        raise ValueError("旧版模式需要生成时间，或提供passphrase使用BIP39标准模式")
+    seed = seed_module.derive_seed(mnemonic, salt, cache)
     
-    double_sha256 = hashlib.sha256(hashlib.sha256(extended_key).digest()).digest()
-    extended_key += double_sha256[:4]
+    # 从种子派生主私钥 (使用 BIP32), 一次性HMAC不创建中间对象
+    # 种子和主私钥按接口约定返回 bytes: hmac/hashlib 只能输出新的 bytes, 无法写入秘密缓冲区,
+    # 放进缓冲区只会多一份副本; 只有 PBKDF2 的输入 (助记词和盐值) 在秘密缓冲区中编码
+    master_private_key = hmac.digest(b'Bitcoin seed', seed, 'sha512')[:32]
     
-    return b58encode(extended_key)
+    return seed, master_private_key
+
+def to_wif(private_key, compressed=True, testnet=False):
+    """私钥 -> WIF; 载荷和校验和在秘密缓冲区中原地组装, 不拼接字节串"""
+    size = 34 if compressed else 33
+    with scratch('wif', size + 4) as payload:
+        view = payload.view()
+        view[0] = 0xef if testnet else 0x80
+        view[1:33] = private_key
+        if compressed:
+            view[33] = 1
+        view[size:] = base58_checksum(view[:size])
+        return b58encode(view)
 
 def validate_word(word, wordlist):
-    """验证单词是否在BIP39词表中"""
-    return word in wordlist
+    """验证单词是否在BIP39词表中 (接受NFKD等价、不带重音的写法和唯一的4字母前缀)"""
+    return _word_index(word, wordlist) is not None
+
+def _word_index(word, wordlist):
+    lookup = getattr(wordlist, 'lookup', None)
+    if lookup is not None:
+        return lookup(word)
+    return bip39.word_index(wordlist).get(word)
+
+def _suggestion_hint(word, wordlist):
+    suggest = getattr(wordlist, 'suggest', None)
+    suggestions = suggest(word) if suggest is not None else []
+    return f", 是否是: {', '.join(suggestions)}" if suggestions else ""
 
-def generate_custom_mnemonic(wordlist, custom_words, positions):
+def generate_custom_mnemonic(wordlist, custom_words, positions, word_count=12):
     """
     生成包含自定义词的助记词
     
+    只抽取一次熵: 空闲位置使用一次完整生成得到的随机单词, 再直接求解校验和,
+    不再反复生成直到校验和碰巧成立。
+    
     Args:
         wordlist: BIP39词表
         custom_words: 自定义词列表
         positions: 自定义词要插入的位置列表 (从1开始)
+        word_count: 助记词单词数量 (12/15/18/21/24)
     """
+    bip39.entropy_size(word_count)
+    
     # 验证输入
-    if not all(1 <= p <= 12 for p in positions):
-        raise ValueError("位置必须在1到12之间")
+    if not all(1 <= p <= word_count for p in positions):
+        raise ValueError(f"位置必须在1到{word_count}之间")
     if len(custom_words) != len(positions):
         raise ValueError("自定义词的数量必须与位置数量相同")
     if len(set(positions)) != len(positions):
         raise ValueError("位置不能重复")
-    if not all(validate_word(word, wordlist) for word in custom_words):
-        raise ValueError("所有自定义词必须在BIP39词表中")
+    for word in custom_words:
+        if not validate_word(word, wordlist):
+            raise ValueError(f"单词 {word!r} 不在BIP39词表中{_suggestion_hint(word, wordlist)}")
     
     # 获取当前时间和基础熵
     current_time = datetime.datetime.now()
-    max_attempts = 1000  # 设置最大尝试次数
-    attempt = 0
-    
-    print("\n正在寻找符合条件的助记词...")
-    while attempt < max_attempts:
-        attempt += 1
-        # 生成基础助记词，禁用详细输出
-        mnemonic, _ = generate_new_key(wordlist, verbose=False)
-        words = mnemonic.split()
-        
-        # 在指定位置插入自定义词
-        for word, pos in zip(custom_words, positions):
-            words[pos-1] = word
-            
-        # 验证新的助记词是否有效
-        new_mnemonic = ' '.join(words)
-        if verify_mnemonic(new_mnemonic, wordlist):
-            return new_mnemonic, current_time
+    mnemonic, _ = generate_new_key(wordlist, verbose=False, word_count=word_count)
+    indexes = bip39.mnemonic_to_indexes(mnemonic, wordlist)
+    
+    # 在指定位置插入自定义词
+    for word, pos in zip(custom_words, positions):
+        indexes[pos-1] = _word_index(word, wordlist)
+    
+    if word_count not in positions:
+        # 最后一个单词未被指定: 保留其熵位, 直接算出校验和位
+        indexes[-1] = bip39.solve_last_word(indexes)
+    else:
+        # 最后一个单词已被指定: 在空闲位置上只枚举满足校验和的候选词, 随机选一个
+        free = [p - 1 for p in range(1, word_count + 1) if p not in positions]
+        random.SystemRandom().shuffle(free)
+        if not free and not bip39.indexes_to_entropy(indexes)[1]:
+            raise ValueError("所有位置都已指定，但这组单词的校验和不成立")
+        for pos in free:
+            candidates = bip39.checksum_candidates(indexes, pos)
+            if candidates:
+                indexes[pos] = secrets.choice(candidates)
+                break
+        else:
+            if free:
+                raise ValueError("无法生成符合条件的助记词，请尝试使用不同的自定义词")
     
-    raise ValueError("无法生成符合条件的助记词，请尝试使用不同的自定义词")
+    return getattr(wordlist, 'separator', ' ').join(wordlist[i] for i in indexes), current_time
 
 def verify_mnemonic(mnemonic, wordlist):
     """验证助记词是否符合BIP39标准"""
-    words = mnemonic.split()
-    word_count = len(words)
-    
-    if word_count not in [12, 24]:
-        return False
-    
-    # 确定熵大小
-    entropy_size = 32 if word_count == 24 else 16
-    checksum_bits_count = entropy_size * 8 // 32  # 12个单词为4位，24个单词为8位
-        
-    # 将助记词转换回二进制
-    word_indexes = [wordlist.index(word) for word in words]
-    bits = ''.join(bin(index)[2:].zfill(11) for index in word_indexes)
-    
-    # 分离熵和校验和
-    entropy_bits = bits[:entropy_size * 8]
-    checksum_bits = bits[entropy_size * 8:]
-    
-    # 验证校验和
-    entropy_bytes = int(entropy_bits, 2).to_bytes(entropy_size, 'big')
-    checksum = bin(int(sha256(entropy_bytes).hexdigest(), 16))[2:].zfill(256)[:checksum_bits_count]
-    
-    return checksum_bits == checksum
+    return bip39.verify_mnemonic(mnemonic, wordlist)
 
 def generate_from_entropy(wordlist, entropy_input, word_count=12):
     """
@@ -514,31 +678,477 @@ def generate_from_entropy(wordlist, entropy_input, word_count=12):
     Args:
         wordlist: BIP39词表
         entropy_input: 输入熵（字节）
-        word_count: 助记词单词数量 (12 或 24)
+        word_count: 助记词单词数量 (12/15/18/21/24)
     """
     current_time = datetime.datetime.now()
     
     # 确定熵大小
-    entropy_size = 32 if word_count == 24 else 16
+    entropy_size = bip39.entropy_size(word_count)
     
     # 使用SHA256处理输入熵
-    entropy = sha256(entropy_input).digest()[:entropy_size]
+    with scratch('entropy', entropy_size) as entropy:
+        entropy.write(memoryview(sha256(entropy_input).digest())[:entropy_size])
+        # 计算校验和并转换为助记词
+        mnemonic = bip39.entropy_to_mnemonic(entropy.view(), wordlist)
+    
+    return mnemonic, current_time
+
+# 批量生成时每个工作进程持有的词表
+_batch_wordlist = None
+
+def _batch_init():
+    """工作进程初始化: 重新播种随机数并加载词表"""
+    global _batch_wordlist
+    # fork出来的子进程会继承父进程的random状态, 必须各自重新播种
+    random.seed(os.urandom(32))
+    _batch_wordlist = load_wordlist()
+
+def _batch_generate(task):
+    """在工作进程中完成一次完整的生成流程"""
+    word_count, passphrase = task
+    if _batch_wordlist is None:
+        _batch_init()
+    mnemonic, current_time = generate_new_key(_batch_wordlist, verbose=False, word_count=word_count)
+    seed, master_private_key = mnemonic_to_private_key(mnemonic, current_time, passphrase)
+    return mnemonic, seed, master_private_key, to_wif(master_private_key)
+
+def generate_batch(n, word_count=12, workers=None, passphrase=None):
+    """
+    使用进程池批量生成助记词和私钥
     
-    # 计算校验和
-    entropy_bits = bin(int.from_bytes(entropy, 'big'))[2:].zfill(entropy_size * 8)
-    checksum_bits_count = entropy_size * 8 // 32  # 12个单词为4位，24个单词为8位
-    checksum = bin(int(sha256(entropy).hexdigest(), 16))[2:].zfill(256)[:checksum_bits_count]
+    Args:
+        n: 要生成的数量
+        word_count: 助记词单词数量 (12/15/18/21/24)
+        workers: 工作进程数, 默认为CPU核心数
+        passphrase: 不为None时使用BIP39标准种子派生
     
-    # 组合熵和校验和
-    combined_bits = entropy_bits + checksum
+    Yields:
+        (mnemonic, seed, master_private_key, wif): 按提交顺序逐个返回
+    """
+    if n <= 0:
+        return
+    import multiprocessing
     
-    # 将比特分成11位的组，并转换为助记词
-    indexes = [int(combined_bits[i:i+11], 2) for i in range(0, len(combined_bits), 11)]
-    mnemonic = ' '.join(wordlist[index] for index in indexes)
+    workers = workers or multiprocessing.cpu_count()
+    workers = max(1, min(workers, n))
     
-    return mnemonic, current_time
+    if workers == 1:
+        # 单进程时直接在当前进程生成, 避免进程池开销
+        for _ in range(n):
+            yield _batch_generate((word_count, passphrase))
+        return
+    
+    # 最多保持 workers*4 个任务在途: 结果按顺序取出, 内存占用与n无关
+    task = (word_count, passphrase)
+    window = workers * 4
+    with multiprocessing.Pool(workers, initializer=_batch_init) as pool:
+        pending = collections.deque()
+        submitted = 0
+        while submitted < n or pending:
+            while submitted < n and len(pending) < window:
+                pending.append(pool.apply_async(_batch_generate, (task,)))
+                submitted += 1
+            yield pending.popleft().get()
+
+def print_batch(n, word_count=12, workers=None, passphrase=None):
+    """批量生成并逐条打印结果"""
+    for i, (mnemonic, seed, master_private_key, wif) in enumerate(generate_batch(n, word_count, workers, passphrase), 1):
+        print(f"\n#{i}")
+        print(f"助记词: {mnemonic}")
+        print(f"种子 (hex): {binascii.hexlify(seed).decode()}")
+        print(f"主私钥 (hex): {binascii.hexlify(master_private_key).decode()}")
+        print(f"WIF格式私钥 (压缩格式): {wif}")
+
+# export 子命令加密输出时读取密码的环境变量
+EXPORT_PASSWORD_ENV = 'BIP39_EXPORT_PASSWORD'
+# split/combine 子命令的 SLIP-39 口令 (未设置时为空口令)
+SHARE_PASSPHRASE_ENV = 'BIP39_SHARE_PASSPHRASE'
+# bip38 子命令的加密密码 (未设置时交互输入)
+BIP38_PASSPHRASE_ENV = 'BIP38_PASSPHRASE'
+# keypool 子命令的密钥池密码 (未设置时交互输入)
+KEYPOOL_PASSWORD_ENV = 'BIP39_KEYPOOL_PASSWORD'
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BIP39助记词和私钥生成器")
+    parser.add_argument('--batch', type=int, metavar='N', help="非交互批量生成N个密钥")
+    parser.add_argument('--words', type=int, choices=bip39.WORD_COUNTS, default=12, help="助记词单词数量")
+    parser.add_argument('--workers', type=int, default=None, help="批量生成的工作进程数 (默认为CPU核心数)")
+    parser.add_argument('--bip39', action='store_true', help="使用BIP39标准种子派生 (盐值为 'mnemonic' + 密码短语)")
+    parser.add_argument('--passphrase', default=None, help="BIP39密码短语 (隐含 --bip39)")
+    
+    subparsers = parser.add_subparsers(dest='command')
+    export_parser = subparsers.add_parser('export', help="非交互生成N个密钥并流式写入文件或标准输出")
+    export_parser.add_argument('count', type=int, help="生成数量")
+    export_parser.add_argument('--format', choices=stream_output.FORMATS, default='jsonl', help="输出格式")
+    export_parser.add_argument('-o', '--output', default='-', help="输出文件 (默认为标准输出)")
+    export_parser.add_argument('--fsync-every', type=int, default=100, help="每写入多少条执行一次fsync并保存检查点")
+    export_parser.add_argument('--checkpoint', default=None, help="检查点文件, 中断后以相同参数重新运行即可续传")
+    export_parser.add_argument('--encrypt', action='store_true',
+                               help=f"用AES-256-GCM加密输出 (密码取自环境变量 {EXPORT_PASSWORD_ENV} 或交互输入)")
+    
+    health_parser = subparsers.add_parser('health', help="在本进程中生成N个密钥并输出各熵源的健康测试结果")
+    health_parser.add_argument('count', type=int, nargs='?', default=200, help="生成数量 (结果不输出)")
+    
+    audit_parser = subparsers.add_parser('audit', help="并行检查每行一条助记词的文件, 报告无效的行")
+    audit_parser.add_argument('file', help="助记词文件")
+    audit_parser.add_argument('-o', '--output', default='-', help="报告文件: 行号、原因、详情 (默认为标准输出)")
+    audit_parser.add_argument('--language', choices=wordlist_module.available_languages(),
+                              default=wordlist_module.DEFAULT_LANGUAGE, help="词表语言 (只列出已安装词表文件的语言)")
+    
+    check_parser = subparsers.add_parser('check', help="逐行检查输入的助记词, 对拼错的单词给出建议")
+    check_parser.add_argument('--language', choices=wordlist_module.available_languages(), default=None,
+                              help="词表语言 (默认按已安装的词表自动识别)")
+    
+    split_parser = subparsers.add_parser('split', help="把BIP39助记词的熵拆分为SLIP-39份额 (每行一条助记词, 输出JSON行)")
+    split_parser.add_argument('input', nargs='?', default='-', help="助记词文件 (默认为标准输入)")
+    split_parser.add_argument('-o', '--output', default='-', help="输出文件 (默认为标准输出)")
+    split_parser.add_argument('--threshold', type=int, default=3, help="恢复所需的份数")
+    split_parser.add_argument('--shares', type=int, default=5, help="总份数 (不超过16)")
+    split_parser.add_argument('--iteration-exponent', type=int, default=0, help="SLIP-39 PBKDF2 迭代指数")
+    
+    subparsers.add_parser('combine', help="由SLIP-39份额恢复BIP39助记词 (从标准输入每行读取一份)")
+    
+    bip38_parser = subparsers.add_parser('bip38', help="BIP38 加密/解密私钥 (scrypt 在进程池中并行, 进程数受内存预算限制)")
+    bip38_parser.add_argument('action', choices=('encrypt', 'decrypt', 'generate', 'intermediate'),
+                              help="encrypt: 每行一个WIF或十六进制私钥 -> 6P...; decrypt: 6P... -> WIF; "
+                                   "generate: 生成 --count 个新密钥, 只输出地址和加密私钥; intermediate: 输出EC乘法模式的中间码")
+    bip38_parser.add_argument('input', nargs='?', default='-', help="输入文件 (默认为标准输入)")
+    bip38_parser.add_argument('-o', '--output', default='-', help="输出文件 (默认为标准输出)")
+    bip38_parser.add_argument('--count', type=int, default=1, help="generate 生成的数量")
+    bip38_parser.add_argument('--uncompressed', action='store_true', help="十六进制私钥和新密钥使用非压缩公钥的地址")
+    bip38_parser.add_argument('--rss-budget', type=int, default=bip38.DEFAULT_RSS_BUDGET >> 20, metavar='MB',
+                              help="所有进程常驻内存之和的上限 (每个 scrypt 约需16MB)")
+    bip38_parser.add_argument('--lot', type=int, default=None, help="intermediate 的批次号")
+    bip38_parser.add_argument('--sequence', type=int, default=None, help="intermediate 的序号")
+    
+    keypool_parser = subparsers.add_parser('keypool', help="预生成的加密密钥池: 补充、发放 (每次一次文件读取) 和查看状态")
+    keypool_parser.add_argument('action', choices=('fill', 'issue', 'status', 'compact'),
+                                help="fill: 补充到 --size; issue: 发放 --count 个密钥 (JSON行), 低于 --low-water 时随后补充; "
+                                     "compact: 重写文件, 去掉已发放的记录")
+    keypool_parser.add_argument('file', help="密钥池文件 (不存在时创建)")
+    keypool_parser.add_argument('--size', type=int, default=keypool.DEFAULT_SIZE, help="补充的目标数量")
+    keypool_parser.add_argument('--low-water', type=int, default=keypool.DEFAULT_LOW_WATER, help="剩余数量低于此值时补充")
+    keypool_parser.add_argument('--count', type=int, default=1, help="issue 发放的数量")
+    
+    vanity_parser = subparsers.add_parser('vanity', help="多进程搜索指定前缀的靓号地址")
+    vanity_parser.add_argument('prefix', help="地址前缀, 例如 1Shop 或 bc1qshop")
+    vanity_parser.add_argument('--type', dest='address_type', choices=('p2pkh', 'p2wpkh'), default=None,
+                               help="地址类型 (默认按前缀判断: bc1q/tb1q 为 p2wpkh, 其余为 p2pkh)")
+    vanity_parser.add_argument('--testnet', action='store_true', help="测试网地址")
+    vanity_parser.add_argument('--timeout', type=float, default=None, help="最长搜索时间(秒)")
+    vanity_parser.add_argument('--estimate', action='store_true', help="只测量速度并估算耗时, 不搜索")
+    
+    args = parser.parse_args(argv)
+    if args.passphrase is None and args.bip39:
+        args.passphrase = ''
+    return args
+
+def run_export(args):
+    """export 子命令"""
+    password = None
+    if args.encrypt:
+        password = os.environ.get(EXPORT_PASSWORD_ENV) or getpass.getpass("输出加密密码: ")
+    wordlist = load_wordlist()
+    
+    def records(remaining):
+        return generate_batch(remaining, args.words, args.workers, args.passphrase)
+    
+    written = stream_output.export(
+        records, args.count, wordlist,
+        fmt=args.format,
+        output=args.output,
+        fsync_every=args.fsync_every,
+        password=password,
+        checkpoint=args.checkpoint,
+    )
+    print(f"已写入 {written} 条记录", file=sys.stderr)
 
-def main():
+def run_health(args):
+    """health 子命令: 各熵源的 SP 800-90B 健康测试状态和吞吐量"""
+    wordlist = load_wordlist()
+    for _ in range(args.count):
+        generate_new_key(wordlist, verbose=False, word_count=args.words)
+    unhealthy = 0
+    print(f"{'熵源':14s}{'状态':6s}{'样本数':>10s}{'最长游程/截止':>14s}{'APT计数/截止':>14s}{'吞吐量':>14s}")
+    for name, status in health.default_monitor.status().items():
+        if 'samples' not in status:
+            print(f"{name:14s}{'注意':6s}  {status['note']}")
+            continue
+        unhealthy += not status['healthy']
+        rate = status['bytes_per_sec']
+        print(f"{name:14s}{'正常' if status['healthy'] else '失败':6s}{status['samples']:>10d}"
+              f"{status['max_run']:>8d}/{status['rct_cutoff']:<5d}{status['max_apt']:>8d}/{status['apt_cutoff']:<5d}"
+              f"{(f'{rate / 1024:.1f}KB/s' if rate else '-'):>14s}")
+        if status['note']:
+            print(f"{'':14s}{status['note']}")
+    return 1 if unhealthy else 0
+
+def run_audit(args):
+    """audit 子命令: 有无效行时返回1"""
+    import audit
+    
+    try:
+        if args.output == '-':
+            result = audit.audit(args.file, sys.stdout, args.workers, args.language)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as report:
+                result = audit.audit(args.file, report, args.workers, args.language)
+    except FileNotFoundError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    audit.print_summary(result)
+    return 1 if result['invalid'] else 0
+
+def run_check(args):
+    """check 子命令: 从标准输入逐行读取助记词; 交互使用时空行结束"""
+    import audit
+    
+    interactive = sys.stdin.isatty()
+    invalid = 0
+    while True:
+        try:
+            line = input("助记词 (空行结束): ") if interactive else sys.stdin.readline()
+        except EOFError:
+            break
+        if not line.strip():
+            if interactive or not line:
+                break
+            continue
+        try:
+            result = audit.check_phrase(line, args.language)
+        except FileNotFoundError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 1
+        for word, resolved, suggestions in result['words']:
+            if resolved is None:
+                hint = f"是否是: {', '.join(suggestions)}" if suggestions else "没有相近的单词"
+                print(f"  {word!r} 不在{result['language']}词表中, {hint}")
+            elif resolved != word:
+                print(f"  {word!r} -> {resolved}")
+        if result['reason'] is None:
+            print(f"有效 ({result['language']}, {len(result['words'])}个单词)")
+        else:
+            invalid += 1
+            print(f"无效: {result['reason']}")
+    return 1 if invalid else 0
+
+def run_split(args):
+    """split 子命令: 每条助记词输出一行 {"index", "shares"}"""
+    import json
+    import slip39
+    
+    wordlist = load_wordlist()
+    passphrase = os.environ.get(SHARE_PASSPHRASE_ENV, '').encode()
+    try:
+        words = slip39.load_wordlist()[0]
+    except (FileNotFoundError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    
+    def entropies():
+        for number, line in enumerate(source, 1):
+            if line.strip():
+                try:
+                    yield bip39.mnemonic_to_entropy(line, wordlist)
+                except ValueError as e:
+                    raise ValueError(f"第{number}行: {e}")
+    
+    try:
+        count = 0
+        groups = ((args.threshold, args.shares),)
+        for count, shares in enumerate(slip39.split_batch(entropies(), 1, groups, passphrase,
+                                                          args.iteration_exponent, workers=args.workers), 1):
+            output.write(json.dumps({'index': count - 1, 'shares': [share.mnemonic(words) for share in shares[0]]}) + '\n')
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"已拆分 {count} 条助记词 ({args.threshold}-of-{args.shares})", file=sys.stderr)
+    return 0
+
+def run_combine(args):
+    """combine 子命令"""
+    import slip39
+    
+    passphrase = os.environ.get(SHARE_PASSPHRASE_ENV, '').encode()
+    mnemonics = [line for line in sys.stdin if line.strip()]
+    try:
+        entropy = slip39.combine_mnemonics(mnemonics, passphrase)
+        print(bip39.entropy_to_mnemonic(entropy, load_wordlist()))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def _read_private_key(line, compressed):
+    """WIF 或64位十六进制私钥 -> (私钥, 是否压缩)"""
+    if len(line) == 64:
+        try:
+            return bytes.fromhex(line), compressed
+        except ValueError:
+            pass
+    private_key, compressed, _ = address.decode_wif(line)
+    return private_key, compressed
+
+def run_bip38(args):
+    """bip38 子命令"""
+    passphrase = os.environ.get(BIP38_PASSPHRASE_ENV) or getpass.getpass("BIP38密码: ")
+    compressed = not args.uncompressed
+    budget = args.rss_budget << 20
+    if args.action == 'intermediate':
+        try:
+            print(bip38.intermediate_code(passphrase, args.lot, args.sequence))
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 1
+        return 0
+    
+    source = None
+    if args.action != 'generate':
+        source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    
+    def lines():
+        for number, line in enumerate(source, 1):
+            line = line.strip()
+            if line:
+                yield number, line
+    
+    def keys():
+        for number, line in lines():
+            try:
+                yield _read_private_key(line, compressed)
+            except ValueError as e:
+                raise ValueError(f"第{number}行: {e}")
+    
+    count = 0
+    try:
+        if args.action == 'encrypt':
+            for count, encrypted in enumerate(bip38.encrypt_batch(keys(), passphrase, args.workers, budget), 1):
+                output.write(encrypted + '\n')
+        elif args.action == 'decrypt':
+            for count, (private_key, flag) in enumerate(bip38.decrypt_batch(
+                    (line for _, line in lines()), passphrase, args.workers, budget), 1):
+                output.write(to_wif(private_key, compressed=flag) + '\n')
+        else:
+            import json
+            
+            # 助记词和明文私钥只在内存中, 输出只有地址和加密私钥
+            generated = [(key, compressed) for _, _, key, _ in
+                         generate_batch(args.count, args.words, args.workers, args.passphrase)]
+            encrypted_keys = bip38.encrypt_batch(generated, passphrase, args.workers, budget)
+            for count, ((private_key, _), encrypted) in enumerate(zip(generated, encrypted_keys), 1):
+                output.write(json.dumps({
+                    'index': count - 1,
+                    'address': address.p2pkh(secp256k1.public_key(private_key, compressed)),
+                    'bip38': encrypted,
+                }) + '\n')
+    except (ImportError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not None and source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"已处理 {count} 个私钥", file=sys.stderr)
+    return 0
+
+def run_keypool(args):
+    """keypool 子命令"""
+    import json
+    
+    password = os.environ.get(KEYPOOL_PASSWORD_ENV) or getpass.getpass("密钥池密码: ")
+    try:
+        pool = keypool.KeyPool(args.file, password, args.size, args.low_water, args.words, args.passphrase,
+                               args.workers)
+    except (ImportError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    with pool:
+        if args.action == 'issue':
+            for _ in range(args.count):
+                try:
+                    print(json.dumps(pool.issue()), flush=True)
+                except keypool.KeyPoolEmpty as e:
+                    print(f"错误: {e}", file=sys.stderr)
+                    return 1
+            if len(pool) < pool.low_water:
+                print(f"剩余 {len(pool)} 个, 补充了 {pool.fill()} 个", file=sys.stderr)
+        elif args.action == 'fill':
+            print(f"补充了 {pool.fill()} 个", file=sys.stderr)
+        elif args.action == 'compact':
+            pool.compact()
+        if args.action != 'issue':
+            print(json.dumps(pool.status()))
+    return 0
+
+def run_vanity(args):
+    """vanity 子命令: 输出地址和WIF私钥"""
+    import vanity
+    
+    kind = args.address_type
+    if kind is None:
+        kind = 'p2wpkh' if args.prefix.lower().startswith(('bc1q', 'tb1q')) else 'p2pkh'
+    try:
+        pattern = vanity.VanityPattern(args.prefix, kind, args.testnet)
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    rate = vanity.measure_rate(pattern) * workers
+    print(f"难度: 平均 {pattern.difficulty:,.0f} 个候选", file=sys.stderr)
+    print(f"速度: 约 {rate:,.0f} 个/秒 ({workers} 个进程)", file=sys.stderr)
+    print(f"预计耗时: 50%概率 {vanity.format_duration(vanity.expected_seconds(pattern.difficulty, rate))}, "
+          f"95%概率 {vanity.format_duration(vanity.expected_seconds(pattern.difficulty, rate, 0.95))}",
+          file=sys.stderr)
+    if args.estimate:
+        return 0
+    
+    def progress(checked, current_rate, elapsed):
+        print(f"已检查 {checked:,} 个候选, {current_rate:,.0f} 个/秒, 用时 {vanity.format_duration(elapsed)}",
+              file=sys.stderr)
+    
+    result = vanity.search(pattern, workers, args.timeout, progress)
+    if result is None:
+        print("超时, 未找到匹配的地址", file=sys.stderr)
+        return 1
+    print(f"检查了 {result['candidates']:,} 个候选, 用时 {vanity.format_duration(result['seconds'])}", file=sys.stderr)
+    print(f"地址: {result['address']}")
+    print(f"WIF格式私钥 (压缩格式): {to_wif(result['private_key'], testnet=args.testnet)}")
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'export':
+        run_export(args)
+        return
+    if args.command == 'vanity':
+        return run_vanity(args)
+    if args.command == 'health':
+        return run_health(args)
+    if args.command == 'audit':
+        return run_audit(args)
+    if args.command == 'check':
+        return run_check(args)
+    if args.command == 'split':
+        return run_split(args)
+    if args.command == 'combine':
+        return run_combine(args)
+    if args.command == 'bip38':
+        return run_bip38(args)
+    if args.command == 'keypool':
+        return run_keypool(args)
+    if args.batch is not None:
+        print_batch(args.batch, args.words, args.workers, args.passphrase)
+        return
+    
     wordlist = load_wordlist()
     
     print("\nBIP39助记词和私钥生成器")
@@ -546,25 +1156,26 @@ def main():
     
     choice = input("\n选择模式:\n1. 生成随机助记词\n2. 生成自定义助记词\n请输入(1或2): ")
     
+    word_count = args.words
     if choice == '1':
-        mnemonic, current_time = generate_new_key(wordlist)
+        mnemonic, current_time = generate_new_key(wordlist, word_count=word_count)
     elif choice == '2':
         try:
             num_custom = int(input("\n请输入要自定义的词数量: "))
-            if not 1 <= num_custom <= 12:
-                raise ValueError("自定义词数量必须在1到12之间")
+            if not 1 <= num_custom <= word_count:
+                raise ValueError(f"自定义词数量必须在1到{word_count}之间")
             
             custom_words = []
             positions = []
             
-            print("\n请输入自定义词和位置(位置为1-12):")
+            print(f"\n请输入自定义词和位置(位置为1-{word_count}):")
             for i in range(num_custom):
                 word = input(f"第{i+1}个自定义词: ").strip()
-                pos = int(input(f"第{i+1}个词的位置(1-12): "))
+                pos = int(input(f"第{i+1}个词的位置(1-{word_count}): "))
                 custom_words.append(word)
                 positions.append(pos)
             
-            mnemonic, current_time = generate_custom_mnemonic(wordlist, custom_words, positions)
+            mnemonic, current_time = generate_custom_mnemonic(wordlist, custom_words, positions, word_count)
         except ValueError as e:
             print(f"\n错误: {str(e)}")
             return
@@ -572,7 +1183,7 @@ def main():
         print("\n无效的选择")
         return
     
-    seed, master_private_key = mnemonic_to_private_key(mnemonic, current_time)
+    seed, master_private_key = mnemonic_to_private_key(mnemonic, current_time, args.passphrase)
     
     print("\n生成的助记词:")
     print(mnemonic)
@@ -582,6 +1193,11 @@ def main():
     print(binascii.hexlify(master_private_key).decode())
     print("\nWIF格式私钥 (压缩格式):")
     print(to_wif(master_private_key))
+    print("\nBIP32主扩展私钥 (xprv):")
+    print(bip32.ExtendedKey.from_seed(seed).to_xprv())
+    print("\n主私钥对应地址:")
+    for kind, addr in address.all_addresses(secp256k1.public_key(master_private_key)).items():
+        print(f"{kind}: {addr}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,26 +1,228 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox
 import threading
+import queue
+import multiprocessing
 import generator
-import os
-import time
-import hashlib
+import instrumentation
+
+# generate_new_key 的熵源并发运行, 完成顺序不固定: 进度按已完成的熵源数计算,
+# 状态文字显示刚完成的熵源; 熵源全部完成后按收集之后的各阶段依次推进, 最后一步为种子派生
+KEY_SOURCES = {
+    'network': "网络信息",
+    'system': "系统信息",
+    'process': "进程信息",
+    'environ': "环境变量",
+    'delays': "随机延迟",
+    'thread_pool': "线程熵池",
+    'files': "文件系统熵",
+    'extra_random': "额外随机数据",
+}
+# 阶段计时事件 -> 完成后显示的状态文字
+KEY_PHASES = [
+    ('collect', "正在混合熵..."),
+    ('mix', "正在计算校验和..."),
+    ('checksum', "正在转换为助记词..."),
+    ('encode', "正在派生种子和私钥..."),
+]
+_PHASE_INDEX = {name: i for i, (name, _) in enumerate(KEY_PHASES)}
+KEY_STEPS = len(KEY_SOURCES) + len(KEY_PHASES) + 1
+
+# 结果表格的列: (列名, 标题, 宽度)
+RESULT_COLUMNS = (
+    ('index', '#', 60),
+    ('mnemonic', '助记词', 320),
+    ('seed', '种子 (hex)', 160),
+    ('private_key', '主私钥 (hex)', 160),
+    ('wif', 'WIF格式私钥', 160),
+)
+
+# 批量模式下每次界面刷新最多取出的结果数, 防止一次刷新阻塞事件循环
+BATCH_DRAIN_LIMIT = 2000
+BATCH_POLL_MS = 50
+
+
+class VirtualTable(ttk.Frame):
+    """
+    虚拟化的结果表格
+
+    数据保存在 Python 列表中, Treeview 只包含可见的若干行,
+    滚动时改写这些行的内容。插入数万行时界面开销与可见行数相关, 与总行数无关。
+    """
+
+    def __init__(self, master, columns, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = []
+        self._top = 0
+        self._visible = 0
+        self._selected = None
+        self._refresh_pending = False
+        self._syncing = False
+        self.on_select = None
+        
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in columns], show='headings',
+                                 selectmode='browse', height=1)
+        for name, heading, width in columns:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, stretch=name != 'index', anchor=tk.W)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+        
+        self.tree.grid(row=0, column=0, sticky=tk.NSEW)
+        self.scrollbar.grid(row=0, column=1, sticky=tk.NS)
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.scroll_rows(-self._visible))
+        self.tree.bind('<Next>', lambda e: self.scroll_rows(self._visible))
+
+    def append(self, row):
+        self.extend([row])
+
+    def extend(self, rows):
+        """追加多行; 如果当前停在底部则自动跟随到最新一行"""
+        follow = self._top + self._visible >= len(self.rows)
+        self.rows.extend(rows)
+        if follow:
+            self._top = max(0, len(self.rows) - self._visible)
+        self._schedule_refresh()
+
+    def clear(self):
+        self.rows = []
+        self._top = 0
+        self._selected = None
+        self._schedule_refresh()
+
+    def select(self, index):
+        """选中第 index 行并滚动到可见位置"""
+        if not 0 <= index < len(self.rows):
+            return
+        self._selected = index
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._visible:
+            self._top = max(0, index - self._visible + 1)
+        self._refresh()
+        if self.on_select is not None:
+            self.on_select(self.rows[index])
+
+    def scroll_rows(self, delta):
+        self._set_top(self._top + delta)
+        return 'break'
+
+    def _set_top(self, top):
+        top = max(0, min(int(top), len(self.rows) - self._visible))
+        if top != self._top:
+            self._top = top
+            self._refresh()
+
+    def _schedule_refresh(self):
+        # 同一轮事件循环内的多次追加只刷新一次
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+
+    def _refresh(self):
+        self._refresh_pending = False
+        items = self.tree.get_children()
+        count = min(self._visible, max(0, len(self.rows) - self._top))
+        # 调整 Treeview 中的行数, 只在窗口大小变化时发生
+        for item in items[count:]:
+            self.tree.delete(item)
+        for _ in range(len(items), count):
+            self.tree.insert('', tk.END)
+        items = self.tree.get_children()
+        
+        selected_item = None
+        for offset, item in enumerate(items):
+            index = self._top + offset
+            self.tree.item(item, values=self.rows[index])
+            if index == self._selected:
+                selected_item = item
+        # 程序设置选中项时不触发 on_select
+        self._syncing = True
+        self.tree.selection_set(selected_item or ())
+        self.after_idle(self._end_sync)
+        
+        total = len(self.rows)
+        if total <= self._visible or total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self._top / total, (self._top + count) / total)
+
+    def _end_sync(self):
+        self._syncing = False
+
+    def _on_resize(self, event):
+        # 按当前高度计算可见行数 (行高从样式读取)
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        visible = max(1, (event.height - 24) // int(rowheight))
+        if visible != self._visible:
+            self._visible = visible
+            self._top = max(0, min(self._top, len(self.rows) - visible))
+            self._refresh()
+
+    def _on_scroll(self, *args):
+        total = len(self.rows)
+        if args[0] == 'moveto':
+            self._set_top(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self._visible
+            self._set_top(self._top + step)
+
+    def _on_wheel(self, event):
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _move_selection(self, delta):
+        if self.rows:
+            current = self._selected if self._selected is not None else self._top - delta
+            self.select(max(0, min(current + delta, len(self.rows) - 1)))
+        return 'break'
+
+    def _on_tree_select(self, event):
+        if self._syncing:
+            return
+        selection = self.tree.selection()
+        if not selection:
+            return
+        index = self._top + self.tree.index(selection[0])
+        if index < len(self.rows):
+            self._selected = index
+            if self.on_select is not None:
+                self.on_select(self.rows[index])
+
 
 class MnemonicGeneratorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("BIP39助记词生成器")
-        self.root.geometry("800x600")
+        self.root.geometry("900x650")
         self.root.minsize(700, 500)
         
-        # 确保english.txt文件存在
-        if not os.path.exists('english.txt'):
-            messagebox.showerror("错误", "找不到english.txt文件，请确保它与程序在同一目录下。")
+        # 加载词表 (从程序所在目录或打包资源中读取, 与工作目录无关)
+        try:
+            self.wordlist = generator.load_wordlist()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"无法加载english.txt词表: {e}")
             root.destroy()
             return
-            
-        # 加载词表
-        self.wordlist = generator.load_wordlist()
+        
+        # 当前任务的取消标志和批量结果队列
+        self.cancel_event = None
+        # 单个密钥生成中已完成的熵源, 以及收集阶段是否已结束
+        self.sources_done = set()
+        self.collected = False
+        self.batch_queue = None
+        self.batch_total = 0
+        self.batch_done = 0
         
         # 创建主框架
         self.main_frame = ttk.Frame(root, padding="20")
@@ -28,63 +230,37 @@ class MnemonicGeneratorApp:
         
         # 创建标题
         title_label = ttk.Label(self.main_frame, text="BIP39助记词和私钥生成器", font=("Arial", 16, "bold"))
-        title_label.pack(pady=(0, 20))
+        title_label.pack(pady=(0, 10))
         
         # 随机生成框架
         self.random_frame = ttk.Frame(self.main_frame)
-        self.random_frame.pack(fill=tk.BOTH, expand=True)
+        self.random_frame.pack(fill=tk.X)
         
         # 设置随机生成界面
         self.setup_random_ui()
         
-        # 结果显示区域
-        self.result_frame = ttk.LabelFrame(self.main_frame, text="生成结果", padding="10")
-        self.result_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        
-        # 助记词结果
-        ttk.Label(self.result_frame, text="助记词:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.mnemonic_text = scrolledtext.ScrolledText(self.result_frame, height=3, width=70, wrap=tk.WORD)
-        self.mnemonic_text.grid(row=0, column=1, sticky=tk.EW, pady=5)
-        
-        # 种子结果
-        ttk.Label(self.result_frame, text="种子 (hex):").grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.seed_text = scrolledtext.ScrolledText(self.result_frame, height=2, width=70, wrap=tk.WORD)
-        self.seed_text.grid(row=1, column=1, sticky=tk.EW, pady=5)
-        
-        # 私钥结果
-        ttk.Label(self.result_frame, text="主私钥 (hex):").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.private_key_text = scrolledtext.ScrolledText(self.result_frame, height=2, width=70, wrap=tk.WORD)
-        self.private_key_text.grid(row=2, column=1, sticky=tk.EW, pady=5)
-        
-        # WIF格式私钥
-        ttk.Label(self.result_frame, text="WIF格式私钥:").grid(row=3, column=0, sticky=tk.W, pady=5)
-        self.wif_text = scrolledtext.ScrolledText(self.result_frame, height=2, width=70, wrap=tk.WORD)
-        self.wif_text.grid(row=3, column=1, sticky=tk.EW, pady=5)
-        
-        # 设置列权重
-        self.result_frame.columnconfigure(1, weight=1)
-        
         # 状态栏
         self.status_var = tk.StringVar()
         self.status_var.set("就绪")
         self.status_bar = ttk.Label(self.main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
         
-        # 设置所有文本框为只读
-        for text_widget in [self.mnemonic_text, self.seed_text, self.private_key_text, self.wif_text]:
-            text_widget.config(state=tk.DISABLED)
-    
+        # 结果显示区域
+        self.result_frame = ttk.LabelFrame(self.main_frame, text="生成结果", padding="10")
+        self.result_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.setup_result_ui()
+
     def setup_random_ui(self):
         # 随机生成界面内容
-        frame = ttk.Frame(self.random_frame, padding="20")
-        frame.pack(fill=tk.BOTH, expand=True)
+        frame = ttk.Frame(self.random_frame, padding="10")
+        frame.pack(fill=tk.X)
         
-        info_label = ttk.Label(frame, text="选择助记词长度并点击按钮生成随机助记词", font=("Arial", 10))
-        info_label.pack(pady=(0, 20))
+        info_label = ttk.Label(frame, text="选择助记词长度并点击按钮生成随机助记词, 或输入数量批量生成", font=("Arial", 10))
+        info_label.pack(pady=(0, 10))
         
         # 助记词长度选择
         length_frame = ttk.Frame(frame)
-        length_frame.pack(pady=10)
+        length_frame.pack(pady=5)
         
         self.mnemonic_length = tk.IntVar(value=12)
         ttk.Radiobutton(length_frame, text="12个单词", variable=self.mnemonic_length, value=12).pack(side=tk.LEFT, padx=10)
@@ -92,68 +268,206 @@ class MnemonicGeneratorApp:
         
         # 进度条
         progress_frame = ttk.Frame(frame)
-        progress_frame.pack(fill=tk.X, pady=10)
+        progress_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(progress_frame, text="生成进度:").pack(side=tk.LEFT, padx=(0, 10))
         self.progress_var = tk.DoubleVar(value=0)
         self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
         self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        # 生成按钮
-        generate_button = ttk.Button(frame, text="生成随机助记词", command=self.generate_random)
-        generate_button.pack(pady=20)
-    
+        # 按钮: 单个生成 / 批量生成 / 取消 / 清空
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=10)
+        
+        self.generate_button = ttk.Button(button_frame, text="生成随机助记词", command=self.generate_random)
+        self.generate_button.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(button_frame, text="批量数量:").pack(side=tk.LEFT, padx=(20, 5))
+        self.batch_count = tk.IntVar(value=100)
+        ttk.Spinbox(button_frame, from_=1, to=1000000, textvariable=self.batch_count, width=9).pack(side=tk.LEFT)
+        self.batch_button = ttk.Button(button_frame, text="批量生成", command=self.generate_batch)
+        self.batch_button.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_button = ttk.Button(button_frame, text="取消", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="清空结果", command=self.clear_results).pack(side=tk.LEFT, padx=5)
+
+    def setup_result_ui(self):
+        # 结果表格 (虚拟化, 支持数万行)
+        self.table = VirtualTable(self.result_frame, RESULT_COLUMNS)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.table.on_select = self.show_details
+        
+        # 选中行的完整内容 (只读输入框, 可复制)
+        detail_frame = ttk.Frame(self.result_frame)
+        detail_frame.pack(fill=tk.X, pady=(10, 0))
+        self.detail_vars = {}
+        for row, (name, heading, _) in enumerate(RESULT_COLUMNS[1:]):
+            ttk.Label(detail_frame, text=heading + ":").grid(row=row, column=0, sticky=tk.W, pady=2)
+            var = tk.StringVar()
+            ttk.Entry(detail_frame, textvariable=var, state='readonly').grid(row=row, column=1, sticky=tk.EW, pady=2)
+            self.detail_vars[name] = var
+        detail_frame.columnconfigure(1, weight=1)
+
+    def show_details(self, row):
+        for (name, _, _), value in zip(RESULT_COLUMNS, row):
+            if name in self.detail_vars:
+                self.detail_vars[name].set(value)
+
+    def clear_results(self):
+        self.table.clear()
+        for var in self.detail_vars.values():
+            var.set('')
+
+    def _set_busy(self, busy):
+        state = tk.DISABLED if busy else tk.NORMAL
+        self.generate_button.config(state=state)
+        self.batch_button.config(state=state)
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+
+    def cancel(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.status_var.set("正在取消...")
+
     def generate_random(self):
         self.status_var.set("正在生成随机助记词...")
         self.progress_var.set(0)
-        self.root.update()
+        self.sources_done = set()
+        self.collected = False
+        self.cancel_event = threading.Event()
+        self._set_busy(True)
         
         # 在单独的线程中运行生成过程
         word_count = self.mnemonic_length.get()
-        threading.Thread(target=self._generate_random, args=(word_count,), daemon=True).start()
-    
-    def _generate_random(self, word_count):
+        threading.Thread(target=self._generate_random, args=(word_count, self.cancel_event), daemon=True).start()
+
+    def _on_stage(self, event):
+        # 在工作线程中调用, 只把事件名转交给主线程, 事件不包含任何熵数据
+        if event.kind == 'source' and event.name in KEY_SOURCES:
+            self.root.after(0, self._show_source, event.name)
+        elif event.kind == 'phase' and event.name in _PHASE_INDEX:
+            self.root.after(0, self._show_phase, _PHASE_INDEX[event.name])
+
+    def _show_source(self, name):
+        # 超时后才完成的采样 (已被替换) 不再计入进度
+        if self.collected or name in self.sources_done:
+            return
+        self.sources_done.add(name)
+        done = len(self.sources_done)
+        self.progress_var.set(done * 100 / KEY_STEPS)
+        self.status_var.set(f"已收集{KEY_SOURCES[name]} ({done}/{len(KEY_SOURCES)})")
+
+    def _show_phase(self, index):
+        self.collected = True
+        self.progress_var.set((len(KEY_SOURCES) + index + 1) * 100 / KEY_STEPS)
+        self.status_var.set(KEY_PHASES[index][1])
+
+    def _generate_random(self, word_count, cancel):
+        # 订阅生成器的计时事件作为真实进度
+        observer = instrumentation.add_observer(self._on_stage)
         try:
-            # 模拟进度
-            for i in range(1, 101):
-                time.sleep(0.02)  # 模拟生成过程
-                self.root.after(0, lambda i=i: self.progress_var.set(i))
-                if i == 25:
-                    self.root.after(0, lambda: self.status_var.set("正在收集系统熵..."))
-                elif i == 50:
-                    self.root.after(0, lambda: self.status_var.set("正在生成随机字符..."))
-                elif i == 75:
-                    self.root.after(0, lambda: self.status_var.set("正在计算助记词..."))
-            
-            # 实际生成助记词，不再传递鼠标熵数据
-            mnemonic, current_time = generator.generate_new_key(self.wordlist, word_count=word_count)
+            mnemonic, current_time = generator.generate_new_key(self.wordlist, word_count=word_count, cancel=cancel)
             seed, master_private_key = generator.mnemonic_to_private_key(mnemonic, current_time)
             wif = generator.to_wif(master_private_key)
             
             # 更新UI（必须在主线程中进行）
-            self.root.after(0, lambda: self.update_results(mnemonic, seed, master_private_key, wif))
-            self.root.after(0, lambda: self.status_var.set("随机助记词生成完成"))
+            self.root.after(0, lambda: self._finish_single(mnemonic, seed, master_private_key, wif))
+        except generator.GenerationCancelled:
+            self.root.after(0, lambda: self._finish("已取消"))
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("错误", f"生成过程中出错: {str(e)}"))
-            self.root.after(0, lambda: self.status_var.set("生成失败"))
-    
-    def update_results(self, mnemonic, seed, master_private_key, wif):
-        # 更新结果文本框
-        for text_widget, content in [
-            (self.mnemonic_text, mnemonic),
-            (self.seed_text, generator.binascii.hexlify(seed).decode()),
-            (self.private_key_text, generator.binascii.hexlify(master_private_key).decode()),
-            (self.wif_text, wif)
-        ]:
-            text_widget.config(state=tk.NORMAL)
-            text_widget.delete(1.0, tk.END)
-            text_widget.insert(tk.END, content)
-            text_widget.config(state=tk.DISABLED)
+            # except 块结束时 e 会被删除, 先把消息绑定为默认参数
+            self.root.after(0, lambda msg=str(e): messagebox.showerror("错误", f"生成过程中出错: {msg}"))
+            self.root.after(0, lambda: self._finish("生成失败"))
+        finally:
+            instrumentation.remove_observer(observer)
+
+    def _finish_single(self, mnemonic, seed, master_private_key, wif):
+        self.table.append((len(self.table.rows) + 1, mnemonic, seed.hex(), master_private_key.hex(), wif))
+        self.table.select(len(self.table.rows) - 1)
+        self.progress_var.set(100)
+        self._finish("随机助记词生成完成")
+
+    def _finish(self, status):
+        self.cancel_event = None
+        self.status_var.set(status)
+        self._set_busy(False)
+
+    def generate_batch(self):
+        try:
+            count = int(self.batch_count.get())
+            if count < 1:
+                raise ValueError
+        except (ValueError, tk.TclError):
+            messagebox.showerror("错误", "批量数量必须是正整数")
+            return
+        
+        self.batch_total = count
+        self.batch_done = 0
+        self.batch_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.progress_var.set(0)
+        self.status_var.set(f"正在批量生成 0/{count}...")
+        self._set_busy(True)
+        
+        word_count = self.mnemonic_length.get()
+        threading.Thread(target=self._generate_batch,
+                         args=(count, word_count, self.cancel_event, self.batch_queue), daemon=True).start()
+        self.root.after(BATCH_POLL_MS, self._poll_batch)
+
+    def _generate_batch(self, count, word_count, cancel, results):
+        # 工作线程: 从进程池按顺序取结果放入队列, 由主线程定时取出
+        batch = generator.generate_batch(count, word_count)
+        try:
+            for result in batch:
+                results.put(result)
+                if cancel.is_set():
+                    break
+            results.put(None)
+        except Exception as e:
+            results.put(e)
+        finally:
+            # 关闭生成器会退出进程池上下文并终止尚未完成的任务
+            batch.close()
+
+    def _poll_batch(self):
+        rows = []
+        finished = None
+        try:
+            while len(rows) < BATCH_DRAIN_LIMIT:
+                item = self.batch_queue.get_nowait()
+                if item is None or isinstance(item, Exception):
+                    finished = item if item is not None else True
+                    break
+                mnemonic, seed, master_private_key, wif = item
+                rows.append((len(self.table.rows) + len(rows) + 1, mnemonic,
+                             seed.hex(), master_private_key.hex(), wif))
+        except queue.Empty:
+            pass
+        
+        if rows:
+            self.table.extend(rows)
+            self.batch_done += len(rows)
+            self.progress_var.set(self.batch_done * 100 / self.batch_total)
+            self.status_var.set(f"正在批量生成 {self.batch_done}/{self.batch_total}...")
+        
+        if finished is None:
+            self.root.after(BATCH_POLL_MS, self._poll_batch)
+            return
+        if isinstance(finished, Exception):
+            messagebox.showerror("错误", f"批量生成过程中出错: {finished}")
+            self._finish(f"批量生成失败, 已完成 {self.batch_done}/{self.batch_total}")
+        elif self.cancel_event.is_set():
+            self._finish(f"已取消, 已完成 {self.batch_done}/{self.batch_total}")
+        else:
+            self._finish(f"批量生成完成, 共 {self.batch_done} 个")
 
 def main():
+    # 打包后的程序在 Windows 上启动进程池需要 freeze_support
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = MnemonicGeneratorApp(root)
     root.mainloop()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,7 +5,7 @@ a = Analysis(
     ['gui.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('english.txt', '.'), ('slip39.txt', '.'), ('wordlists', 'wordlists')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,322 @@
+import hashlib
+import math
+import threading
+import time
+
+# numpy 只在第一次评估时导入; 没有 numpy 时退回逐样本的纯Python实现
+np = None
+_numpy_checked = False
+
+# SP 800-90B 4.4 节的误报率 α。批量生成时每个密钥都会送入大量样本,
+# 取 2^-30 (标准建议范围 2^-20 ~ 2^-40) 使正常熵源几乎不会被误判
+ALPHA = 2 ** -30
+# 自适应比例测试窗口 (非二元样本)
+APT_WINDOW = 512
+# 攒够这么多个样本再做一次向量化评估
+EVAL_BLOCK = 64
+
+# 监测的熵源: 名称 -> (每个符号的最小熵估计(比特), 符号类型)
+#   'sample': 每次采样作为一个符号 (先哈希成64位整数, 只用于比较是否相同)
+#   'byte': 采样数据中的每个字节作为一个符号
+# 缓存的静态熵源 (主机名、环境变量、文件元数据) 按设计就是不变的, 内存和磁盘用量在
+# 连续生成时也长时间不变 (实测磁盘用量100次采样完全相同), 这些都不做重复性测试
+SOURCES = {
+    'extra_random': (7.0, 'byte'),
+    'cpu_percent': (1.0, 'sample'),
+    'process': (1.0, 'sample'),
+    'delays': (1.0, 'sample'),
+    'thread_pool': (1.0, 'sample'),
+}
+
+POLICIES = ('exclude', 'flag')
+
+def _load_numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+def rct_cutoff(min_entropy, alpha=ALPHA):
+    """重复计数测试的截止值 C = 1 + ceil(-log2(α) / H)"""
+    return 1 + math.ceil(-math.log2(alpha) / min_entropy)
+
+def _critbinom(n, p, q):
+    """满足 P(X <= k) >= q 的最小 k, X ~ B(n, p)"""
+    total = 0.0
+    log_p, log_q = math.log(p), math.log1p(-p) if p < 1 else float('-inf')
+    for k in range(n + 1):
+        log_pmf = (math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+                   + k * log_p + (n - k) * log_q)
+        total += math.exp(log_pmf)
+        if total >= q:
+            return k
+    return n
+
+def apt_cutoff(min_entropy, window=APT_WINDOW, alpha=ALPHA):
+    """自适应比例测试的截止值 C = 1 + CRITBINOM(W, 2^-H, 1 - α)"""
+    return min(window, 1 + _critbinom(window, 2 ** -min_entropy, 1 - alpha))
+
+
+class HealthTest:
+    """
+    单个熵源的 SP 800-90B 连续健康测试
+
+    重复计数测试 (RCT): 连续相同符号的数量达到截止值即失败;
+    自适应比例测试 (APT): 每个不重叠窗口内与窗口首个符号相同的数量达到截止值即失败。
+    样本先缓存在列表中, 攒够 EVAL_BLOCK 个后用 NumPy 一次评估,
+    跨批次的游程和未满的窗口保存在状态中继续计算。失败后保持失败状态直到 reset()。
+    """
+
+    def __init__(self, name, min_entropy, symbol='sample', window=APT_WINDOW, alpha=ALPHA):
+        self.name = name
+        self.min_entropy = min_entropy
+        self.symbol = symbol
+        self.window = window
+        self.rct_cutoff = rct_cutoff(min_entropy, alpha)
+        self.apt_cutoff = apt_cutoff(min_entropy, window, alpha)
+        self._lock = threading.Lock()
+        self._clear()
+
+    def reset(self):
+        """清除失败状态和所有计数"""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._pending = []
+        self._pending_count = 0
+        self._last = None
+        self._run = 0
+        self._apt_ref = None
+        self._apt_count = 0
+        self._apt_pos = 0
+        self.samples = 0
+        self.bytes = 0
+        self.max_run = 0
+        self.max_apt = 0
+        self.rct_failures = 0
+        self.apt_failures = 0
+        self.note = None
+        self._first = None
+        self._last_time = None
+        self._eval_ns = 0
+
+    @property
+    def healthy(self):
+        return not (self.rct_failures or self.apt_failures)
+
+    def feed(self, data):
+        """
+        送入一次原始采样
+
+        Returns:
+            bool: 当前是否健康
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._first is None:
+                self._first = now
+            self._last_time = now
+            self.bytes += len(data)
+            if self.symbol == 'byte':
+                self._pending.append(bytes(data))
+                self._pending_count += len(data)
+            else:
+                digest = hashlib.blake2b(data, digest_size=8).digest()
+                self._pending.append(int.from_bytes(digest, 'big'))
+                self._pending_count += 1
+            if self._pending_count >= EVAL_BLOCK:
+                self._evaluate()
+            return self.healthy
+
+    def flush(self):
+        """立即评估所有缓存的样本"""
+        with self._lock:
+            if self._pending_count:
+                self._evaluate()
+
+    def _evaluate(self):
+        start = time.perf_counter_ns()
+        if self.symbol == 'byte':
+            symbols = b''.join(self._pending)
+        else:
+            symbols = self._pending
+        self._pending = []
+        self._pending_count = 0
+        self.samples += len(symbols)
+        if _load_numpy() is not None:
+            dtype = np.uint8 if self.symbol == 'byte' else np.uint64
+            array = (np.frombuffer(symbols, dtype=np.uint8) if self.symbol == 'byte'
+                     else np.fromiter(symbols, dtype=dtype, count=len(symbols)))
+            self._rct_numpy(array)
+            self._apt_numpy(array)
+        else:
+            self._evaluate_python(list(symbols))
+        self._eval_ns += time.perf_counter_ns() - start
+
+    def _rct_numpy(self, x):
+        n = len(x)
+        # 与后一个符号相同的位置; 正常熵源中很稀疏, 只对这些位置计算游程
+        idx = np.flatnonzero(x[1:] == x[:-1])
+        carry = self._run if self._last is not None and int(x[0]) == self._last else 0
+        failures = 0
+        longest = 1
+        head = tail = 1
+        if len(idx):
+            breaks = np.flatnonzero(np.diff(idx) != 1) + 1
+            group_starts = np.concatenate(([0], breaks))
+            group_ends = np.concatenate((breaks, [len(idx)]))
+            lengths = group_ends - group_starts + 1
+            failures = int((lengths >= self.rct_cutoff).sum())
+            longest = int(lengths.max())
+            if idx[0] == 0:
+                head = int(lengths[0])
+                failures -= head >= self.rct_cutoff
+            if idx[-1] == n - 2:
+                tail = int(lengths[-1])
+        # 第一个游程接上一批的末尾游程; 上一批已经计过失败的不再重复计数
+        if head + carry >= self.rct_cutoff > carry:
+            failures += 1
+        self.max_run = max(self.max_run, longest, head + carry)
+        self.rct_failures += failures
+        self._last = int(x[-1])
+        self._run = tail + carry if tail == n else tail
+
+    def _apt_numpy(self, x):
+        w = self.window
+        pos = 0
+        # 补满上一批未完成的窗口
+        if self._apt_pos:
+            take = min(w - self._apt_pos, len(x))
+            self._apt_count += int((x[:take] == self._apt_ref).sum())
+            self._apt_pos += take
+            pos = take
+            if self._apt_pos == w:
+                self._check_apt(self._apt_count)
+                self._apt_pos = 0
+        full = (len(x) - pos) // w
+        if full:
+            windows = x[pos:pos + full * w].reshape(full, w)
+            counts = (windows == windows[:, :1]).sum(axis=1)
+            self.max_apt = max(self.max_apt, int(counts.max()))
+            self.apt_failures += int((counts >= self.apt_cutoff).sum())
+            pos += full * w
+        if pos < len(x):
+            rest = x[pos:]
+            self._apt_ref = rest[0]
+            self._apt_count = int((rest == rest[0]).sum())
+            self._apt_pos = len(rest)
+
+    def _check_apt(self, count):
+        self.max_apt = max(self.max_apt, count)
+        if count >= self.apt_cutoff:
+            self.apt_failures += 1
+
+    def _evaluate_python(self, symbols):
+        for s in symbols:
+            if s == self._last:
+                self._run += 1
+            else:
+                self._last = s
+                self._run = 1
+            if self._run > self.max_run:
+                self.max_run = self._run
+            if self._run == self.rct_cutoff:
+                self.rct_failures += 1
+
+            if self._apt_pos == 0:
+                self._apt_ref = s
+                self._apt_count = 1
+            elif s == self._apt_ref:
+                self._apt_count += 1
+            self._apt_pos += 1
+            if self._apt_pos == self.window:
+                self._check_apt(self._apt_count)
+                self._apt_pos = 0
+
+    def status(self):
+        with self._lock:
+            elapsed = (self._last_time - self._first) if self._first is not None else 0.0
+            return {
+                'healthy': self.healthy,
+                'samples': self.samples + self._pending_count,
+                'bytes': self.bytes,
+                'rct_failures': self.rct_failures,
+                'apt_failures': self.apt_failures,
+                'max_run': self.max_run,
+                'rct_cutoff': self.rct_cutoff,
+                'max_apt': self.max_apt,
+                'apt_cutoff': self.apt_cutoff,
+                'bytes_per_sec': self.bytes / elapsed if elapsed else None,
+                'eval_us_per_sample': self._eval_ns / 1000 / self.samples if self.samples else None,
+                'note': self.note,
+            }
+
+
+class HealthMonitor:
+    """
+    所有熵源的健康测试
+
+    policy='exclude' 时 record() 对失败的熵源返回False, 调用方改用系统CSPRNG字节;
+    policy='flag' 时只记录失败, 熵源仍参与混合。
+    """
+
+    def __init__(self, policy='exclude', sources=None):
+        if policy not in POLICIES:
+            raise ValueError(f"未知的健康测试策略: {policy}")
+        self.policy = policy
+        self.tests = {name: HealthTest(name, h, symbol)
+                      for name, (h, symbol) in (sources or SOURCES).items()}
+        self._notes = {}
+
+    def record(self, name, data):
+        """
+        送入熵源的原始采样
+
+        Returns:
+            bool: 该熵源是否可以使用
+        """
+        test = self.tests.get(name)
+        if test is None:
+            return True
+        return test.feed(data) or self.policy == 'flag'
+
+    def usable(self, name):
+        test = self.tests.get(name)
+        return test is None or test.healthy or self.policy == 'flag'
+
+    def flag(self, name, note):
+        """记录不影响使用的异常 (例如 uuid.getnode() 退回随机MAC)"""
+        self._notes[name] = note
+        test = self.tests.get(name)
+        if test is not None:
+            test.note = note
+
+    def status(self):
+        """
+        Returns:
+            dict: 熵源名称 -> 健康状态、失败次数、最长游程/窗口计数及截止值、吞吐量
+        """
+        for test in self.tests.values():
+            test.flush()
+        result = {name: test.status() for name, test in self.tests.items()}
+        for name, note in self._notes.items():
+            result.setdefault(name, {'healthy': True, 'note': note})
+        return result
+
+    def reset(self, name=None):
+        """清除失败状态 (None 表示全部)"""
+        for test_name, test in self.tests.items():
+            if name is None or test_name == name:
+                test.reset()
+        if name is None:
+            self._notes.clear()
+        else:
+            self._notes.pop(name, None)
+
+default_monitor = HealthMonitor()
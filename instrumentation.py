@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+
+# 没有观察者时 span() 直接返回共享的空对象, 关闭状态下每个阶段只多一次列表判断
+_observers = []
+_lock = threading.Lock()
+
+
+class Event:
+    """
+    一次计时事件
+
+    只包含阶段名称、耗时和成功与否, 不携带任何熵、助记词或密钥数据。
+    """
+    __slots__ = ('kind', 'name', 'duration_ns', 'ok', 'timestamp')
+
+    def __init__(self, kind, name, duration_ns, ok, timestamp):
+        self.kind = kind              # 'source' (熵源) 或 'phase' (阶段)
+        self.name = name
+        self.duration_ns = duration_ns
+        self.ok = ok
+        self.timestamp = timestamp    # 事件结束时的 time.time()
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'duration_ns': self.duration_ns,
+            'ok': self.ok,
+            'timestamp': self.timestamp,
+        }
+
+    def __repr__(self):
+        return f"Event({self.kind}/{self.name}, {self.duration_ns / 1e6:.3f}ms, ok={self.ok})"
+
+
+class _Span:
+    __slots__ = ('kind', 'name', 'ok', '_start')
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.ok = True
+
+    def fail(self):
+        """标记本阶段失败 (例如熵源出错后改用随机字节)"""
+        self.ok = False
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self._start
+        _emit(Event(self.kind, self.name, duration, self.ok and exc_type is None, time.time()))
+        return False
+
+    def end(self):
+        """结束由 start() 开始的计时"""
+        self.__exit__(None, None, None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def fail(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def end(self):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def span(kind, name):
+    """
+    计时上下文管理器
+
+    Args:
+        kind: 'source' 或 'phase'
+        name: 熵源或阶段名称
+    """
+    if not _observers:
+        return _NULL_SPAN
+    return _Span(kind, name)
+
+def start(kind, name):
+    """开始计时, 用于跨越较长代码块的阶段, 结束时调用返回值的 end()"""
+    return span(kind, name).__enter__()
+
+def enabled():
+    return bool(_observers)
+
+def _emit(event):
+    for observer in _observers:
+        try:
+            observer(event)
+        except Exception:
+            # 观察者出错不能影响密钥生成
+            pass
+
+def add_observer(observer):
+    """
+    注册观察者
+
+    Args:
+        observer: 可调用对象, 每个事件调用一次 observer(event)
+    """
+    global _observers
+    with _lock:
+        # 复制后替换, 遍历中的 _emit 不受影响
+        _observers = _observers + [observer]
+    return observer
+
+def remove_observer(observer):
+    global _observers
+    with _lock:
+        _observers = [o for o in _observers if o is not observer]
+
+def _percentile(sorted_samples, pct):
+    # 最近秩法
+    rank = max(1, -(-len(sorted_samples) * pct // 100))
+    return sorted_samples[int(rank) - 1]
+
+def summarize(samples_ns):
+    """延迟样本(ns) -> 统计值(微秒), 供 benchmark 和 daemon 的 stats 共用"""
+    samples = sorted(samples_ns)
+    total = sum(samples)
+    return {
+        'iterations': len(samples),
+        'median_us': _percentile(samples, 50) / 1000,
+        'p95_us': _percentile(samples, 95) / 1000,
+        'p99_us': _percentile(samples, 99) / 1000,
+        'mean_us': total / len(samples) / 1000,
+        'ops_per_sec': len(samples) / (total / 1e9) if total else None,
+    }
+
+
+# 直方图桶上限(秒)
+DEFAULT_BUCKETS = (0.00001, 0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class MetricsAggregator:
+    """
+    内置的聚合观察者, 按 (kind, name) 汇总直方图并导出 Prometheus 文本格式
+
+    用法:
+        metrics = instrumentation.add_observer(MetricsAggregator())
+        ...
+        metrics.dump('/var/lib/node_exporter/bip39_keygen.prom')
+    """
+
+    def __init__(self, prefix='bip39_keygen', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # (kind, name) -> [桶计数..., 总数, 总耗时(秒), 失败次数]
+
+    def __call__(self, event):
+        seconds = event.duration_ns / 1e9
+        key = (event.kind, event.name)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0, 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            n = len(self.buckets)
+            series[n] += 1
+            series[n + 1] += seconds
+            if not event.ok:
+                series[n + 2] += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: (kind, name) -> {'count', 'sum_seconds', 'failures'}
+        """
+        n = len(self.buckets)
+        with self._lock:
+            return {
+                key: {'count': s[n], 'sum_seconds': s[n + 1], 'failures': s[n + 2]}
+                for key, s in self._series.items()
+            }
+
+    def to_prometheus(self):
+        n = len(self.buckets)
+        name = f"{self.prefix}_stage_seconds"
+        failures = f"{self.prefix}_stage_failures_total"
+        lines = [
+            f"# HELP {name} Duration of key generation entropy sources and phases.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+            for (kind, stage), s in series:
+                labels = f'kind="{kind}",stage="{stage}"'
+                for i, bound in enumerate(self.buckets):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {s[i]}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {s[n]}')
+                lines.append(f'{name}_sum{{{labels}}} {s[n + 1]:.9f}')
+                lines.append(f'{name}_count{{{labels}}} {s[n]}')
+            lines.append(f"# HELP {failures} Entropy sources or phases that failed and fell back to CSPRNG bytes.")
+            lines.append(f"# TYPE {failures} counter")
+            for (kind, stage), s in series:
+                lines.append(f'{failures}{{kind="{kind}",stage="{stage}"}} {s[n + 2]}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """原子地写入 Prometheus 文本文件 (供 node_exporter textfile 收集器读取)"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
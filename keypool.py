@@ -0,0 +1,365 @@
+import collections
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+
+# cryptography 只在打开密钥池时导入
+AESGCM = None
+
+logger = logging.getLogger(__name__)
+
+# 文件头 = 魔数 + 版本 + scrypt盐值(16) + 密码校验值(8)
+# 之后是只追加的帧: 类型(u8) + 密钥序号(u64) + 数据长度(u32) + 数据
+#   KEY: 数据为 nonce(12) + AES-256-GCM密文, 帧头作为附加认证数据 (记录不能被移动或改号)
+#   ISSUED: 没有数据, 表示该序号的密钥已经发放, 永远不会再次发放
+MAGIC = b'BKPL'
+VERSION = 1
+HEADER = struct.Struct('>4sB16s8s')
+FRAME = struct.Struct('>BQI')
+KEY = 1
+ISSUED = 2
+NONCE_SIZE = 12
+SCRYPT_PARAMS = {'n': 1 << 15, 'r': 8, 'p': 1, 'maxmem': 64 * 1024 * 1024}
+
+DEFAULT_SIZE = 100
+DEFAULT_LOW_WATER = 20
+# 后台补充时每批生成的数量 (每批之后 fsync 一次, 新密钥才可以发放)
+REFILL_BATCH = 10
+# 补充失败后重试的间隔(秒)
+RETRY_INTERVAL = 5.0
+
+
+class KeyPoolEmpty(Exception):
+    """密钥池中没有可发放的密钥"""
+
+def _require_crypto():
+    global AESGCM
+    if AESGCM is None:
+        try:
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        except ImportError:
+            raise ImportError("密钥池需要安装cryptography: pip install cryptography")
+
+def _derive_key(password, salt):
+    return hashlib.scrypt(password.encode(), salt=salt, dklen=32, **SCRYPT_PARAMS)
+
+def _check_value(key):
+    # 只用于在打开时发现密码错误, 不泄露密钥
+    return hashlib.sha256(b'keypool-password-check' + key).digest()[:8]
+
+def _fsync_dir(path):
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class KeyPool:
+    """
+    预生成的加密密钥池 (与 Bitcoin Core 的 keypool 类似)
+
+    密钥由 generate_new_key + mnemonic_to_private_key 完整生成后加密追加到文件中,
+    内存中只保存每个未发放密钥的偏移量。issue() 读取一条记录、追加 ISSUED 标记并
+    fsync 之后才返回, 因此进程崩溃后已发放 (或可能已发放) 的密钥都不会再次发放;
+    未写完的尾部记录在下次打开时截掉。后台补充线程在剩余数量低于 low_water 时
+    把密钥池补充到 size。同一个文件同时只能由一个进程打开 (POSIX 上用 flock 保证)。
+    """
+
+    def __init__(self, path, password, size=DEFAULT_SIZE, low_water=DEFAULT_LOW_WATER,
+                 word_count=12, passphrase=None, workers=1):
+        """
+        Args:
+            path: 密钥池文件, 不存在时创建
+            password: 加密密码
+            size: 补充的目标数量
+            low_water: 剩余数量低于此值时开始补充
+            word_count: 助记词单词数量
+            passphrase: 不为None时使用BIP39标准种子派生
+            workers: 补充时的生成进程数 (1 表示在补充线程中生成, 不fork)
+
+        Raises:
+            ValueError: 文件格式错误、密码错误或文件正被其他进程使用
+        """
+        if not 0 <= low_water <= size:
+            raise ValueError("low_water 必须在0到size之间")
+        _require_crypto()
+        self.path = path
+        self.size = size
+        self.low_water = low_water
+        self.word_count = word_count
+        self.passphrase = passphrase
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._available = collections.deque()  # (序号, 偏移量, 长度)
+        self._issued = 0
+        self._next_index = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o600)
+        try:
+            self._lock_file()
+            self._aead = AESGCM(self._load(password))
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _lock_file(self):
+        try:
+            import fcntl
+        except ImportError:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            raise ValueError(f"密钥池文件正被其他进程使用: {self.path}")
+
+    def _read_at(self, offset, length):
+        if hasattr(os, 'pread'):
+            return os.pread(self._fd, length, offset)
+        os.lseek(self._fd, offset, os.SEEK_SET)
+        return os.read(self._fd, length)
+
+    def _load(self, password):
+        """读取文件头并扫描所有帧, 返回加密密钥"""
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            salt = os.urandom(16)
+            key = _derive_key(password, salt)
+            os.write(self._fd, HEADER.pack(MAGIC, VERSION, salt, _check_value(key)))
+            os.fsync(self._fd)
+            _fsync_dir(self.path)
+            return key
+        header = self._read_at(0, HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("不是密钥池文件")
+        magic, version, salt, check = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不是密钥池文件")
+        key = _derive_key(password, salt)
+        if check != _check_value(key):
+            raise ValueError("密钥池密码错误")
+
+        available = {}
+        offset = HEADER.size
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                frame = f.read(FRAME.size)
+                if len(frame) < FRAME.size:
+                    break
+                kind, index, length = FRAME.unpack(frame)
+                if kind == KEY:
+                    if len(f.read(length)) < length:
+                        break
+                    available[index] = (index, offset, FRAME.size + length)
+                elif kind == ISSUED and length == 0:
+                    if available.pop(index, None) is not None:
+                        self._issued += 1
+                else:
+                    raise ValueError(f"密钥池文件在偏移量 {offset} 处损坏")
+                self._next_index = max(self._next_index, index + 1)
+                offset += FRAME.size + length
+        if offset < size:
+            # 上次写入时崩溃留下的不完整尾部: 没有 fsync 完成, 对应的密钥从未发放
+            logger.warning("密钥池文件尾部有 %d 字节不完整的记录, 已截断", size - offset)
+            os.ftruncate(self._fd, offset)
+            os.fsync(self._fd)
+        self._available.extend(sorted(available.values()))
+        return key
+
+    def __len__(self):
+        return len(self._available)
+
+    def _append(self, data):
+        """追加并返回起始偏移量 (调用方持有锁)"""
+        offset = os.lseek(self._fd, 0, os.SEEK_END)
+        os.write(self._fd, data)
+        return offset
+
+    def _encode(self, record):
+        frame_header = FRAME.pack(KEY, record['index'], 0)
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = self._aead.encrypt(nonce, json.dumps(record).encode(), frame_header)
+        return FRAME.pack(KEY, record['index'], NONCE_SIZE + len(ciphertext)) + nonce + ciphertext
+
+    def _decode(self, data):
+        kind, index, length = FRAME.unpack(data[:FRAME.size])
+        body = data[FRAME.size:]
+        if kind != KEY or len(body) != length:
+            raise ValueError(f"密钥记录 {index} 损坏")
+        try:
+            plaintext = self._aead.decrypt(body[:NONCE_SIZE], body[NONCE_SIZE:], FRAME.pack(KEY, index, 0))
+        except Exception:
+            raise ValueError(f"密钥记录 {index} 认证失败")
+        return json.loads(plaintext)
+
+    def add(self, keys):
+        """
+        加密追加已生成的密钥, fsync 之后才可以发放
+
+        Args:
+            keys: (mnemonic, seed, master_private_key, wif) 的可迭代对象, 与 generate_batch 的结果相同
+
+        Returns:
+            int: 追加的数量
+        """
+        keys = list(keys)
+        with self._lock:
+            records = []
+            for mnemonic, seed, master_private_key, wif in keys:
+                records.append((self._next_index, self._encode({
+                    'index': self._next_index,
+                    'mnemonic': mnemonic,
+                    'seed': seed.hex(),
+                    'master_private_key': master_private_key.hex(),
+                    'wif': wif,
+                    'created': time.time(),
+                })))
+                self._next_index += 1
+            entries = []
+            if records:
+                offset = self._append(b''.join(data for _, data in records))
+                os.fsync(self._fd)
+                for index, data in records:
+                    entries.append((index, offset, len(data)))
+                    offset += len(data)
+                self._available.extend(entries)
+                self._cond.notify_all()
+        return len(entries)
+
+    def fill(self, count=None):
+        """
+        在当前线程中生成密钥, 补充到 size (或追加 count 个)
+
+        Returns:
+            int: 追加的数量
+        """
+        import generator
+
+        if count is None:
+            count = self.size - len(self._available)
+        added = 0
+        while added < count and not self._stop.is_set():
+            batch = min(REFILL_BATCH, count - added)
+            added += self.add(generator.generate_batch(batch, self.word_count, self.workers, self.passphrase))
+        return added
+
+    def issue(self, timeout=0):
+        """
+        发放一个密钥
+
+        Args:
+            timeout: 密钥池为空时等待后台补充的秒数, None 表示一直等待
+
+        Returns:
+            dict: index, mnemonic, seed, master_private_key, wif, created
+
+        Raises:
+            KeyPoolEmpty: 超时后仍然没有密钥
+            ValueError: 记录损坏 (该密钥已标记为发放, 不会再次尝试)
+        """
+        with self._cond:
+            if not self._available and timeout != 0:
+                self._cond.wait_for(lambda: self._available or self._stop.is_set(), timeout)
+            if not self._available:
+                raise KeyPoolEmpty("密钥池中没有可发放的密钥")
+            index, offset, length = self._available.popleft()
+            data = self._read_at(offset, length)
+            # 先持久化发放标记再返回: 崩溃后这个密钥不会被再次发放
+            self._append(FRAME.pack(ISSUED, index, 0))
+            os.fsync(self._fd)
+            self._issued += 1
+            if len(self._available) < self.low_water:
+                self._cond.notify_all()
+        return self._decode(data)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._available) < self.low_water or self._stop.is_set())
+            if self._stop.is_set():
+                break
+            try:
+                self.fill()
+            except Exception:
+                logger.exception("密钥池补充失败, %.0f秒后重试", RETRY_INTERVAL)
+                self._stop.wait(RETRY_INTERVAL)
+
+    def start(self):
+        """启动后台补充线程 (重复调用无副作用)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="keypool-refill", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台补充线程 (等待当前一批生成完成)"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def compact(self):
+        """
+        重写文件, 只保留未发放的密钥记录 (已发放的密文和发放标记不再保留在磁盘上)
+
+        新文件写完并 fsync 后原子地替换原文件。
+        """
+        with self._lock:
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            entries = []
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            with os.fdopen(os.open(tmp, flags, 0o600), 'wb') as f:
+                f.write(self._read_at(0, HEADER.size))
+                offset = HEADER.size
+                for index, old_offset, length in self._available:
+                    f.write(self._read_at(old_offset, length))
+                    entries.append((index, offset, length))
+                    offset += length
+                f.flush()
+                os.fsync(f.fileno())
+            old_fd, self._fd = self._fd, os.open(tmp, os.O_RDWR | os.O_APPEND | getattr(os, 'O_BINARY', 0))
+            self._lock_file()
+            os.replace(tmp, self.path)
+            _fsync_dir(self.path)
+            os.close(old_fd)
+            self._available = collections.deque(entries)
+
+    def status(self):
+        """
+        Returns:
+            dict: available, issued, next_index, size, low_water, refilling
+        """
+        with self._lock:
+            return {
+                'available': len(self._available),
+                'issued': self._issued,
+                'next_index': self._next_index,
+                'size': self.size,
+                'low_water': self.low_water,
+                'refilling': self._thread is not None and self._thread.is_alive(),
+            }
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,256 @@
+# secp256k1 椭圆曲线运算 (纯Python)
+#
+# 点用仿射坐标元组 (x, y) 表示, None 为无穷远点; 内部运算使用雅可比坐标 (X, Y, Z),
+# Z == 0 为无穷远点。生成元 G 的标量乘法使用预计算的固定基窗口表:
+# 32个8位窗口 × 256个点, 一次乘法只需32次混合加法, 不需要倍点。
+import threading
+
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+WINDOW_BITS = 8
+_WINDOWS = 256 // WINDOW_BITS
+
+_INFINITY = (1, 1, 0)
+
+def _double(p):
+    """雅可比坐标倍点 (a = 0)"""
+    X1, Y1, Z1 = p
+    if not Z1 or not Y1:
+        return _INFINITY
+    A = X1 * X1 % P
+    B = Y1 * Y1 % P
+    C = B * B % P
+    D = 2 * ((X1 + B) * (X1 + B) - A - C) % P
+    E = 3 * A % P
+    X3 = (E * E - 2 * D) % P
+    Y3 = (E * (D - X3) - 8 * C) % P
+    Z3 = 2 * Y1 * Z1 % P
+    return (X3, Y3, Z3)
+
+def _add_mixed(p, q):
+    """雅可比坐标点 + 仿射坐标点"""
+    if q is None:
+        return p
+    X1, Y1, Z1 = p
+    if not Z1:
+        return (q[0], q[1], 1)
+    Z1Z1 = Z1 * Z1 % P
+    U2 = q[0] * Z1Z1 % P
+    S2 = q[1] * Z1 * Z1Z1 % P
+    H = (U2 - X1) % P
+    R = (S2 - Y1) % P
+    if not H:
+        return _double(p) if not R else _INFINITY
+    HH = H * H % P
+    HHH = H * HH % P
+    V = X1 * HH % P
+    X3 = (R * R - HHH - 2 * V) % P
+    Y3 = (R * (V - X3) - Y1 * HHH) % P
+    Z3 = Z1 * H % P
+    return (X3, Y3, Z3)
+
+def _add(p, q):
+    """雅可比坐标点 + 雅可比坐标点"""
+    X1, Y1, Z1 = p
+    X2, Y2, Z2 = q
+    if not Z1:
+        return q
+    if not Z2:
+        return p
+    Z1Z1 = Z1 * Z1 % P
+    Z2Z2 = Z2 * Z2 % P
+    U1 = X1 * Z2Z2 % P
+    U2 = X2 * Z1Z1 % P
+    S1 = Y1 * Z2 * Z2Z2 % P
+    S2 = Y2 * Z1 * Z1Z1 % P
+    H = (U2 - U1) % P
+    R = (S2 - S1) % P
+    if not H:
+        return _double(p) if not R else _INFINITY
+    HH = H * H % P
+    HHH = H * HH % P
+    V = U1 * HH % P
+    X3 = (R * R - HHH - 2 * V) % P
+    Y3 = (R * (V - X3) - S1 * HHH) % P
+    Z3 = Z1 * Z2 * H % P
+    return (X3, Y3, Z3)
+
+def to_affine(p):
+    """雅可比坐标 -> 仿射坐标"""
+    X, Y, Z = p
+    if not Z:
+        return None
+    z_inv = pow(Z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return (X * z_inv2 % P, Y * z_inv2 * z_inv % P)
+
+def batch_to_affine(points):
+    """
+    批量 雅可比坐标 -> 仿射坐标
+
+    使用 Montgomery 技巧: n 个点只做一次模逆, 其余为 3(n-1) 次乘法。
+    """
+    prefix = []
+    acc = 1
+    for X, Y, Z in points:
+        prefix.append(acc)
+        if Z:
+            acc = acc * Z % P
+    inv = pow(acc, -1, P)
+    result = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        X, Y, Z = points[i]
+        if not Z:
+            continue
+        z_inv = inv * prefix[i] % P
+        inv = inv * Z % P
+        z_inv2 = z_inv * z_inv % P
+        result[i] = (X * z_inv2 % P, Y * z_inv2 * z_inv % P)
+    return result
+
+_g_table = None
+_g_table_lock = threading.Lock()
+
+def _build_g_table():
+    """预计算 table[i][j] = j * 2^(8i) * G"""
+    table = []
+    base = G
+    for _ in range(_WINDOWS):
+        row = [_INFINITY]
+        acc = _INFINITY
+        for _ in range(1, 1 << WINDOW_BITS):
+            acc = _add_mixed(acc, base)
+            row.append(acc)
+        # 下一个窗口的基点 = 256 * base
+        row.append(_add_mixed(acc, base))
+        row = batch_to_affine(row)
+        base = row.pop()
+        table.append(row)
+    return table
+
+def _get_g_table():
+    global _g_table
+    if _g_table is None:
+        with _g_table_lock:
+            if _g_table is None:
+                _g_table = _build_g_table()
+    return _g_table
+
+def _mul_g_jacobian(k):
+    table = _get_g_table()
+    acc = _INFINITY
+    i = 0
+    while k:
+        j = k & 0xFF
+        if j:
+            acc = _add_mixed(acc, table[i][j])
+        k >>= WINDOW_BITS
+        i += 1
+    return acc
+
+def mul_g(k):
+    """k * G (使用固定基窗口表)"""
+    return to_affine(_mul_g_jacobian(k % N))
+
+def walk_g(k, batch_size=256):
+    """
+    从 k*G 开始逐次加 G, 按批产出连续的仿射点
+
+    每个点只需一次混合加法, 每批用 batch_to_affine 合并为一次模逆。
+
+    Args:
+        k: 起始标量
+        batch_size: 每批点数
+
+    Yields:
+        list: batch_size 个仿射点, 依次为 (k+i)*G
+    """
+    acc = _mul_g_jacobian(k % N)
+    while True:
+        batch = []
+        for _ in range(batch_size):
+            batch.append(acc)
+            acc = _add_mixed(acc, G)
+        yield batch_to_affine(batch)
+
+def multiply(point, k):
+    """
+    任意点的标量乘法 k * point (4位窗口)
+
+    Args:
+        point: 仿射坐标点
+        k: 标量
+    """
+    k %= N
+    if point is None or not k:
+        return None
+    if point == G:
+        return mul_g(k)
+    # 预计算 0..15 倍点
+    table = [None, point]
+    acc = (point[0], point[1], 1)
+    for _ in range(14):
+        acc = _add_mixed(acc, point)
+        table.append(acc)
+    table[2:] = batch_to_affine(table[2:])
+
+    acc = _INFINITY
+    for shift in range((k.bit_length() + 3) // 4 * 4 - 4, -4, -4):
+        acc = _double(_double(_double(_double(acc))))
+        acc = _add_mixed(acc, table[(k >> shift) & 0xF])
+    return to_affine(acc)
+
+def add(p, q):
+    """两个仿射坐标点相加"""
+    if p is None:
+        return q
+    return to_affine(_add_mixed((p[0], p[1], 1), q))
+
+def negate(p):
+    return None if p is None else (p[0], (-p[1]) % P)
+
+def is_on_curve(p):
+    return p is not None and (p[1] * p[1] - p[0] * p[0] * p[0] - 7) % P == 0
+
+def serialize(p, compressed=True):
+    """点 -> SEC 编码 (压缩33字节 / 非压缩65字节)"""
+    x = p[0].to_bytes(32, 'big')
+    if compressed:
+        return bytes([2 + (p[1] & 1)]) + x
+    return b'\x04' + x + p[1].to_bytes(32, 'big')
+
+def deserialize(data):
+    """SEC 编码 -> 点, 不在曲线上时抛出ValueError"""
+    if len(data) == 33 and data[0] in (2, 3):
+        x = int.from_bytes(data[1:], 'big')
+        if x >= P:
+            raise ValueError("无效的公钥")
+        y = pow((x * x * x + 7) % P, (P + 1) // 4, P)
+        if (y & 1) != (data[0] & 1):
+            y = P - y
+        point = (x, y)
+    elif len(data) == 65 and data[0] == 4:
+        point = (int.from_bytes(data[1:33], 'big'), int.from_bytes(data[33:], 'big'))
+    else:
+        raise ValueError("无效的公钥编码")
+    if not is_on_curve(point):
+        raise ValueError("公钥不在secp256k1曲线上")
+    return point
+
+def public_key(private_key, compressed=True):
+    """
+    私钥 -> SEC 编码公钥
+
+    Args:
+        private_key: 32字节私钥
+        compressed: 是否压缩
+    """
+    k = int.from_bytes(private_key, 'big')
+    if not 0 < k < N:
+        raise ValueError("私钥超出secp256k1范围")
+    return serialize(mul_g(k), compressed)
@@ -0,0 +1,174 @@
+import mmap
+import sys
+import threading
+
+# ctypes 只在第一次锁定内存时导入
+ctypes = None
+_lock_functions = None
+
+# 每个线程的可复用缓冲区: 名称 -> 长度 -> SecretBuffer
+_scratch = threading.local()
+
+def _load_lock_functions():
+    """
+    返回 (lock, unlock) 函数, 不支持时返回 (None, None)
+
+    POSIX 使用 libc 的 mlock/munlock, Windows 使用 VirtualLock/VirtualUnlock。
+    """
+    global ctypes, _lock_functions
+    if _lock_functions is not None:
+        return _lock_functions
+    try:
+        import ctypes as _ctypes
+        ctypes = _ctypes
+        if sys.platform == 'win32':
+            kernel32 = ctypes.windll.kernel32
+            lock, unlock = kernel32.VirtualLock, kernel32.VirtualUnlock
+        else:
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            lock, unlock = libc.mlock, libc.munlock
+        lock.argtypes = unlock.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+        _lock_functions = (lock, unlock)
+    except (ImportError, OSError, AttributeError):
+        _lock_functions = (None, None)
+    return _lock_functions
+
+
+class SecretBuffer:
+    """
+    固定长度的秘密数据缓冲区
+
+    每个缓冲区是独立的匿名映射页: 尽量用 mlock 锁定在内存中 (不被换出到磁盘),
+    Linux 上还会排除在核心转储之外。所有操作都在原地进行, wipe()/close()
+    或离开 with 块时用零覆盖。锁定失败 (例如超过 RLIMIT_MEMLOCK) 时照常工作,
+    locked 为False。
+
+    注意: hashlib 等函数返回的 bytes 和由此创建的 str 是不可变对象, 无法清零;
+    调用方应直接把 view() 传给接受缓冲区的函数, 避免生成这样的副本。
+    """
+
+    def __init__(self, size_or_data, reusable=False):
+        """
+        Args:
+            size_or_data: 缓冲区长度, 或用来初始化的字节数据 (会被复制)
+            reusable: 为True时离开 with 块只清零, 不释放 (见 scratch())
+        """
+        self.reusable = reusable
+        if isinstance(size_or_data, int):
+            size, data = size_or_data, None
+        else:
+            data = memoryview(size_or_data)
+            size = data.nbytes
+        if size <= 0:
+            raise ValueError("秘密缓冲区长度必须大于0")
+        self._size = size
+        self._map = mmap.mmap(-1, size)
+        self._view = memoryview(self._map)[:size]
+        self._address = None
+        self.locked = False
+        dontdump = getattr(mmap, 'MADV_DONTDUMP', None)
+        if dontdump is not None:
+            try:
+                self._map.madvise(dontdump)
+            except OSError:
+                pass
+        self._lock()
+        if data is not None:
+            self._view[:] = data.cast('B') if data.format != 'B' else data
+
+    def _lock(self):
+        lock, _ = _load_lock_functions()
+        if lock is None:
+            return
+        # from_buffer 导出映射的地址; 导出期间映射不会被关闭或移动
+        self._address = ctypes.c_char.from_buffer(self._map)
+        result = lock(ctypes.addressof(self._address), len(self._map))
+        # mlock 成功返回0, VirtualLock 成功返回非零
+        self.locked = bool(result) if sys.platform == 'win32' else result == 0
+
+    def __len__(self):
+        return self._size
+
+    def view(self):
+        """可写的 memoryview, 可直接传给 hashlib、int.from_bytes 等接受缓冲区的函数"""
+        if self._view is None:
+            raise ValueError("秘密缓冲区已关闭")
+        return self._view
+
+    def write(self, data, offset=0):
+        """把 data 复制到 offset 处"""
+        self.view()[offset:offset + len(data)] = data
+
+    def xor_cycle(self, data):
+        """把 data 循环重复后原地异或进整个缓冲区"""
+        view = self.view()
+        n = len(data)
+        for i in range(self._size):
+            view[i] ^= data[i % n]
+
+    def wipe(self):
+        """用零覆盖"""
+        if self._view is not None:
+            self._view[:] = bytes(self._size)
+
+    def close(self):
+        """清零、解除锁定并释放映射"""
+        if self._view is None:
+            return
+        self.wipe()
+        if self._address is not None:
+            _, unlock = _load_lock_functions()
+            if self.locked:
+                unlock(ctypes.addressof(self._address), len(self._map))
+            self._address = None
+            self.locked = False
+        view, self._view = self._view, None
+        view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # 调用方仍持有 view() 的切片; 已经清零, 映射在切片释放后由垃圾回收关闭
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.reusable:
+            self.wipe()
+        else:
+            self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __repr__(self):
+        # 不显示内容
+        return f"<SecretBuffer {self._size} bytes{' locked' if self.locked else ''}>"
+
+def scratch(name, size):
+    """
+    线程内复用的秘密缓冲区
+
+    同一线程中同名同长度的调用返回同一个已锁定的缓冲区, 离开 with 块时只清零,
+    因此每个密钥的处理过程不再新建映射和锁定内存。不同用途必须使用不同的名称,
+    同一名称的缓冲区不能嵌套使用。
+
+    Args:
+        name: 用途名称
+        size: 缓冲区长度
+    """
+    buffers = getattr(_scratch, 'buffers', None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    by_size = buffers.get(name)
+    if by_size is None:
+        by_size = buffers[name] = {}
+    buffer = by_size.get(size)
+    if buffer is None:
+        buffer = by_size[size] = SecretBuffer(size, reusable=True)
+    return buffer
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from secure_buffer import scratch
+
+PBKDF2_ROUNDS = 2048
+# PBKDF2 输入缓冲区按此粒度取整, 每个线程只保留少数几种长度的缓冲区
+INPUT_ALIGN = 256
+
+def legacy_salt(timestamp):
+    """旧版盐值: 'mnemonic' + 生成时间 (与其他钱包不兼容)"""
+    return 'mnemonic' + timestamp.strftime('%Y%m%d%H%M%S')
+
+def bip39_salt(passphrase=''):
+    """BIP39标准盐值: 'mnemonic' + 密码短语"""
+    return 'mnemonic' + passphrase
+
+def _utf8_length(text):
+    if text.isascii():
+        return len(text)
+    return sum(1 if o < 0x80 else 2 if o < 0x800 else 3 if o < 0x10000 else 4 for o in map(ord, text))
+
+def _encode_into(view, offset, text):
+    """
+    把 text 的UTF-8编码逐字符写入 view[offset:]
+
+    不调用 text.encode(), 避免生成包含完整助记词的 bytes 副本; ASCII 字符直接写入,
+    其他字符只产生1-4字节的片段。
+    """
+    for c in text:
+        o = ord(c)
+        if o < 0x80:
+            view[offset] = o
+            offset += 1
+        else:
+            data = c.encode()
+            view[offset:offset + len(data)] = data
+            offset += len(data)
+    return offset
+
+def _pbkdf2_input(mnemonic, salt):
+    """
+    NFKD规范化后的 助记词 + 盐值 的UTF-8编码, 写入线程内复用的秘密缓冲区
+
+    已是NFKD形式的字符串 (例如生成器输出的助记词) 规范化时不会产生副本。
+
+    Returns:
+        (SecretBuffer, 助记词长度, 总长度): 调用方须在 with 块中使用缓冲区,
+        离开时清零; 助记词为 view()[:助记词长度], 盐值为 view()[助记词长度:总长度]
+    """
+    mnemonic = unicodedata.normalize('NFKD', mnemonic)
+    salt = unicodedata.normalize('NFKD', salt)
+    split = _utf8_length(mnemonic)
+    end = split + _utf8_length(salt)
+    buffer = scratch('pbkdf2-input', (end // INPUT_ALIGN + 1) * INPUT_ALIGN)
+    view = buffer.view()
+    _encode_into(view, 0, mnemonic)
+    _encode_into(view, split, salt)
+    return buffer, split, end
+
+def _pbkdf2(mnemonic, salt):
+    # hashlib 直接读取缓冲区; 返回的种子是 bytes, hashlib 不支持写入调用方的缓冲区
+    buffer, split, end = _pbkdf2_input(mnemonic, salt)
+    with buffer:
+        view = buffer.view()
+        return hashlib.pbkdf2_hmac('sha512', view[:split], view[split:end], PBKDF2_ROUNDS)
+
+
+class SeedCache:
+    """
+    有界的种子LRU缓存
+
+    键为 SHA256(助记词 || 盐值), 不保存助记词明文; 种子存放在 bytearray 中,
+    被淘汰或清空时先用零覆盖。
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(mnemonic, salt):
+        # SHA256(助记词 || 0 || 盐值), 输入同样在秘密缓冲区中编码
+        buffer, split, end = _pbkdf2_input(mnemonic, salt)
+        with buffer:
+            view = buffer.view()
+            h = hashlib.sha256(view[:split])
+            h.update(b'\0')
+            h.update(view[split:end])
+            return h.digest()
+
+    def get(self, mnemonic, salt):
+        key = self._key(mnemonic, salt)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return bytes(value)
+
+    def put(self, mnemonic, salt, seed):
+        key = self._key(mnemonic, salt)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                _zeroize(old)
+            self._entries[key] = bytearray(seed)
+            while len(self._entries) > self.maxsize:
+                _zeroize(self._entries.popitem(last=False)[1])
+
+    def clear(self):
+        with self._lock:
+            for value in self._entries.values():
+                _zeroize(value)
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _zeroize(buf):
+    buf[:] = bytes(len(buf))
+
+# 审计时可共享的默认缓存, 需要调用方显式传入
+default_cache = SeedCache()
+
+def derive_seed(mnemonic, salt, cache=None):
+    """
+    PBKDF2-HMAC-SHA512 派生种子
+
+    Args:
+        mnemonic: 助记词
+        salt: 盐值 (legacy_salt 或 bip39_salt 的结果)
+        cache: 可选的 SeedCache
+
+    Returns:
+        bytes: 64字节种子
+    """
+    if cache is not None:
+        seed = cache.get(mnemonic, salt)
+        if seed is not None:
+            return seed
+    seed = _pbkdf2(mnemonic, salt)
+    if cache is not None:
+        cache.put(mnemonic, salt, seed)
+    return seed
+
+def _derive_pair(pair):
+    return _pbkdf2(*pair)
+
+def derive_seeds(pairs, workers=None, processes=False, cache=None):
+    """
+    批量派生种子
+
+    hashlib 的 PBKDF2 在计算时会释放GIL, 线程池即可利用多核;
+    processes=True 时改用进程池。
+
+    Args:
+        pairs: (助记词, 盐值) 列表
+        workers: 并发数, 默认为CPU核心数
+        processes: 是否使用进程池
+        cache: 可选的 SeedCache, 命中的条目不再计算
+
+    Returns:
+        list: 种子列表, 顺序与输入一致
+    """
+    pairs = list(pairs)
+    seeds = [None] * len(pairs)
+    pending = []
+    for i, (mnemonic, salt) in enumerate(pairs):
+        seed = cache.get(mnemonic, salt) if cache is not None else None
+        if seed is None:
+            pending.append(i)
+        else:
+            seeds[i] = seed
+    if not pending:
+        return seeds
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    todo = [pairs[i] for i in pending]
+    if workers == 1:
+        results = map(_derive_pair, todo)
+    else:
+        # 延迟导入: concurrent.futures 会连带导入 multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        # 进程池按块分发以减少进程间通信 (线程池忽略chunksize)
+        chunksize = max(1, len(todo) // (workers * 4))
+        with executor_class(workers) as executor:
+            results = list(executor.map(_derive_pair, todo, chunksize=chunksize))
+
+    for i, seed in zip(pending, results):
+        seeds[i] = seed
+        if cache is not None:
+            cache.put(pairs[i][0], pairs[i][1], seed)
+    return seeds
@@ -0,0 +1,163 @@
+import functools
+import hmac
+import os
+
+# GF(256) 使用 AES 的既约多项式 x^8 + x^4 + x^3 + x + 1, 生成元为3 (与 SLIP-39 相同)
+REDUCING_POLYNOMIAL = 0x11B
+
+# 最多16份; x=254 保存校验摘要, x=255 保存秘密本身 (SLIP-39 的约定)
+MAX_SHARE_COUNT = 16
+DIGEST_INDEX = 254
+SECRET_INDEX = 255
+DIGEST_LENGTH = 4
+
+def _build_tables():
+    exp = [0] * 255
+    log = [0] * 256
+    value = 1
+    for i in range(255):
+        exp[i] = value
+        log[value] = i
+        # 乘以生成元3
+        value ^= value << 1
+        if value & 0x100:
+            value ^= REDUCING_POLYNOMIAL
+    return exp, log
+
+EXP, LOG = _build_tables()
+
+def gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return EXP[(LOG[a] + LOG[b]) % 255]
+
+def gf_div(a, b):
+    if b == 0:
+        raise ZeroDivisionError("GF(256) 除数为0")
+    if a == 0:
+        return 0
+    return EXP[(LOG[a] - LOG[b]) % 255]
+
+@functools.lru_cache(maxsize=256)
+def mul_table(c):
+    """
+    乘以常数 c 的256字节查找表
+
+    bytes.translate(mul_table(c)) 一次C层调用就完成整个字节串与 c 的逐字节乘法。
+    """
+    return bytes(gf_mul(c, v) for v in range(256))
+
+@functools.lru_cache(maxsize=1024)
+def lagrange_coefficients(xs, x):
+    """
+    在 x 处插值时各点的拉格朗日基系数 (只与横坐标有关, 批量拆分时每组参数只算一次)
+
+    Args:
+        xs: 已知点的横坐标元组 (互不相同)
+        x: 目标横坐标 (不在 xs 中)
+
+    Returns:
+        tuple: 与 xs 对应的系数
+    """
+    coefficients = []
+    for j, xj in enumerate(xs):
+        numerator = denominator = 1
+        for m, xm in enumerate(xs):
+            if m != j:
+                # 特征为2的域中减法就是异或
+                numerator = gf_mul(numerator, x ^ xm)
+                denominator = gf_mul(denominator, xj ^ xm)
+        coefficients.append(gf_div(numerator, denominator))
+    return tuple(coefficients)
+
+def interpolate(shares, x):
+    """
+    由份额插值出 x 处的值
+
+    Args:
+        shares: (横坐标, 字节串) 列表, 字节串长度相同
+        x: 目标横坐标
+
+    Returns:
+        bytes: x 处的值
+    """
+    xs = tuple(share_x for share_x, _ in shares)
+    if len(set(xs)) != len(xs):
+        raise ValueError("份额的序号不能重复")
+    lengths = {len(data) for _, data in shares}
+    if len(lengths) != 1:
+        raise ValueError("所有份额的长度必须相同")
+    for share_x, data in shares:
+        if share_x == x:
+            return data
+    length = lengths.pop()
+    result = 0
+    for c, (_, data) in zip(lagrange_coefficients(xs, x), shares):
+        result ^= int.from_bytes(data.translate(mul_table(c)), 'big')
+    return result.to_bytes(length, 'big')
+
+def _digest(random_part, secret):
+    return hmac.new(random_part, secret, 'sha256').digest()[:DIGEST_LENGTH]
+
+def split_secret(threshold, count, secret, random_bytes=os.urandom):
+    """
+    把秘密拆成 threshold-of-count 份 (SLIP-39 的 Shamir 方案)
+
+    threshold-2 个份额完全随机, 再加上 x=254 的摘要份额和 x=255 的秘密,
+    其余份额都由这 threshold 个点插值得到; 恢复时用摘要检查结果是否正确。
+
+    Args:
+        threshold: 恢复所需的份数
+        count: 总份数 (不超过16)
+        secret: 秘密字节串 (长度至少为 DIGEST_LENGTH)
+
+    Returns:
+        list: (序号, 份额字节串), 序号为 0..count-1
+    """
+    if not 1 <= threshold <= count:
+        raise ValueError("门限必须在1到份数之间")
+    if count > MAX_SHARE_COUNT:
+        raise ValueError(f"份数不能超过{MAX_SHARE_COUNT}")
+    if threshold == 1:
+        return [(i, secret) for i in range(count)]
+    if len(secret) < DIGEST_LENGTH:
+        raise ValueError(f"秘密至少需要{DIGEST_LENGTH}字节")
+    random_count = threshold - 2
+    shares = [(i, random_bytes(len(secret))) for i in range(random_count)]
+    random_part = random_bytes(len(secret) - DIGEST_LENGTH)
+    base = shares + [(DIGEST_INDEX, _digest(random_part, secret) + random_part), (SECRET_INDEX, secret)]
+    for i in range(random_count, count):
+        shares.append((i, interpolate(base, i)))
+    return shares
+
+def recover_secret(threshold, shares):
+    """
+    由至少 threshold 份恢复秘密
+
+    Args:
+        threshold: 拆分时的门限
+        shares: (序号, 份额字节串) 列表, 只使用前 threshold 份
+
+    Raises:
+        ValueError: 份数不足或摘要不一致 (份额损坏或不属于同一秘密)
+    """
+    if len(shares) < threshold:
+        raise ValueError(f"需要至少{threshold}份, 只提供了{len(shares)}份")
+    shares = list(shares)[:threshold]
+    if threshold == 1:
+        return shares[0][1]
+    secret = interpolate(shares, SECRET_INDEX)
+    digest_share = interpolate(shares, DIGEST_INDEX)
+    if not hmac.compare_digest(digest_share[:DIGEST_LENGTH], _digest(digest_share[DIGEST_LENGTH:], secret)):
+        raise ValueError("份额摘要校验失败")
+    return secret
+
+def split_batch(threshold, count, secrets, random_bytes=os.urandom):
+    """
+    批量拆分; 插值系数按 (threshold, count) 缓存, 每个份额只是几次 translate 和整数异或
+
+    Yields:
+        list: 每个秘密的 split_secret() 结果
+    """
+    for secret in secrets:
+        yield split_secret(threshold, count, secret, random_bytes)
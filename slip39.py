@@ -0,0 +1,325 @@
+import collections
+import hashlib
+import os
+import threading
+
+import shamir
+import wordlist as wordlist_module
+
+# 份额格式 (每个单词10位):
+#   标识符(15) + 可扩展标志(1) + 迭代指数(4) | 组序号(4) + 组门限-1(4) + 组数-1(4)
+#   + 成员序号(4) + 成员门限-1(4) | 份额值(左侧补零到10位的整数倍) | RS1024 校验和(30)
+RADIX_BITS = 10
+RADIX = 1 << RADIX_BITS
+ID_LENGTH_BITS = 15
+ITERATION_EXP_LENGTH_BITS = 4
+EXTENDABLE_FLAG_LENGTH_BITS = 1
+ID_EXP_LENGTH_WORDS = 2
+CHECKSUM_LENGTH_WORDS = 3
+METADATA_LENGTH_WORDS = ID_EXP_LENGTH_WORDS + 2 + CHECKSUM_LENGTH_WORDS
+MIN_STRENGTH_BITS = 128
+MIN_MNEMONIC_LENGTH_WORDS = METADATA_LENGTH_WORDS + -(-MIN_STRENGTH_BITS // RADIX_BITS)
+
+CUSTOMIZATION_STRING_ORIG = b'shamir'
+CUSTOMIZATION_STRING_EXTENDABLE = b'shamir_extendable'
+
+# 主秘密加密: 4轮 Feistel, 每轮 PBKDF2-HMAC-SHA256 (10000 << 迭代指数) / 4 次
+BASE_ITERATION_COUNT = 10000
+ROUND_COUNT = 4
+
+_RS1024_GEN = (
+    0xE0E040, 0x1C1C080, 0x3838100, 0x7070200, 0xE0E0009,
+    0x1C0C2412, 0x38086C24, 0x3090FC48, 0x21B1F890, 0x3F3F120,
+)
+
+def _build_rs1024_table():
+    table = []
+    for b in range(RADIX):
+        value = 0
+        for i in range(10):
+            if (b >> i) & 1:
+                value ^= _RS1024_GEN[i]
+        table.append(value)
+    return tuple(table)
+
+# 移出的高10位 -> 对应生成多项式的异或, 每个单词只查一次表
+_RS1024_TABLE = _build_rs1024_table()
+
+WORDLIST_SIZE = 1024
+_wordlist = None
+_lock = threading.Lock()
+
+def _rs1024_polymod(values):
+    chk = 1
+    table = _RS1024_TABLE
+    for v in values:
+        chk = ((chk & 0xFFFFF) << 10 ^ v) ^ table[chk >> 20]
+    return chk
+
+def rs1024_checksum(data, customization):
+    """SLIP-39 的 RS1024 校验和 (3个10位单词)"""
+    polymod = _rs1024_polymod(tuple(customization) + tuple(data) + (0,) * CHECKSUM_LENGTH_WORDS) ^ 1
+    return tuple((polymod >> (RADIX_BITS * i)) & (RADIX - 1) for i in reversed(range(CHECKSUM_LENGTH_WORDS)))
+
+def rs1024_verify(data, customization):
+    return _rs1024_polymod(tuple(customization) + tuple(data)) == 1
+
+def _customization(extendable):
+    return CUSTOMIZATION_STRING_EXTENDABLE if extendable else CUSTOMIZATION_STRING_ORIG
+
+def load_wordlist(path=None):
+    """
+    加载 SLIP-39 词表 (1024个单词)
+
+    词表文件 slip39.txt 随程序提供 (与 english.txt 一样放在程序目录, 也可放在 wordlists/ 子目录)。
+
+    Raises:
+        FileNotFoundError: 找不到词表文件
+    """
+    global _wordlist
+    if _wordlist is not None and path is None:
+        return _wordlist
+    with _lock:
+        if _wordlist is not None and path is None:
+            return _wordlist
+        file_path = path or wordlist_module.resource_path('slip39')
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"找不到SLIP-39词表文件, 请将 slip39.txt 放到 {wordlist_module.resource_dir()} 或其 wordlists/ 子目录")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            words = tuple(line.strip() for line in f if line.strip())
+        index_of = {word: i for i, word in enumerate(words)}
+        if len(words) != WORDLIST_SIZE or len(index_of) != WORDLIST_SIZE:
+            raise ValueError(f"SLIP-39词表必须包含{WORDLIST_SIZE}个不同的单词")
+        loaded = (words, index_of)
+        if path is None:
+            _wordlist = loaded
+    return loaded
+
+def _int_to_indices(value, length):
+    return [(value >> (RADIX_BITS * i)) & (RADIX - 1) for i in reversed(range(length))]
+
+def _int_from_indices(indices):
+    value = 0
+    for index in indices:
+        value = (value << RADIX_BITS) | index
+    return value
+
+
+class Share(collections.namedtuple('Share', (
+        'identifier', 'extendable', 'iteration_exponent', 'group_index', 'group_threshold',
+        'group_count', 'member_index', 'member_threshold', 'value'))):
+    """一个 SLIP-39 份额及其单词编码"""
+
+    __slots__ = ()
+
+    def indices(self):
+        """份额 -> 10位单词索引列表 (含校验和)"""
+        value_words = -(-len(self.value) * 8 // RADIX_BITS)
+        id_exp = ((self.identifier << (EXTENDABLE_FLAG_LENGTH_BITS + ITERATION_EXP_LENGTH_BITS))
+                  | (int(self.extendable) << ITERATION_EXP_LENGTH_BITS) | self.iteration_exponent)
+        params = ((self.group_index << 16) | ((self.group_threshold - 1) << 12) | ((self.group_count - 1) << 8)
+                  | (self.member_index << 4) | (self.member_threshold - 1))
+        data = (_int_to_indices(id_exp, ID_EXP_LENGTH_WORDS) + _int_to_indices(params, 2)
+                + _int_to_indices(int.from_bytes(self.value, 'big'), value_words))
+        return data + list(rs1024_checksum(data, _customization(self.extendable)))
+
+    def mnemonic(self, words=None):
+        """份额 -> SLIP-39 助记词"""
+        words = words or load_wordlist()[0]
+        return ' '.join(words[i] for i in self.indices())
+
+    @classmethod
+    def from_indices(cls, indices):
+        """
+        10位单词索引列表 -> 份额
+
+        Raises:
+            ValueError: 长度、填充或校验和错误
+        """
+        indices = list(indices)
+        if len(indices) < MIN_MNEMONIC_LENGTH_WORDS:
+            raise ValueError(f"SLIP-39助记词至少需要{MIN_MNEMONIC_LENGTH_WORDS}个单词")
+        padding = (RADIX_BITS * (len(indices) - METADATA_LENGTH_WORDS)) % 16
+        if padding > 8:
+            raise ValueError("SLIP-39助记词长度无效")
+        id_exp = _int_from_indices(indices[:ID_EXP_LENGTH_WORDS])
+        identifier = id_exp >> (EXTENDABLE_FLAG_LENGTH_BITS + ITERATION_EXP_LENGTH_BITS)
+        extendable = bool((id_exp >> ITERATION_EXP_LENGTH_BITS) & 1)
+        iteration_exponent = id_exp & ((1 << ITERATION_EXP_LENGTH_BITS) - 1)
+        if not rs1024_verify(indices, _customization(extendable)):
+            raise ValueError("SLIP-39助记词校验和错误")
+        params = _int_from_indices(indices[ID_EXP_LENGTH_WORDS:ID_EXP_LENGTH_WORDS + 2])
+        group_index, group_threshold, group_count, member_index, member_threshold = (
+            (params >> shift) & 0xF for shift in (16, 12, 8, 4, 0))
+        if group_threshold > group_count:
+            raise ValueError("组门限不能大于组数")
+        value_indices = indices[ID_EXP_LENGTH_WORDS + 2:-CHECKSUM_LENGTH_WORDS]
+        value_bytes = (RADIX_BITS * len(value_indices) - padding) // 8
+        try:
+            value = _int_from_indices(value_indices).to_bytes(value_bytes, 'big')
+        except OverflowError:
+            raise ValueError("SLIP-39助记词填充位不为零")
+        return cls(identifier, extendable, iteration_exponent, group_index, group_threshold + 1,
+                   group_count + 1, member_index, member_threshold + 1, value)
+
+    @classmethod
+    def from_mnemonic(cls, mnemonic, index_of=None):
+        index_of = index_of or load_wordlist()[1]
+        try:
+            return cls.from_indices(index_of[word] for word in mnemonic.lower().split())
+        except KeyError as e:
+            raise ValueError(f"单词 {e.args[0]!r} 不在SLIP-39词表中")
+
+def _round_function(i, passphrase, iteration_exponent, salt, r):
+    iterations = (BASE_ITERATION_COUNT << iteration_exponent) // ROUND_COUNT
+    return hashlib.pbkdf2_hmac('sha256', bytes((i,)) + passphrase, salt + r, iterations, dklen=len(r))
+
+def _salt(identifier, extendable):
+    if extendable:
+        return b''
+    return CUSTOMIZATION_STRING_ORIG + identifier.to_bytes(2, 'big')
+
+def _xor(a, b):
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+def encrypt(master_secret, passphrase, iteration_exponent, identifier, extendable):
+    """用口令加密主秘密 (4轮 Feistel)"""
+    half = len(master_secret) // 2
+    left, right = master_secret[:half], master_secret[half:]
+    salt = _salt(identifier, extendable)
+    for i in range(ROUND_COUNT):
+        left, right = right, _xor(left, _round_function(i, passphrase, iteration_exponent, salt, right))
+    return right + left
+
+def decrypt(encrypted, passphrase, iteration_exponent, identifier, extendable):
+    half = len(encrypted) // 2
+    left, right = encrypted[:half], encrypted[half:]
+    salt = _salt(identifier, extendable)
+    for i in reversed(range(ROUND_COUNT)):
+        left, right = right, _xor(left, _round_function(i, passphrase, iteration_exponent, salt, right))
+    return right + left
+
+def _check_groups(group_threshold, groups):
+    if not 1 <= group_threshold <= len(groups):
+        raise ValueError("组门限必须在1到组数之间")
+    for member_threshold, member_count in groups:
+        if member_threshold == 1 and member_count > 1:
+            raise ValueError("成员门限为1时只能有1个成员份额 (请使用1-of-1)")
+
+def split_encrypted(encrypted, identifier, extendable, iteration_exponent, group_threshold, groups):
+    """
+    把已加密的主秘密拆成两级份额
+
+    Returns:
+        list: 每组一个 Share 列表
+    """
+    group_shares = shamir.split_secret(group_threshold, len(groups), encrypted)
+    return [
+        [Share(identifier, extendable, iteration_exponent, group_index, group_threshold, len(groups),
+               member_index, member_threshold, value)
+         for member_index, value in shamir.split_secret(member_threshold, member_count, group_secret)]
+        for (member_threshold, member_count), (group_index, group_secret) in zip(groups, group_shares)
+    ]
+
+def _validate_master_secret(master_secret):
+    if len(master_secret) * 8 < MIN_STRENGTH_BITS or len(master_secret) % 2:
+        raise ValueError("主秘密长度必须为偶数且至少16字节")
+
+def generate_shares(master_secret, group_threshold=1, groups=((3, 5),), passphrase=b'',
+                    iteration_exponent=0, extendable=True):
+    """
+    把主秘密 (例如16或32字节的BIP39熵) 拆成 SLIP-39 份额
+
+    Args:
+        master_secret: 主秘密字节串
+        group_threshold: 恢复所需的组数
+        groups: 每组的 (成员门限, 成员数)
+        passphrase: 加密口令 (ASCII 字节串)
+        iteration_exponent: PBKDF2 迭代指数
+
+    Returns:
+        list: 每组一个 Share 列表; 用 Share.mnemonic() 得到助记词
+    """
+    _validate_master_secret(master_secret)
+    _check_groups(group_threshold, groups)
+    identifier = int.from_bytes(os.urandom(2), 'big') & ((1 << ID_LENGTH_BITS) - 1)
+    encrypted = encrypt(master_secret, passphrase, iteration_exponent, identifier, extendable)
+    return split_encrypted(encrypted, identifier, extendable, iteration_exponent, group_threshold, groups)
+
+def combine_shares(shares, passphrase=b''):
+    """
+    由份额恢复主秘密
+
+    Args:
+        shares: Share 列表 (至少满足组门限个组, 每组满足成员门限)
+
+    Raises:
+        ValueError: 份额不属于同一秘密、数量不足或摘要校验失败
+    """
+    shares = list(shares)
+    if not shares:
+        raise ValueError("没有提供份额")
+    first = shares[0]
+    common = (first.identifier, first.extendable, first.iteration_exponent, first.group_threshold, first.group_count)
+    groups = {}
+    for share in shares:
+        if (share.identifier, share.extendable, share.iteration_exponent,
+                share.group_threshold, share.group_count) != common:
+            raise ValueError("份额不属于同一个秘密")
+        groups.setdefault(share.group_index, []).append(share)
+    if len(groups) < first.group_threshold:
+        raise ValueError(f"需要至少{first.group_threshold}组份额, 只提供了{len(groups)}组")
+    group_secrets = []
+    for group_index, members in sorted(groups.items())[:first.group_threshold]:
+        threshold = members[0].member_threshold
+        if any(member.member_threshold != threshold for member in members):
+            raise ValueError("同一组的份额成员门限不一致")
+        unique = {member.member_index: member.value for member in members}
+        group_secrets.append((group_index, shamir.recover_secret(threshold, sorted(unique.items()))))
+    encrypted = shamir.recover_secret(first.group_threshold, group_secrets)
+    return decrypt(encrypted, passphrase, first.iteration_exponent, first.identifier, first.extendable)
+
+def combine_mnemonics(mnemonics, passphrase=b''):
+    index_of = load_wordlist()[1]
+    return combine_shares((Share.from_mnemonic(m, index_of) for m in mnemonics), passphrase)
+
+def _encrypt_task(task):
+    master_secret, passphrase, iteration_exponent, extendable = task
+    identifier = int.from_bytes(os.urandom(2), 'big') & ((1 << ID_LENGTH_BITS) - 1)
+    return identifier, encrypt(master_secret, passphrase, iteration_exponent, identifier, extendable)
+
+def split_batch(master_secrets, group_threshold=1, groups=((3, 5),), passphrase=b'',
+                iteration_exponent=0, extendable=True, workers=None):
+    """
+    批量拆分主秘密
+
+    加密 (每个秘密4轮 PBKDF2) 是主要开销, 在进程池中并行; Shamir 拆分用查表法在当前进程完成。
+
+    Args:
+        master_secrets: 主秘密的可迭代对象
+        workers: 加密用的进程数, 默认为CPU核心数
+
+    Yields:
+        list: 每个秘密的份额 (与 generate_shares 的返回值相同), 按输入顺序
+    """
+    _check_groups(group_threshold, groups)
+
+    def tasks():
+        for master_secret in master_secrets:
+            _validate_master_secret(master_secret)
+            yield master_secret, passphrase, iteration_exponent, extendable
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1:
+        encrypted = map(_encrypt_task, tasks())
+        pool = None
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(workers)
+        encrypted = pool.imap(_encrypt_task, tasks(), chunksize=64)
+    try:
+        for identifier, secret in encrypted:
+            yield split_encrypted(secret, identifier, extendable, iteration_exponent, group_threshold, groups)
+    finally:
+        if pool is not None:
+            pool.terminate()
@@ -0,0 +1,166 @@
+import collections
+import concurrent.futures
+import functools
+import logging
+import os
+import secrets
+import threading
+import time
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# 单个熵源的默认截止时间(秒), 从本轮提交时开始计算
+DEFAULT_DEADLINE = 0.25
+# 整轮截止时间(秒): 到期仍未完成的熵源全部替换
+OVERALL_DEADLINE = 0.5
+# 每个进程的第一轮要导入模块、填充静态熵源缓存, 所有熵源共用这个较长的截止时间
+COLD_DEADLINE = 2.0
+MAX_WORKERS = 8
+# 替换用的CSPRNG字节数 (与各熵源的输出长度相同)
+FALLBACK_SIZE = 8
+
+# deadline 为None时使用 DEFAULT_DEADLINE
+Source = collections.namedtuple('Source', ['name', 'func', 'deadline'], defaults=[None])
+
+
+class SourceUnusable(Exception):
+    """熵源采样完成但不能使用 (例如未通过健康测试), 由调度器改用CSPRNG字节"""
+
+
+class SourceScheduler:
+    """
+    并发运行每个密钥的熵源
+
+    所有熵源同时提交到常驻线程池, 每个熵源有自己的截止时间, 整轮另有总截止时间,
+    每个密钥的等待时间取决于最慢的 (允许的) 熵源, 而不是各熵源耗时之和。
+    超时、出错或不可用的熵源改用系统CSPRNG字节并记录警告日志 (只包含熵源名称和原因,
+    不包含采样数据)。线程无法中断, 超时的采样会在后台继续完成; 完成之前的调用
+    直接替换该熵源, 不会重复提交堆积。并发的调用各自提交自己的采样, 互不影响。
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, overall_deadline=OVERALL_DEADLINE):
+        """
+        Args:
+            max_workers: 线程数, 0 表示在调用线程中依次运行 (没有截止时间, 用于对比)
+            overall_deadline: 整轮截止时间(秒)
+        """
+        self.max_workers = max_workers
+        self.overall_deadline = overall_deadline
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._executor = None
+        self._warm = False
+        self._late = {}  # 熵源名称 -> 超时后仍在后台运行的 Future
+
+    def _get_executor(self):
+        # fork出的子进程没有父进程的工作线程, 需要重新创建线程池
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._reset()
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix='entropy-source')
+            return self._executor
+
+    @staticmethod
+    def _call(source, late=None):
+        # 在工作线程中运行; 计时事件记录实际采样耗时, 超时的采样记为失败
+        with instrumentation.span('source', source.name) as span:
+            try:
+                return source.func()
+            finally:
+                if late is not None and late.is_set():
+                    span.fail()
+
+    @staticmethod
+    def _replace(name, reason):
+        logger.warning("熵源 %s %s, 改用系统CSPRNG字节", name, reason)
+        return secrets.token_bytes(FALLBACK_SIZE)
+
+    def _outcome(self, name, get):
+        """调用 get() 取得采样结果, 不可用或出错时替换"""
+        try:
+            return get()
+        except SourceUnusable as e:
+            return self._replace(name, f"不可用: {e}")
+        except Exception as e:
+            return self._replace(name, f"出错: {type(e).__name__}: {e}")
+
+    def run(self, sources):
+        """
+        运行一轮熵源
+
+        Args:
+            sources: Source 列表
+
+        Returns:
+            dict: 熵源名称 -> 采样数据 (被替换的熵源为CSPRNG字节)
+        """
+        results = {}
+        if self.max_workers == 0:
+            for source in sources:
+                results[source.name] = self._outcome(source.name, functools.partial(self._call, source))
+            return results
+
+        executor = self._get_executor()
+        start = time.monotonic()
+        # 显式给出更长截止时间的熵源 (例如有时间预算的额外熵) 同时延长整轮截止时间
+        overall = start + max([self.overall_deadline] + [s.deadline for s in sources if s.deadline is not None])
+        cold = not self._warm
+        if cold:
+            overall = max(overall, start + COLD_DEADLINE)
+        pending = []
+        for source in sources:
+            with self._lock:
+                previous = self._late.get(source.name)
+                busy = previous is not None and not previous.done()
+                if previous is not None and not busy:
+                    del self._late[source.name]
+            if busy:
+                results[source.name] = self._replace(source.name, "上一次超时的采样尚未完成")
+                continue
+            late = threading.Event()
+            future = executor.submit(self._call, source, late)
+            deadline = overall if cold else min(start + (source.deadline or DEFAULT_DEADLINE), overall)
+            pending.append((deadline, source.name, future, late))
+
+        # 按截止时间顺序等待, 每个熵源最多等到自己的截止时间
+        pending.sort(key=lambda item: item[0])
+        for deadline, name, future, late in pending:
+            done, _ = concurrent.futures.wait((future,), timeout=max(0.0, deadline - time.monotonic()))
+            if done:
+                results[name] = self._outcome(name, future.result)
+            else:
+                late.set()
+                if not future.cancel():
+                    with self._lock:
+                        self._late[name] = future
+                results[name] = self._replace(name, f"超过截止时间 {(deadline - start) * 1000:.0f}ms")
+        self._warm = True
+        return results
+
+    def shutdown(self):
+        """停止线程池 (等待正在运行的采样结束)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """返回进程级的熵源调度器, 线程池在第一次运行时创建"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = SourceScheduler()
+    return _scheduler
@@ -0,0 +1,282 @@
+import csv
+import hashlib
+import hmac
+import io
+import json
+import os
+import struct
+
+# cryptography 只在加密输出时导入
+AESGCM = None
+
+import bip39
+
+FORMATS = ('jsonl', 'csv', 'bin')
+CSV_FIELDS = ('index', 'mnemonic', 'seed', 'master_private_key', 'wif')
+
+# 二进制记录: 序号(u64) + 单词数(u8) + 24个单词索引(u16, 不足补零) + 种子(64) + 主私钥(32)
+BINARY_RECORD = struct.Struct('>QB24H64s32s')
+
+# 加密流: 文件头 = 魔数 + 版本 + scrypt盐值(16) + 密码校验值(8)
+# 之后每次写入 (包括续传) 先写一个会话帧: SESSION_MARK(u32) + 会话盐值(16),
+# 会话密钥 = HMAC-SHA256(密码密钥, 会话盐值), 续传不会以相同的密钥和nonce重复加密。
+# 每条记录为一帧: 长度(u32) + AES-256-GCM密文, nonce = 记录序号(96位)
+ENCRYPTED_MAGIC = b'BKGE'
+ENCRYPTED_VERSION = 2
+ENCRYPTED_HEADER = struct.Struct('>4sB16s8s')
+FRAME_LENGTH = struct.Struct('>I')
+SESSION_MARK = 0xFFFFFFFF
+SESSION_SALT_SIZE = 16
+SCRYPT_PARAMS = {'n': 1 << 15, 'r': 8, 'p': 1, 'maxmem': 64 * 1024 * 1024}
+
+def format_record(fmt, index, mnemonic, seed, master_private_key, wif, wordlist):
+    """
+    把一条生成结果编码为字节
+
+    Args:
+        fmt: 'jsonl' / 'csv' / 'bin'
+        index: 记录序号 (从0开始)
+        wordlist: BIP39词表 (二进制格式需要单词索引)
+    """
+    if fmt == 'jsonl':
+        return (json.dumps({
+            'index': index,
+            'mnemonic': mnemonic,
+            'seed': seed.hex(),
+            'master_private_key': master_private_key.hex(),
+            'wif': wif,
+        }) + '\n').encode()
+    if fmt == 'csv':
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator='\n').writerow(
+            [index, mnemonic, seed.hex(), master_private_key.hex(), wif])
+        return buf.getvalue().encode()
+    if fmt == 'bin':
+        indexes = bip39.mnemonic_to_indexes(mnemonic, wordlist)
+        return BINARY_RECORD.pack(index, len(indexes), *(indexes + [0] * (24 - len(indexes))),
+                                  seed, master_private_key)
+    raise ValueError(f"未知的输出格式: {fmt}")
+
+def parse_binary_record(data, wordlist):
+    """
+    解析一条二进制记录
+
+    Returns:
+        (index, mnemonic, seed, master_private_key)
+    """
+    fields = BINARY_RECORD.unpack(data)
+    index, count = fields[0], fields[1]
+    words = ' '.join(wordlist[i] for i in fields[2:2 + count])
+    return index, words, fields[26], fields[27]
+
+def header(fmt):
+    """输出流开头的表头 (仅CSV)"""
+    if fmt == 'csv':
+        return (','.join(CSV_FIELDS) + '\n').encode()
+    return b''
+
+def _derive_key(password, salt):
+    return hashlib.scrypt(password.encode(), salt=salt, dklen=32, **SCRYPT_PARAMS)
+
+def _check_value(key):
+    # 只用于在解密或续传前发现密码错误, 不泄露密钥
+    return hashlib.sha256(b'stream-password-check' + key).digest()[:8]
+
+def _require_crypto():
+    global AESGCM
+    if AESGCM is None:
+        try:
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        except ImportError:
+            raise ImportError("加密输出需要安装cryptography: pip install cryptography")
+
+
+class StreamEncryptor:
+    """逐条记录的AES-256-GCM加密, 每条记录可独立认证, 截断只会丢失尾部记录"""
+
+    def __init__(self, password, salt=None):
+        _require_crypto()
+        self.salt = salt or os.urandom(16)
+        self._key = _derive_key(password, self.salt)
+        self._aead = None
+
+    @classmethod
+    def from_header(cls, password, data):
+        """
+        从已有文件头恢复
+
+        Raises:
+            ValueError: 不是加密输出文件或密码错误
+        """
+        if len(data) < ENCRYPTED_HEADER.size:
+            raise ValueError("不是加密的输出文件")
+        magic, version, salt, check = ENCRYPTED_HEADER.unpack(data[:ENCRYPTED_HEADER.size])
+        if magic != ENCRYPTED_MAGIC or version != ENCRYPTED_VERSION:
+            raise ValueError("不是加密的输出文件")
+        encryptor = cls(password, salt)
+        if not hmac.compare_digest(check, _check_value(encryptor._key)):
+            raise ValueError("加密输出的密码错误")
+        return encryptor
+
+    def header(self):
+        return ENCRYPTED_HEADER.pack(ENCRYPTED_MAGIC, ENCRYPTED_VERSION, self.salt, _check_value(self._key))
+
+    def use_session(self, session_salt):
+        """切换到给定会话盐值的会话密钥"""
+        self._aead = AESGCM(hmac.new(self._key, b'stream-session' + session_salt, hashlib.sha256).digest())
+
+    def new_session(self):
+        """开始新的会话, 返回需要写入的会话帧"""
+        session_salt = os.urandom(SESSION_SALT_SIZE)
+        self.use_session(session_salt)
+        return FRAME_LENGTH.pack(SESSION_MARK) + session_salt
+
+    def encrypt(self, index, plaintext):
+        ciphertext = self._aead.encrypt(index.to_bytes(12, 'big'), plaintext, None)
+        return FRAME_LENGTH.pack(len(ciphertext)) + ciphertext
+
+    def decrypt(self, index, ciphertext):
+        return self._aead.decrypt(index.to_bytes(12, 'big'), ciphertext, None)
+
+def read_encrypted(path, password):
+    """
+    逐条解密加密输出文件
+
+    Yields:
+        bytes: 每条记录的明文 (CSV表头作为第一条)
+    """
+    with open(path, 'rb') as f:
+        encryptor = StreamEncryptor.from_header(password, f.read(ENCRYPTED_HEADER.size))
+        frame = 0
+        while True:
+            length = f.read(FRAME_LENGTH.size)
+            if len(length) < FRAME_LENGTH.size:
+                return
+            length = FRAME_LENGTH.unpack(length)[0]
+            if length == SESSION_MARK:
+                encryptor.use_session(f.read(SESSION_SALT_SIZE))
+                continue
+            if encryptor._aead is None:
+                raise ValueError("加密输出缺少会话帧")
+            yield encryptor.decrypt(frame, f.read(length))
+            frame += 1
+
+
+def _write_checkpoint(path, state):
+    # 先写临时文件再原子替换, 中断时不会留下半个检查点
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def export(records, count, wordlist, fmt='jsonl', output='-', fsync_every=100,
+           password=None, checkpoint=None, progress=None):
+    """
+    把生成结果逐条写入文件或标准输出
+
+    Args:
+        records: 接受 (剩余数量) 并逐条产出 (mnemonic, seed, master_private_key, wif) 的函数
+        count: 总记录数
+        wordlist: BIP39词表
+        fmt: 'jsonl' / 'csv' / 'bin'
+        output: 输出文件路径, '-' 表示标准输出
+        fsync_every: 每写入多少条记录执行一次 fsync 并更新检查点
+        password: 不为None时用AES-256-GCM加密输出流
+        checkpoint: 检查点文件路径; 存在时从上次 fsync 的位置继续
+        progress: 可选回调 progress(已写入数量, 总数)
+
+    Returns:
+        int: 本次写入的记录数
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"未知的输出格式: {fmt}")
+    if fsync_every < 1:
+        raise ValueError("fsync间隔必须大于0")
+    to_stdout = output == '-'
+    if to_stdout and checkpoint:
+        raise ValueError("写入标准输出时不支持检查点续传")
+
+    state = _read_checkpoint(checkpoint) if checkpoint else None
+    if state is not None:
+        if state['format'] != fmt or state['count'] != count or state['encrypted'] != (password is not None):
+            raise ValueError("检查点与当前参数不一致")
+        start, offset, frame = state['next'], state['offset'], state['frame']
+    else:
+        start, offset, frame = 0, 0, 0
+
+    if to_stdout:
+        out = os.fdopen(os.dup(1), 'wb')
+    elif state is not None:
+        out = open(output, 'r+b')
+        # 丢弃上次检查点之后未确认的记录, 避免重复或半条记录
+        out.truncate(offset)
+        out.seek(offset)
+    else:
+        out = open(output, 'wb')
+
+    encryptor = None
+    try:
+        if password is not None:
+            if state is not None:
+                # 密码不一致时拒绝续传, 否则文件前后两部分无法用同一个密码解密
+                with open(output, 'rb') as f:
+                    encryptor = StreamEncryptor.from_header(password, f.read(ENCRYPTED_HEADER.size))
+            else:
+                encryptor = StreamEncryptor(password)
+                out.write(encryptor.header())
+            # 每次写入使用新的会话密钥, 续传时从检查点的帧序号继续也不会重用nonce
+            out.write(encryptor.new_session())
+
+        def emit(data):
+            nonlocal frame
+            if encryptor is not None:
+                data = encryptor.encrypt(frame, data)
+                frame += 1
+            out.write(data)
+
+        if state is None and header(fmt):
+            emit(header(fmt))
+
+        def sync(next_index):
+            out.flush()
+            if not to_stdout:
+                os.fsync(out.fileno())
+            if checkpoint:
+                _write_checkpoint(checkpoint, {
+                    'next': next_index,
+                    'offset': out.tell(),
+                    'frame': frame,
+                    'count': count,
+                    'format': fmt,
+                    'encrypted': encryptor is not None,
+                })
+
+        if state is None:
+            sync(0)
+
+        written = 0
+        index = start
+        for mnemonic, seed, master_private_key, wif in records(count - start):
+            emit(format_record(fmt, index, mnemonic, seed, master_private_key, wif, wordlist))
+            index += 1
+            written += 1
+            if written % fsync_every == 0:
+                sync(index)
+            if progress is not None:
+                progress(index, count)
+        sync(index)
+    finally:
+        out.close()
+
+    if checkpoint and index >= count:
+        os.unlink(checkpoint)
+    return written
@@ -0,0 +1,253 @@
+import math
+import os
+import queue
+import secrets
+import time
+
+import address
+import secp256k1
+from base58 import ALPHABET
+from ripemd160 import hash160
+
+# 支持的地址类型 (压缩公钥)
+VANITY_TYPES = ('p2pkh', 'p2wpkh')
+# 每批连续点数: 一次模逆分摊到这么多个候选上
+DEFAULT_BATCH = 512
+_HASH160_SPACE = 1 << 160
+
+def _base58_ranges(prefix, lo, hi):
+    """
+    [lo, hi) 中 Base58 编码 (不含前导零) 以 prefix 开头的整数区间
+
+    Returns:
+        list: (起点, 终点) 半开区间
+    """
+    value = 0
+    for c in prefix:
+        value = value * 58 + ALPHABET.index(c)
+    ranges = []
+    digits = len(prefix)
+    # 编码长度为 L 位时, 前 len(prefix) 位固定, 对应一个连续区间
+    while 58 ** (digits - 1) < hi:
+        scale = 58 ** (digits - len(prefix))
+        start = max(value * scale, lo)
+        end = min((value + 1) * scale, hi)
+        if start < end:
+            ranges.append((start, end))
+        digits += 1
+    return ranges
+
+
+class VanityPattern:
+    """
+    地址前缀 -> hash160 数值区间
+
+    候选地址不做完整编码, 只比较 hash160 是否落在区间内; 区间边界受校验和影响,
+    命中后再用完整地址确认。
+    """
+
+    def __init__(self, prefix, kind='p2pkh', testnet=False):
+        """
+        Args:
+            prefix: 地址前缀, 例如 '1Shop' 或 'bc1qshop'
+            kind: 'p2pkh' 或 'p2wpkh'
+            testnet: 是否为测试网地址
+
+        Raises:
+            ValueError: 前缀包含无效字符或不可能出现
+        """
+        if kind not in VANITY_TYPES:
+            raise ValueError(f"靓号地址只支持 {', '.join(VANITY_TYPES)}")
+        self.prefix = prefix
+        self.kind = kind
+        self.testnet = testnet
+        if kind == 'p2pkh':
+            self.ranges = self._p2pkh_ranges(prefix, address.NETWORKS[testnet][0])
+        else:
+            self.ranges = self._p2wpkh_ranges(prefix, address.NETWORKS[testnet][2])
+        if not self.ranges:
+            raise ValueError(f"不可能出现以 {prefix!r} 开头的地址")
+        self.ranges = tuple(self.ranges)
+        width = sum(end - start for start, end in self.ranges)
+        # 平均需要尝试的候选数
+        self.difficulty = _HASH160_SPACE / width
+
+    @staticmethod
+    def _p2pkh_ranges(prefix, version):
+        invalid = set(prefix) - set(ALPHABET)
+        if invalid:
+            raise ValueError(f"前缀包含非Base58字符: {''.join(sorted(invalid))}")
+        # 载荷 = 版本(1) + hash160(20) + 校验和(4); 前导零字节编码为 '1'
+        ones = len(prefix) - len(prefix.lstrip('1'))
+        rest = prefix[ones:]
+        if version == 0:
+            if not ones:
+                raise ValueError("主网P2PKH地址以 '1' 开头")
+            zeros = ones - 1
+            if zeros > 20:
+                raise ValueError("前缀中的 '1' 过多")
+            if not rest:
+                # 只要求 hash160 至少有 zeros 个前导零字节
+                return [(0, 1 << (8 * (20 - zeros)))]
+            # 恰好 zeros 个前导零字节, 之后的 (24-zeros) 字节编码为 rest
+            bits = 8 * (24 - zeros)
+            lo, hi = 1 << (bits - 8), 1 << bits
+            shift = 32
+            base = 0
+        else:
+            if ones:
+                raise ValueError("该网络的P2PKH地址不以 '1' 开头")
+            lo, hi = version << 192, (version + 1) << 192
+            shift = 32
+            base = version << 160
+        ranges = []
+        for start, end in _base58_ranges(rest, lo, hi):
+            # 去掉校验和部分, 向外取整 (边界附近的候选在命中后再确认)
+            ranges.append(((start >> shift) - base, ((end - 1) >> shift) + 1 - base))
+        return ranges
+
+    @staticmethod
+    def _p2wpkh_ranges(prefix, hrp):
+        head = hrp + '1q'
+        prefix = prefix.lower()
+        if not prefix.startswith(head):
+            raise ValueError(f"P2WPKH地址以 {head!r} 开头")
+        rest = prefix[len(head):]
+        invalid = set(rest) - set(address.BECH32_CHARSET)
+        if invalid:
+            raise ValueError(f"前缀包含非bech32字符: {''.join(sorted(invalid))}")
+        # 每个字符对应 hash160 的5位, 32个字符之后是校验和
+        if len(rest) > 32:
+            raise ValueError("前缀过长")
+        value = 0
+        for c in rest:
+            value = value * 32 + address.BECH32_CHARSET.index(c)
+        shift = 160 - 5 * len(rest)
+        return [(value << shift, (value + 1) << shift)]
+
+    def address(self, pubkey):
+        return address.encode(pubkey, self.kind, self.testnet)
+
+    def matches(self, pubkey):
+        """完整编码后确认地址前缀"""
+        candidate = self.address(pubkey)
+        if self.kind == 'p2wpkh':
+            return candidate.startswith(self.prefix.lower())
+        return candidate.startswith(self.prefix)
+
+def expected_seconds(difficulty, rate, probability=0.5):
+    """
+    以给定概率找到结果所需的时间
+
+    Args:
+        difficulty: 平均需要尝试的候选数
+        rate: 每秒候选数
+        probability: 目标概率 (0.5 为中位数)
+    """
+    return -math.log(1 - probability) * difficulty / rate
+
+def format_duration(seconds):
+    """秒数 -> 便于阅读的时长"""
+    for unit, size in (('年', 365 * 86400), ('天', 86400), ('小时', 3600), ('分钟', 60)):
+        if seconds >= size:
+            return f"{seconds / size:.1f}{unit}"
+    return f"{seconds:.1f}秒"
+
+def _walk(pattern, batch_size, stop, counters, slot, results):
+    """
+    单个工作进程: 从安全随机的 k 开始依次检查 k, k+1, k+2, ...
+
+    找到的标量放入 results, 每批更新一次 counters[slot]。
+    """
+    ranges = pattern.ranges
+    k = secrets.randbelow(secp256k1.N - 1) + 1
+    checked = 0
+    for points in secp256k1.walk_g(k, batch_size):
+        for i, (x, y) in enumerate(points):
+            h = int.from_bytes(hash160(bytes((2 + (y & 1),)) + x.to_bytes(32, 'big')), 'big')
+            for start, end in ranges:
+                if start <= h < end:
+                    results.put((k + i) % secp256k1.N)
+                    break
+        k += batch_size
+        checked += batch_size
+        counters[slot] = checked
+        if stop.is_set():
+            return
+
+def measure_rate(pattern, seconds=1.0, batch_size=DEFAULT_BATCH):
+    """单核每秒候选数 (用于估算耗时)"""
+    ranges = pattern.ranges
+    start = time.perf_counter()
+    checked = 0
+    for points in secp256k1.walk_g(secrets.randbelow(secp256k1.N - 1) + 1, batch_size):
+        for x, y in points:
+            h = int.from_bytes(hash160(bytes((2 + (y & 1),)) + x.to_bytes(32, 'big')), 'big')
+            for lo, hi in ranges:
+                if lo <= h < hi:
+                    break
+        checked += len(points)
+        if time.perf_counter() - start >= seconds:
+            break
+    return checked / (time.perf_counter() - start)
+
+def search(pattern, workers=None, timeout=None, progress=None, batch_size=DEFAULT_BATCH,
+           progress_interval=2.0):
+    """
+    多进程搜索靓号地址, 每个核心一个独立的随机起点
+
+    Args:
+        pattern: VanityPattern
+        workers: 进程数, 默认为CPU核心数
+        timeout: 最长搜索时间(秒), None表示不限
+        progress: 可选回调 progress(已检查数量, 每秒候选数, 已用秒数)
+        batch_size: 每批连续点数
+
+    Returns:
+        dict: private_key (32字节), address, candidates, seconds; 超时返回None
+    """
+    import multiprocessing
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    counters = multiprocessing.Array('Q', workers, lock=False)
+    processes = [
+        multiprocessing.Process(target=_walk, args=(pattern, batch_size, stop, counters, i, results), daemon=True)
+        for i in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    try:
+        while True:
+            elapsed = time.perf_counter() - start
+            if timeout is not None and elapsed >= timeout:
+                return None
+            wait = progress_interval if timeout is None else min(progress_interval, timeout - elapsed)
+            try:
+                k = results.get(timeout=max(wait, 0.01))
+            except queue.Empty:
+                if progress is not None:
+                    elapsed = time.perf_counter() - start
+                    checked = sum(counters)
+                    progress(checked, checked / elapsed if elapsed else 0.0, elapsed)
+                continue
+            # 区间比较只是预筛选, 用完整地址确认
+            private_key = k.to_bytes(32, 'big')
+            pubkey = secp256k1.public_key(private_key)
+            if not pattern.matches(pubkey):
+                continue
+            return {
+                'private_key': private_key,
+                'address': pattern.address(pubkey),
+                'candidates': sum(counters),
+                'seconds': time.perf_counter() - start,
+            }
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        results.cancel_join_thread()
@@ -0,0 +1,294 @@
+import os
+import sys
+import threading
+import unicodedata
+
+# BIP39 保证每个单词的前4个字母唯一, 输入前缀即可确定单词
+PREFIX_LENGTH = 4
+WORD_COUNT = 2048
+
+DEFAULT_LANGUAGE = 'english'
+# BIP39 官方词表; english.txt 在程序目录, 其他语言随程序放在 wordlists/ 子目录, 用到时才加载
+LANGUAGES = (
+    'english', 'japanese', 'korean', 'spanish', 'chinese_simplified',
+    'chinese_traditional', 'french', 'italian', 'czech', 'portuguese',
+)
+# 这些词表保证去掉重音后仍然唯一, 且至少4个字母的单词都能用4字母前缀确定
+LATIN_LANGUAGES = ('english', 'spanish', 'french', 'italian', 'czech', 'portuguese')
+# 日语助记词用全角空格分隔
+SEPARATORS = {'japanese': '　'}
+
+# 拼写建议的最大编辑距离 (邻居表按此预先生成)
+MAX_SUGGEST_DISTANCE = 2
+
+_loaded = {}
+_lock = threading.Lock()
+
+def resource_dir():
+    """
+    词表文件所在目录
+
+    PyInstaller 打包后为解压目录 (sys._MEIPASS), 否则为本模块所在目录,
+    与当前工作目录无关。
+    """
+    return getattr(sys, '_MEIPASS', None) or os.path.dirname(os.path.abspath(__file__))
+
+def resource_path(language=DEFAULT_LANGUAGE):
+    """<language>.txt 的路径: 先找程序目录, 再找 wordlists/ 子目录"""
+    path = os.path.join(resource_dir(), f"{language}.txt")
+    if not os.path.exists(path):
+        nested = os.path.join(resource_dir(), 'wordlists', f"{language}.txt")
+        if os.path.exists(nested):
+            return nested
+    return path
+
+def available_languages():
+    """已安装词表文件的语言"""
+    return [language for language in LANGUAGES if os.path.exists(resource_path(language))]
+
+def normalize(text):
+    """BIP39 要求的 NFKD 规范化, 同时转为小写并合并空白 (全角空格也按空白处理)"""
+    return ' '.join(unicodedata.normalize('NFKD', text).lower().split())
+
+def fold(word):
+    """NFKD 后去掉组合附加符号 (重音), 用于不输入重音的查找"""
+    if word.isascii():
+        return word
+    return ''.join(c for c in unicodedata.normalize('NFKD', word) if not unicodedata.combining(c))
+
+def _deletes(word, distance):
+    """删除至多 distance 个字符得到的所有字符串 (含原词)"""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+def edit_distance(a, b, limit):
+    """
+    带相邻换位的编辑距离 (OSA), 超过 limit 时返回 limit + 1
+
+    先去掉公共前后缀, 再只在第一个不同的字符处分支; limit 很小时比完整的动态规划快得多。
+    """
+    i = 0
+    n = min(len(a), len(b))
+    while i < n and a[i] == b[i]:
+        i += 1
+    a, b = a[i:], b[i:]
+    while a and b and a[-1] == b[-1]:
+        a, b = a[:-1], b[:-1]
+    if not a or not b:
+        distance = len(a) + len(b)
+        return distance if distance <= limit else limit + 1
+    if limit == 0 or abs(len(a) - len(b)) > limit:
+        return limit + 1
+    best = 1 + min(edit_distance(a[1:], b[1:], limit - 1),
+                   edit_distance(a[1:], b, limit - 1),
+                   edit_distance(a, b[1:], limit - 1))
+    if len(a) > 1 and len(b) > 1 and a[0] == b[1] and a[1] == b[0]:
+        best = min(best, 1 + edit_distance(a[2:], b[2:], limit - 1))
+    return min(best, limit + 1)
+
+
+class Wordlist(tuple):
+    """
+    只读的BIP39词表及其索引
+
+    本身是按索引排列的单词元组 (NFKD 规范化), 可以直接替代原来的列表使用;
+    附带 单词->索引 字典、去重音形式->索引 字典和 4字母前缀->索引 字典,
+    加载后在进程内共享。拼写建议用的邻居表在第一次调用 suggest() 时生成。
+    """
+
+    def __new__(cls, words, language=DEFAULT_LANGUAGE):
+        self = super().__new__(cls, (unicodedata.normalize('NFKD', word) for word in words))
+        if len(self) != WORD_COUNT:
+            raise ValueError(f"词表必须包含{WORD_COUNT}个单词, 实际为{len(self)}个")
+        self.index_of = {word: i for i, word in enumerate(self)}
+        if len(self.index_of) != WORD_COUNT:
+            raise ValueError("词表包含重复的单词")
+        self.language = language
+        self.separator = SEPARATORS.get(language, ' ')
+        self.folded_words = tuple(fold(word) for word in self)
+        # 西班牙语、法语等词表保证去掉重音后仍然唯一; 不唯一的形式不参与查找
+        self.folded = cls._unique(self.folded_words, len)
+        # 只有至少4个字母的单词才能用前缀确定 (中文、日文、韩文词表基本没有可用前缀)
+        self.prefixes = cls._unique(self.folded_words, lambda word: len(word) >= PREFIX_LENGTH,
+                                    lambda word: word[:PREFIX_LENGTH])
+        self._neighbors = None
+        return self
+
+    @staticmethod
+    def _unique(words, usable, key=lambda word: word):
+        table = {}
+        for i, word in enumerate(words):
+            if usable(word):
+                k = key(word)
+                table[k] = None if k in table else i
+        return {k: i for k, i in table.items() if i is not None}
+
+    def lookup(self, word):
+        """
+        完整单词、去掉重音的单词或4字母前缀 -> 索引
+
+        Returns:
+            int: 单词索引, 找不到时返回None
+        """
+        index = self.index_of.get(word)
+        if index is not None:
+            return index
+        word = fold(unicodedata.normalize('NFKD', word).lower())
+        index = self.folded.get(word)
+        if index is None and len(word) >= PREFIX_LENGTH:
+            index = self.prefixes.get(word[:PREFIX_LENGTH])
+            # 超过4个字母的输入必须与单词一致, 只接受真正的前缀
+            if index is not None and not self.folded_words[index].startswith(word):
+                index = None
+        return index
+
+    def neighbors(self):
+        """
+        拼写建议的邻居表: 每个单词删除至多 MAX_SUGGEST_DISTANCE 个字符的形式 -> 单词索引
+
+        输入的删除形式与表中的键相交即为候选, 再用编辑距离确认 (对称删除法)。
+        """
+        if self._neighbors is None:
+            with _lock:
+                if self._neighbors is None:
+                    table = {}
+                    for i, word in enumerate(self.folded_words):
+                        for variant in _deletes(word, MAX_SUGGEST_DISTANCE):
+                            table.setdefault(variant, []).append(i)
+                    self._neighbors = {variant: tuple(indexes) for variant, indexes in table.items()}
+        return self._neighbors
+
+    def suggest(self, word, max_distance=MAX_SUGGEST_DISTANCE, limit=5):
+        """
+        拼写错误的单词 -> 编辑距离最近的词表单词
+
+        Args:
+            word: 输入的单词
+            max_distance: 最大编辑距离 (不超过 MAX_SUGGEST_DISTANCE)
+            limit: 最多返回的单词数量
+
+        Returns:
+            list: 按编辑距离、词表顺序排列的单词
+        """
+        max_distance = min(max_distance, MAX_SUGGEST_DISTANCE)
+        word = fold(unicodedata.normalize('NFKD', word).lower())
+        index = self.folded.get(word)
+        if index is not None:
+            return [self[index]]
+        neighbors = self.neighbors()
+        candidates = set()
+        for variant in _deletes(word, max_distance):
+            candidates.update(neighbors.get(variant, ()))
+        scored = []
+        for i in candidates:
+            distance = edit_distance(word, self.folded_words[i], max_distance)
+            if distance <= max_distance:
+                scored.append((distance, i))
+        scored.sort()
+        return [self[i] for _, i in scored[:limit]]
+
+    def join(self, words):
+        """按该语言的分隔符拼接助记词"""
+        return self.separator.join(words)
+
+def load(language=DEFAULT_LANGUAGE, path=None):
+    """
+    加载词表, 每个进程只读取和构建一次
+
+    Args:
+        language: 词表语言 (对应 <language>.txt)
+        path: 显式指定的词表文件, 默认从 resource_dir() 读取
+
+    Returns:
+        Wordlist: 共享的词表对象
+
+    Raises:
+        ValueError: 未知的语言
+        FileNotFoundError: 该语言的词表文件不存在
+    """
+    key = path or language
+    wordlist = _loaded.get(key)
+    if wordlist is not None:
+        return wordlist
+    if path is None and language not in LANGUAGES:
+        raise ValueError(f"未知的词表语言: {language} (支持 {', '.join(LANGUAGES)})")
+    with _lock:
+        wordlist = _loaded.get(key)
+        if wordlist is None:
+            file_path = path or resource_path(language)
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"找不到{language}词表文件, 请将 {language}.txt 放到 {resource_dir()} 或其 wordlists/ 子目录")
+            with open(file_path, 'r', encoding='utf-8') as f:
+                wordlist = Wordlist((line.strip() for line in f if line.strip()), language)
+            _loaded[key] = wordlist
+    return wordlist
+
+def detect_language(words):
+    """
+    根据单词判断助记词的语言 (只检查已安装的词表)
+
+    Args:
+        words: 已规范化的单词列表
+
+    Returns:
+        str: 第一个包含全部单词的语言; 都不符合时返回包含单词最多的语言, 没有任何词表时返回None
+    """
+    best, best_count = None, -1
+    for language in available_languages():
+        wordlist = load(language)
+        count = sum(wordlist.lookup(word) is not None for word in words)
+        if count == len(words):
+            return language
+        if count > best_count:
+            best, best_count = language, count
+    return best
+
+def verify(language):
+    """
+    检查已安装的词表文件
+
+    文件必须是2048个NFKD规范化后互不相同的单词; 每个单词按完整形式、
+    去重音形式和4字母前缀查找都必须得到自己的索引, 因不唯一而舍弃的形式必须查不到
+    (不能解析成别的单词); 拉丁字母词表不允许舍弃任何形式。
+
+    Returns:
+        list: 问题描述, 空列表表示通过
+    """
+    with open(resource_path(language), 'r', encoding='utf-8') as f:
+        raw = [line.strip() for line in f if line.strip()]
+    normalized = [unicodedata.normalize('NFKD', word) for word in raw]
+    if len(normalized) != WORD_COUNT or len(set(normalized)) != WORD_COUNT:
+        return [f"需要{WORD_COUNT}个不同的NFKD单词, 实际为{len(set(normalized))}个不同/{len(normalized)}个"]
+    wordlist = load(language)
+    problems = []
+    for i, word in enumerate(wordlist):
+        folded = wordlist.folded_words[i]
+        forms = [('完整形式', word, True), ('去重音形式', folded, folded in wordlist.folded)]
+        if len(folded) >= PREFIX_LENGTH:
+            prefix = folded[:PREFIX_LENGTH]
+            forms.append(('前缀', prefix, prefix in wordlist.prefixes))
+        for kind, form, kept in forms:
+            if not kept and language in LATIN_LANGUAGES:
+                problems.append(f"{word}: {kind} {form} 不唯一")
+            expected = i if kept else None
+            if wordlist.lookup(form) not in (expected, i):
+                problems.append(f"{word}: {kind} {form} 解析为 {wordlist.lookup(form)}")
+    # 助记词按该语言的分隔符拼接后, 规范化时要能拆回原来的单词
+    sample = list(wordlist[:3])
+    if normalize(wordlist.join(sample)).split() != [normalize(word) for word in sample]:
+        problems.append(f"分隔符 {wordlist.separator!r} 拼接的助记词无法拆分")
+    return problems
+
+if __name__ == "__main__":
+    failed = 0
+    for language in available_languages():
+        problems = verify(language)
+        failed += bool(problems)
+        print(f"{language:20s} {'正常' if not problems else f'{len(problems)}个问题'}")
+        for problem in problems[:10]:
+            print(f"    {problem}")
+    sys.exit(1 if failed else 0)